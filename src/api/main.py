@@ -9,7 +9,9 @@ FastAPI application providing the main interface for:
 - Execution monitoring
 """
 
+import importlib.util
 import logging
+import sys
 import uuid
 from contextlib import asynccontextmanager
 from pathlib import Path
@@ -31,6 +33,19 @@ from ..utils.credentials import CredentialManager
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Connector modules (relative to src.connectors) that keep a process-wide client pool
+_POOLED_CONNECTOR_MODULES = (
+    "cloud.aws_s3",
+    "cloud.azure_blob",
+    "cloud.box",
+    "cloud.dropbox",
+    "cloud.onedrive",
+    "crm.freshsales",
+    "crm.hubspot",
+    "crm.pipedrive",
+    "crm.salesforce",
+)
+
 
 # ============== Pydantic Models ==============
 
@@ -170,6 +185,18 @@ async def lifespan(app: FastAPI):
     if app.state.app_state.scheduler:
         app.state.app_state.scheduler.stop()
     await app.state.app_state.close()
+
+    # Only connectors that were actually used are imported; close their pools,
+    # each on its own so one failure doesn't leave the rest open
+    connectors = importlib.util.resolve_name("..connectors", __package__)
+    for name in _POOLED_CONNECTOR_MODULES:
+        module = sys.modules.get(f"{connectors}.{name}")
+        if module is None:
+            continue
+        try:
+            await module.close_client_pool()
+        except Exception:
+            logger.exception(f"Failed to close the {name} client pool")
     logger.info("Universal Integrator stopped")
 
 
@@ -17,6 +17,17 @@ import httpx
 from .token_store import TokenData, TokenStore, get_default_store
 
 
+# A dot-notation JSON path, either as written ("data.token") or pre-split
+JsonPath = Union[str, tuple[str, ...]]
+
+
+def _split_path(path: Optional[JsonPath]) -> Optional[tuple[str, ...]]:
+    """Split a dot-notation path into its segments (no-op for tuples)."""
+    if path is None or isinstance(path, tuple):
+        return path
+    return tuple(path.split(".")) if path else None
+
+
 @dataclass
 class AuthRequest:
     """Configuration for the authentication request."""
@@ -55,22 +66,23 @@ class TokenExtraction:
     """
     # JSON path to access token (dot notation)
     # e.g., "access_token", "data.token", "response.credentials.jwt"
-    token_path: str = "access_token"
+    # Paths are split into segment tuples once, at construction.
+    token_path: JsonPath = "access_token"
 
     # Alternative paths to try (in order)
-    fallback_paths: Optional[list[str]] = None
+    fallback_paths: Optional[list[JsonPath]] = None
 
     # JSON path to token type (default: Bearer)
-    token_type_path: Optional[str] = None
+    token_type_path: Optional[JsonPath] = None
 
     # JSON path to expiration (seconds from now)
-    expires_in_path: Optional[str] = None
+    expires_in_path: Optional[JsonPath] = None
 
     # JSON path to absolute expiration timestamp
-    expires_at_path: Optional[str] = None
+    expires_at_path: Optional[JsonPath] = None
 
     # JSON path to refresh token
-    refresh_token_path: Optional[str] = None
+    refresh_token_path: Optional[JsonPath] = None
 
     # Regex pattern to extract token from raw response
     # Group 1 should capture the token
@@ -82,6 +94,15 @@ class TokenExtraction:
     # Default expiration in seconds if not provided in response
     default_expires_in: Optional[int] = None
 
+    def __post_init__(self):
+        self.token_path = _split_path(self.token_path)
+        if self.fallback_paths:
+            self.fallback_paths = [_split_path(p) for p in self.fallback_paths]
+        self.token_type_path = _split_path(self.token_type_path)
+        self.expires_in_path = _split_path(self.expires_in_path)
+        self.expires_at_path = _split_path(self.expires_at_path)
+        self.refresh_token_path = _split_path(self.refresh_token_path)
+
 
 @dataclass
 class TokenInjection:
@@ -170,15 +191,14 @@ class CustomAuthProvider:
             json.dumps(self.config.request.body, sort_keys=True) if self.config.request.body else "",
         )
 
-    def _extract_value(self, data: Any, path: str) -> Any:
-        """Extract a value from nested dict using dot notation path."""
+    def _extract_value(self, data: Any, path: Optional[tuple[str, ...]]) -> Any:
+        """Extract a value from nested dict using a pre-split dot notation path."""
         if not path or data is None:
             return None
 
-        parts = path.split(".")
         current = data
 
-        for part in parts:
+        for part in path:
             if isinstance(current, dict):
                 current = current.get(part)
             elif isinstance(current, list) and part.isdigit():
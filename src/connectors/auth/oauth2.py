@@ -206,6 +206,10 @@ class OAuth2Provider:
 
         return await self._make_token_request(data)
 
+    async def refresh(self, refresh_token: str) -> TokenData:
+        """Exchange a refresh token for a new access token and cache it."""
+        return await self._refresh_token(refresh_token)
+
     async def _refresh_token(self, refresh_token: str) -> TokenData:
         """Refresh an access token using a refresh token."""
         data = {
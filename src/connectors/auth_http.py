@@ -12,6 +12,7 @@ This connector handles the complete flow:
 """
 
 import json
+from functools import lru_cache
 from typing import Any, Optional
 from .base import BaseConnector, ConnectorResult
 from .auth import (
@@ -28,6 +29,73 @@ from .auth import (
 )
 
 
+# Parameter schemas shared by the HTTP verb actions. Identical shapes reference
+# the same dict objects so downstream validators see one schema per shape.
+_URL_PARAM = {"type": "string", "description": "URL to request", "required": True}
+_HEADERS_PARAM = {"type": "object", "description": "Additional headers", "required": False}
+_BODY_PARAM = {"type": "object", "description": "Request body", "required": False}
+_PARAMS_PARAM = {"type": "object", "description": "Query parameters", "required": False}
+
+_URL_HEADERS_PARAMS = {"url": _URL_PARAM, "headers": _HEADERS_PARAM}
+_URL_BODY_PARAMS = {**_URL_HEADERS_PARAMS, "body": _BODY_PARAM}
+_URL_BODY_QUERY_PARAMS = {**_URL_BODY_PARAMS, "params": _PARAMS_PARAM}
+
+_ACTIONS: dict[str, dict[str, Any]] = {
+    "request": {
+        "description": "Make an authenticated HTTP request",
+        "parameters": {
+            "method": {"type": "string", "description": "HTTP method (GET, POST, PUT, PATCH, DELETE)", "required": True},
+            "url": {"type": "string", "description": "URL to request (absolute or relative to base_url)", "required": True},
+            "headers": _HEADERS_PARAM,
+            "body": _BODY_PARAM,
+            "params": _PARAMS_PARAM,
+        },
+    },
+    "get": {
+        "description": "Make an authenticated GET request",
+        "parameters": {**_URL_HEADERS_PARAMS, "params": _PARAMS_PARAM},
+    },
+    "post": {
+        "description": "Make an authenticated POST request",
+        "parameters": _URL_BODY_QUERY_PARAMS,
+    },
+    "put": {
+        "description": "Make an authenticated PUT request",
+        "parameters": _URL_BODY_PARAMS,
+    },
+    "patch": {
+        "description": "Make an authenticated PATCH request",
+        "parameters": _URL_BODY_PARAMS,
+    },
+    "delete": {
+        "description": "Make an authenticated DELETE request",
+        "parameters": _URL_HEADERS_PARAMS,
+    },
+    "authenticate": {
+        "description": "Manually trigger authentication (useful for testing)",
+        "parameters": {
+            "force_refresh": {"type": "boolean", "description": "Force new token even if cached", "required": False},
+        },
+    },
+    "get_token": {
+        "description": "Get the current access token (for debugging)",
+        "parameters": {},
+    },
+    "clear_token": {
+        "description": "Clear the cached token",
+        "parameters": {},
+    },
+}
+
+
+@lru_cache(maxsize=1024)
+def _build_url_cached(base_url: str, url: str) -> str:
+    """Join a relative URL onto base_url; absolute URLs pass through."""
+    if url.startswith(("http://", "https://")) or not base_url:
+        return url
+    return f"{base_url}/{url.lstrip('/')}"
+
+
 class AuthenticatedHTTPConnector(BaseConnector):
     """
     HTTP connector with automatic token-based authentication.
@@ -94,23 +162,24 @@ class AuthenticatedHTTPConnector(BaseConnector):
         super().__init__(credentials)
         self._auth_provider = self._create_auth_provider()
         self._cached_token: Optional[TokenData] = None
+        self._base_url = self.credentials.get("base_url", "").rstrip("/")
+        self._inject_key = self.credentials.get("inject_key", "Authorization")
+        self._inject_prefix = self.credentials.get("inject_prefix", "Bearer ")
+        self._inject_location = self.credentials.get("inject_location", "header")
+
+    # auth_type -> factory method name
+    _AUTH_FACTORIES: dict[str, str] = {
+        "oauth2_client": "_create_oauth2_client_provider",
+        "oauth2_password": "_create_oauth2_password_provider",
+        "login": "_create_login_provider",
+        "api_key_exchange": "_create_api_key_provider",
+        "custom": "_create_custom_provider",
+    }
 
     def _create_auth_provider(self):
         """Create the appropriate auth provider based on credentials."""
-        auth_type = self.credentials.get("auth_type", "none")
-
-        if auth_type == "oauth2_client":
-            return self._create_oauth2_client_provider()
-        elif auth_type == "oauth2_password":
-            return self._create_oauth2_password_provider()
-        elif auth_type == "login":
-            return self._create_login_provider()
-        elif auth_type == "api_key_exchange":
-            return self._create_api_key_provider()
-        elif auth_type == "custom":
-            return self._create_custom_provider()
-        else:
-            return None
+        factory = self._AUTH_FACTORIES.get(self.credentials.get("auth_type", "none"))
+        return getattr(self, factory)() if factory else None
 
     def _create_oauth2_client_provider(self) -> OAuth2Provider:
         """Create OAuth2 client credentials provider."""
@@ -240,72 +309,7 @@ class AuthenticatedHTTPConnector(BaseConnector):
 
     @classmethod
     def get_actions(cls) -> dict[str, dict[str, Any]]:
-        return {
-            "request": {
-                "description": "Make an authenticated HTTP request",
-                "parameters": {
-                    "method": {"type": "string", "description": "HTTP method (GET, POST, PUT, PATCH, DELETE)", "required": True},
-                    "url": {"type": "string", "description": "URL to request (absolute or relative to base_url)", "required": True},
-                    "headers": {"type": "object", "description": "Additional headers", "required": False},
-                    "body": {"type": "object", "description": "Request body", "required": False},
-                    "params": {"type": "object", "description": "Query parameters", "required": False},
-                },
-            },
-            "get": {
-                "description": "Make an authenticated GET request",
-                "parameters": {
-                    "url": {"type": "string", "description": "URL to request", "required": True},
-                    "headers": {"type": "object", "description": "Additional headers", "required": False},
-                    "params": {"type": "object", "description": "Query parameters", "required": False},
-                },
-            },
-            "post": {
-                "description": "Make an authenticated POST request",
-                "parameters": {
-                    "url": {"type": "string", "description": "URL to request", "required": True},
-                    "body": {"type": "object", "description": "Request body", "required": False},
-                    "headers": {"type": "object", "description": "Additional headers", "required": False},
-                    "params": {"type": "object", "description": "Query parameters", "required": False},
-                },
-            },
-            "put": {
-                "description": "Make an authenticated PUT request",
-                "parameters": {
-                    "url": {"type": "string", "description": "URL to request", "required": True},
-                    "body": {"type": "object", "description": "Request body", "required": False},
-                    "headers": {"type": "object", "description": "Additional headers", "required": False},
-                },
-            },
-            "patch": {
-                "description": "Make an authenticated PATCH request",
-                "parameters": {
-                    "url": {"type": "string", "description": "URL to request", "required": True},
-                    "body": {"type": "object", "description": "Request body", "required": False},
-                    "headers": {"type": "object", "description": "Additional headers", "required": False},
-                },
-            },
-            "delete": {
-                "description": "Make an authenticated DELETE request",
-                "parameters": {
-                    "url": {"type": "string", "description": "URL to request", "required": True},
-                    "headers": {"type": "object", "description": "Additional headers", "required": False},
-                },
-            },
-            "authenticate": {
-                "description": "Manually trigger authentication (useful for testing)",
-                "parameters": {
-                    "force_refresh": {"type": "boolean", "description": "Force new token even if cached", "required": False},
-                },
-            },
-            "get_token": {
-                "description": "Get the current access token (for debugging)",
-                "parameters": {},
-            },
-            "clear_token": {
-                "description": "Clear the cached token",
-                "parameters": {},
-            },
-        }
+        return _ACTIONS
 
     async def _get_token(self, force_refresh: bool = False) -> Optional[TokenData]:
         """Get a valid access token."""
@@ -322,10 +326,7 @@ class AuthenticatedHTTPConnector(BaseConnector):
 
     def _build_url(self, url: str) -> str:
         """Build full URL with optional base_url."""
-        base_url = self.credentials.get("base_url", "").rstrip("/")
-        if base_url and not url.startswith(("http://", "https://")):
-            return f"{base_url}/{url.lstrip('/')}"
-        return url
+        return _build_url_cached(self._base_url, url)
 
     async def _authenticated_request(
         self,
@@ -353,15 +354,11 @@ class AuthenticatedHTTPConnector(BaseConnector):
                 )
             else:
                 # Default Bearer token injection
-                inject_key = self.credentials.get("inject_key", "Authorization")
-                inject_prefix = self.credentials.get("inject_prefix", "Bearer ")
-                inject_location = self.credentials.get("inject_location", "header")
-
-                if inject_location == "header":
-                    request_headers[inject_key] = f"{inject_prefix}{token.access_token}"
-                elif inject_location == "query":
+                if self._inject_location == "header":
+                    request_headers[self._inject_key] = self._inject_prefix + token.access_token
+                elif self._inject_location == "query":
                     params = params or {}
-                    params[inject_key] = token.access_token
+                    params[self._inject_key] = token.access_token
 
         # Build full URL
         full_url = self._build_url(url)
@@ -434,6 +431,8 @@ class AuthenticatedHTTPConnector(BaseConnector):
             else:
                 return ConnectorResult(success=False, error=f"Unknown action: {action}")
 
+        # Every failure comes back as a ConnectorResult, like the other
+        # connectors; CancelledError is a BaseException, so it still propagates
         except Exception as e:
             return ConnectorResult(success=False, error=str(e))
 
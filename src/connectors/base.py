@@ -7,10 +7,96 @@ Abstract base class for all service connectors.
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from typing import Any
+import asyncio
+import importlib.util
+import time
 import httpx
 
+# httpx only negotiates HTTP/2 when the optional h2 package is installed
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+class RetryTransport(httpx.AsyncBaseTransport):
+    """
+    Transport wrapper that retries throttled and transiently failing responses.
+
+    429 responses are retried for any method; 502/503/504 only for idempotent
+    methods, since a gateway error can follow a write that already landed and
+    replaying a POST could duplicate it. Retries back off exponentially,
+    honouring a numeric Retry-After header, over the same connection pool.
+    Requests with streamed bodies cannot be replayed and are returned as-is.
+    """
+
+    RETRY_STATUS_CODES = frozenset({429, 502, 503, 504})
+    IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, max_retries: int = 5, max_delay: float = 60.0):
+        self._transport = transport
+        self.max_retries = max_retries
+        self.max_delay = max_delay
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        attempt = 0
+        while True:
+            response = await self._transport.handle_async_request(request)
+            if (
+                response.status_code not in self.RETRY_STATUS_CODES
+                or (response.status_code != 429 and request.method not in self.IDEMPOTENT_METHODS)
+                or attempt >= self.max_retries
+                or not isinstance(request.stream, httpx.ByteStream)
+            ):
+                return response
+            try:
+                delay = float(response.headers.get("Retry-After", 2 ** attempt))
+            except ValueError:  # HTTP-date form
+                delay = 2 ** attempt
+            await response.aclose()
+            await asyncio.sleep(min(delay, self.max_delay))
+            attempt += 1
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+class TokenBucket:
+    """
+    Async token bucket: ``rate`` requests per second with bursts of up to ``burst``.
+
+    Each acquire() reserves the next free slot up front (no lock; the update
+    is atomic on the event loop), so one bucket can be shared by every client
+    talking to the same account, across event loops.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self._interval = 1.0 / rate
+        self._tolerance = (burst - 1) * self._interval
+        self._next = 0.0
+
+    async def acquire(self) -> None:
+        now = time.monotonic()
+        slot = max(self._next, now)
+        self._next = slot + self._interval
+        delay = slot - self._tolerance - now
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class RateLimitTransport(httpx.AsyncBaseTransport):
+    """Transport wrapper that takes a token from a TokenBucket before each request."""
 
-@dataclass
+    def __init__(self, transport: httpx.AsyncBaseTransport, bucket: TokenBucket):
+        self._transport = transport
+        self._bucket = bucket
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await self._bucket.acquire()
+        return await self._transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+@dataclass(slots=True)
 class ConnectorResult:
     """Result of a connector action."""
     success: bool
@@ -36,12 +122,25 @@ class BaseConnector(ABC):
 
     def __init__(self, credentials: dict[str, str] | None = None):
         self.credentials = credentials or {}
-        self.client = httpx.AsyncClient(timeout=30.0)
+        self.client = self._create_client()
+
+    def _create_client(self) -> httpx.AsyncClient:
+        """Create the HTTP client; override to set a base URL, default headers or pool limits."""
+        return httpx.AsyncClient(timeout=30.0)
 
     async def close(self):
         """Close the HTTP client."""
         await self.client.aclose()
 
+    async def aclose(self):
+        await self.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
     @abstractmethod
     async def execute(self, action: str, inputs: dict[str, Any]) -> ConnectorResult:
         """Execute an action with the given inputs."""
@@ -0,0 +1,217 @@
+"""
+Connector Cache
+
+Small in-memory LRU cache with per-entry expiry, shared by connectors that
+memoize API responses or signed URLs, in-flight request coalescing for
+their idempotent reads, and a bounded pool for their long-lived clients.
+"""
+
+import asyncio
+import copy
+import functools
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+
+class TTLCache:
+    """LRU cache whose entries expire ``ttl`` seconds after being set."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[Hashable, tuple[Any, float]] = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value, or ``default`` if missing or expired."""
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        value, expires_at = entry
+        if time.monotonic() >= expires_at:
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a value, evicting the least recently used entry when full."""
+        self._data[key] = (value, time.monotonic() + (self.ttl if ttl is None else ttl))
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove a key and return its value (expired or not)."""
+        entry = self._data.pop(key, None)
+        return default if entry is None else entry[0]
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# Caches that outlive a single connector instance (connectors are built per
+# call), by namespace; least recently used namespaces are dropped first
+_SHARED_CACHES = TTLCache(maxsize=4096, ttl=float("inf"))
+
+
+def shared_cache(namespace: Hashable, maxsize: int = 1024, ttl: float = 60.0) -> TTLCache:
+    """
+    Get the process-wide TTLCache for ``namespace``, creating it on first use.
+
+    Include the account's credentials in the namespace so tenants never see
+    each other's entries.
+    """
+    cache = _SHARED_CACHES.get(namespace)
+    if cache is None:
+        cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        _SHARED_CACHES.set(namespace, cache)
+    return cache
+
+
+class ClientPool:
+    """
+    Bounded LRU of API clients shared by connector instances, keyed by
+    credentials identity.
+
+    When full, the least recently used client is evicted and closed with
+    ``close`` after ``grace`` seconds, so calls already running on it can
+    finish. ``aclose()`` closes every client; call it on application shutdown.
+    """
+
+    def __init__(self, close: Callable[[Any], Awaitable[Any]], maxsize: int = 64, grace: float = 60.0):
+        self.maxsize = maxsize
+        self.grace = grace
+        self._close = close
+        self._clients: OrderedDict[Hashable, Any] = OrderedDict()
+        self._evicted: dict[asyncio.Task, Any] = {}
+
+    def get(self, key: Hashable) -> Any:
+        """Return the pooled client, or None."""
+        client = self._clients.get(key)
+        if client is not None:
+            self._clients.move_to_end(key)
+        return client
+
+    def set(self, key: Hashable, client: Any) -> None:
+        """Pool a client, evicting the least recently used one when full."""
+        previous = self._clients.pop(key, None)
+        if previous is not None and previous is not client:
+            self._evict(previous)
+        self._clients[key] = client
+        while len(self._clients) > self.maxsize:
+            self._evict(self._clients.popitem(last=False)[1])
+
+    def _evict(self, client: Any) -> None:
+        try:
+            task = asyncio.get_running_loop().create_task(self._close_later(client))
+        except RuntimeError:
+            return  # no event loop, so nothing can be using it
+        self._evicted[task] = client
+        task.add_done_callback(self._forget)
+
+    async def _close_later(self, client: Any) -> None:
+        await asyncio.sleep(self.grace)
+        await self._close(client)
+
+    def _forget(self, task: asyncio.Task) -> None:
+        self._evicted.pop(task, None)
+        if not task.cancelled():
+            # Nothing awaits the task; mark a failed close retrieved
+            task.exception()
+
+    async def aclose(self) -> None:
+        """Close every pooled and evicted client, raising the first failure after trying them all."""
+        clients = [*self._clients.values(), *self._evicted.values()]
+        for task in list(self._evicted):
+            task.cancel()
+        self._clients.clear()
+        self._evicted.clear()
+        results = await asyncio.gather(*(self._close(client) for client in clients), return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+
+class InflightRequests:
+    """
+    Collapse concurrent identical calls into one.
+
+    A caller whose key is already in flight awaits the same task instead of
+    starting its own, so all of them get its result (or exception). The key
+    is forgotten as soon as the task finishes; nothing is cached.
+    """
+
+    def __init__(self):
+        self._tasks: dict[Hashable, asyncio.Task] = {}
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._tasks[key] = task
+            task.add_done_callback(functools.partial(self._forget, key))
+        # Shielded, so one caller being cancelled doesn't cancel the others' request
+        return await asyncio.shield(task)
+
+    def discard(self, match: Callable[[Hashable], bool]) -> None:
+        """
+        Stop sharing the in-flight calls whose key matches: later callers start
+        a fresh request, while those already waiting still get the old one.
+        """
+        for key in [key for key in self._tasks if match(key)]:
+            del self._tasks[key]
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        # The key may already belong to a newer call, after discard()
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        if not task.cancelled():
+            # Mark the exception retrieved: callers that went away never will
+            task.exception()
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+
+def coalesced(method: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """
+    Decorate an idempotent read so concurrent calls with the same arguments
+    share one request, through the instance's ``_inflight`` InflightRequests.
+
+    Connectors are built per call, so ``_inflight`` should be module-level and
+    the key includes the instance's ``_account`` to keep tenants apart. List
+    arguments are keyed as tuples; only use on methods without side effects,
+    and mark the account's writes with ``invalidates_reads``. Each caller gets
+    its own copy of the shared result.
+    """
+    @functools.wraps(method)
+    async def wrapper(self, *args):
+        key = (
+            self._account,
+            method.__name__,
+            *(tuple(arg) if isinstance(arg, list) else arg for arg in args),
+        )
+        return copy.deepcopy(await self._inflight.run(key, lambda: method(self, *args)))
+    return wrapper
+
+
+def invalidates_reads(method: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """
+    Decorate a write so reads coalesced for the same account afterwards don't
+    join one that started before it, and so can't return pre-write data.
+    """
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        try:
+            return await method(self, *args, **kwargs)
+        finally:
+            account = self._account
+            self._inflight.discard(lambda key: key[0] == account)
+    return wrapper
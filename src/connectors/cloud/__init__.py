@@ -2,14 +2,21 @@
 Cloud Storage Connectors
 
 Connect to cloud storage providers for file operations.
+
+Connector classes are imported on first attribute access (PEP 562), so
+importing this package only loads the provider modules that are used.
 """
 
-from .aws_s3 import AWSS3Connector
-from .azure_blob import AzureBlobConnector
-from .gcs import GCSConnector
-from .dropbox import DropboxConnector
-from .box import BoxConnector
-from .onedrive import OneDriveConnector
+import importlib
+
+_CONNECTOR_MODULES = {
+    "AWSS3Connector": ".aws_s3",
+    "AzureBlobConnector": ".azure_blob",
+    "GCSConnector": ".gcs",
+    "DropboxConnector": ".dropbox",
+    "BoxConnector": ".box",
+    "OneDriveConnector": ".onedrive",
+}
 
 __all__ = [
     "AWSS3Connector",
@@ -19,3 +26,16 @@ __all__ = [
     "BoxConnector",
     "OneDriveConnector",
 ]
+
+
+def __getattr__(name: str):
+    module_name = _CONNECTOR_MODULES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __package__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
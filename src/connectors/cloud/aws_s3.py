@@ -4,9 +4,171 @@ AWS S3 Connector
 Connect to Amazon S3 for object storage operations.
 """
 
-from typing import Any
-import base64
+from collections import Counter, OrderedDict
+from typing import Any, Hashable
+import asyncio
 from ..base import BaseConnector, ConnectorResult
+from ..cache import ClientPool, shared_cache
+from ..codec import decode_content, encode_content, gunzip_content, gzip_content, timestamp_formatter
+
+# Bodies above this size are sent as a parallel multipart upload
+_MULTIPART_THRESHOLD = 16 * 1024 * 1024
+_MULTIPART_PART_SIZE = 16 * 1024 * 1024
+
+# Downloads GET the first range of this size; larger objects fetch the rest
+# as concurrent byte-range GETs
+_RANGED_DOWNLOAD_PART_SIZE = 16 * 1024 * 1024
+
+# Cap on in-flight S3 requests per connector for fanned-out operations
+_MAX_CONCURRENT_REQUESTS = 16
+
+# Objects above this size are copied server-side as parallel UploadPartCopy
+# ranges (copy_object itself is capped at 5 GB)
+_MULTIPART_COPY_THRESHOLD = 100 * 1024 * 1024
+_MULTIPART_COPY_PART_SIZE = 100 * 1024 * 1024
+
+# Object headers CreateMultipartUpload takes from the copy source's HEAD, which
+# copy_object carries over on its own
+_COPIED_HEADERS = ("ContentType", "ContentEncoding", "CacheControl", "ContentDisposition", "Metadata")
+
+# ListObjectsV2 returns at most this many keys per call
+_LIST_MAX_KEYS = 1000
+
+# DeleteObjects accepts at most this many keys per request
+_DELETE_BATCH_SIZE = 1000
+
+# A signed URL is reused only while it keeps nearly its full lifetime: for
+# this fraction of it, and never longer than the cap (seconds)
+_URL_REUSE_FRACTION = 0.05
+_URL_REUSE_MAX = 300
+
+# double_write stores a second copy under key + this suffix; racing reads
+# fetch both and keep whichever answers first. Other writes leave shadows
+# alone, so only race keys that are always written with double_write
+_SHADOW_SUFFIX = ".shadow"
+
+# Which copy won each racing download ("primary" / "shadow"), process-wide
+RACE_WINS: Counter = Counter()
+
+
+class _InlineStore:
+    """
+    Non-durable, in-process LRU of tiny objects uploaded with inline_bypass.
+
+    Objects live only in this worker's memory and are evicted once the byte
+    cap is reached; use it for fixtures, local dev and ephemeral blobs only.
+    Downloads, copies, moves and listings see inline objects (copies of them
+    stay inline); presigned URLs are refused, since S3 has no such object.
+    Entries are scoped to an account (credentials and endpoint), so a tenant
+    only ever sees its own objects. Methods never await, so they are atomic
+    with respect to other coroutines.
+    """
+
+    max_object_size = 1024 * 1024
+    max_total_size = 64 * 1024 * 1024
+    # Evicted locations remembered so reads fail instead of falling back to S3
+    max_evicted = 65536
+
+    def __init__(self):
+        self._objects: OrderedDict[tuple, tuple[bytes, str | None]] = OrderedDict()
+        self._evicted: OrderedDict[tuple, None] = OrderedDict()
+        self._size = 0
+
+    @staticmethod
+    def _key(account: Hashable, bucket: str, key: str) -> tuple:
+        return (account, f"inline://{bucket}/{key}")
+
+    def put(self, account: Hashable, bucket: str, key: str, content: bytes, content_type: str | None) -> None:
+        self.pop(account, bucket, key)
+        self._objects[self._key(account, bucket, key)] = (bytes(content), content_type)
+        self._size += len(content)
+        while self._size > self.max_total_size:
+            evicted_key, (evicted, _) = self._objects.popitem(last=False)
+            self._size -= len(evicted)
+            self._evicted[evicted_key] = None
+            if len(self._evicted) > self.max_evicted:
+                self._evicted.popitem(last=False)
+
+    def get(self, account: Hashable, bucket: str, key: str) -> tuple[bytes, str | None] | None:
+        """Return (content, content_type), or None if the key was never stored inline."""
+        inline_key = self._key(account, bucket, key)
+        entry = self._objects.get(inline_key)
+        if entry is not None:
+            self._objects.move_to_end(inline_key)
+        elif inline_key in self._evicted:
+            # Whatever S3 holds under this key is older than the inline write
+            raise LookupError(f"{inline_key[1]} was evicted from the in-memory store")
+        return entry
+
+    def pop(self, account: Hashable, bucket: str, key: str) -> bool:
+        inline_key = self._key(account, bucket, key)
+        self._evicted.pop(inline_key, None)
+        entry = self._objects.pop(inline_key, None)
+        if entry is None:
+            return False
+        self._size -= len(entry[0])
+        return True
+
+    def list(self, account: Hashable, bucket: str, prefix: str = "") -> list[tuple[str, int]]:
+        """Return (key, size) for the account's inline objects under bucket/prefix, by key."""
+        location = f"inline://{bucket}/"
+        return sorted(
+            (path[len(location):], len(content))
+            for (owner, path), (content, _) in self._objects.items()
+            if owner == account and path.startswith(location + prefix)
+        )
+
+
+_INLINE_STORE = _InlineStore()
+
+# Clients shared by every connector instance with the same credentials and
+# endpoint, so TLS connections survive across workflow steps. Each pins up to
+# 64 connections, so the pool is bounded; evicted clients get a long grace
+# period for transfers still running on them.
+# key -> (client context manager, client)
+_CLIENT_POOL = ClientPool(lambda entry: entry[0].__aexit__(None, None, None), maxsize=16, grace=300.0)
+_CLIENT_POOL_LOCK = asyncio.Lock()
+
+
+async def close_client_pool():
+    """Close all pooled S3 clients. Call on application shutdown."""
+    async with _CLIENT_POOL_LOCK:
+        await _CLIENT_POOL.aclose()
+
+
+async def _gather_parts(coros) -> list:
+    """
+    Run part requests concurrently, like gather; on the first failure the
+    others are cancelled and awaited before it propagates, so nothing is
+    still writing parts once the caller aborts the upload.
+    """
+    tasks = [asyncio.ensure_future(coro) for coro in coros]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+def _inline_infos(objects: list[tuple[str, int]], raw: bool) -> list[dict]:
+    """Listing entries for inline objects, flagged so callers know they are not in S3."""
+    if raw:
+        return [{"Key": key, "Size": size, "Inline": True} for key, size in objects]
+    return [{"key": key, "size": size, "last_modified": None, "inline": True} for key, size in objects]
+
+
+def _object_infos(contents: list[dict], format_timestamp) -> list[dict]:
+    """Summarize a page of ListObjectsV2 entries (one call per page, not per row)."""
+    return [
+        {
+            "key": obj["Key"],
+            "size": obj["Size"],
+            "last_modified": format_timestamp(obj["LastModified"]),
+        }
+        for obj in contents
+    ]
 
 
 class AWSS3Connector(BaseConnector):
@@ -18,228 +180,600 @@ class AWSS3Connector(BaseConnector):
         self.secret_access_key = credentials.get("secret_access_key")
         self.region = credentials.get("region", "us-east-1")
         self.endpoint_url = credentials.get("endpoint_url")  # For S3-compatible storage
+        # Scopes the inline store: same credentials against the same endpoint
+        self._account = (self.access_key_id, self.secret_access_key, self.endpoint_url)
         self._client = None
+        # Presigned URLs outlive this instance; shared per credentials and endpoint
+        self._url_cache = shared_cache(
+            ("aws_s3", "urls", self.access_key_id, self.secret_access_key, self.region, self.endpoint_url),
+            maxsize=1024,
+        )
+        self._semaphore = asyncio.Semaphore(_MAX_CONCURRENT_REQUESTS)
 
     async def _get_client(self):
-        """Get S3 client."""
+        """Get async S3 client (aiobotocore) from the process-wide pool."""
         if self._client is None:
-            import boto3
-            session = boto3.Session(
-                aws_access_key_id=self.access_key_id,
-                aws_secret_access_key=self.secret_access_key,
-                region_name=self.region,
-            )
-            kwargs = {"endpoint_url": self.endpoint_url} if self.endpoint_url else {}
-            self._client = session.client("s3", **kwargs)
+            key = (self.access_key_id, self.secret_access_key, self.region, self.endpoint_url)
+            async with _CLIENT_POOL_LOCK:
+                entry = _CLIENT_POOL.get(key)
+                if entry is None:
+                    from aiobotocore.config import AioConfig
+                    from aiobotocore.session import get_session
+                    kwargs = {"endpoint_url": self.endpoint_url} if self.endpoint_url else {}
+                    client_cm = get_session().create_client(
+                        "s3",
+                        aws_access_key_id=self.access_key_id,
+                        aws_secret_access_key=self.secret_access_key,
+                        region_name=self.region,
+                        config=AioConfig(
+                            max_pool_connections=64,
+                            tcp_keepalive=True,
+                            connect_timeout=3,
+                            read_timeout=30,
+                            # Adaptive mode backs off per endpoint on SlowDown/503 throttling
+                            retries={"max_attempts": 10, "mode": "adaptive"},
+                        ),
+                        **kwargs,
+                    )
+                    entry = (client_cm, await client_cm.__aenter__())
+                    _CLIENT_POOL.set(key, entry)
+            self._client = entry[1]
         return self._client
 
-    @classmethod
-    def get_actions(cls) -> dict[str, dict[str, Any]]:
-        return {
-            "upload": {
-                "description": "Upload a file to S3",
-                "parameters": {
-                    "bucket": {"type": "string", "description": "Bucket name", "required": True},
-                    "key": {"type": "string", "description": "Object key (path)", "required": True},
-                    "content": {"type": "string", "description": "Base64-encoded content", "required": True},
-                    "content_type": {"type": "string", "description": "MIME type", "required": False},
-                },
+    async def _call(self, method, **kwargs):
+        """Await a client call, bounded by the connector's concurrency limit."""
+        async with self._semaphore:
+            return await method(**kwargs)
+
+    # Built once at import; get_actions() returns this shared dict, so treat it as read-only
+    _ACTIONS: dict[str, dict[str, Any]] = {
+        "upload": {
+            "description": "Upload a file to S3",
+            "parameters": {
+                "bucket": {"type": "string", "description": "Bucket name", "required": True},
+                "key": {"type": "string", "description": "Object key (path)", "required": True},
+                "content": {"type": "string", "description": "Base64-encoded content (or raw bytes)", "required": True},
+                "content_type": {"type": "string", "description": "MIME type", "required": False},
+                "inline_bypass": {"type": "boolean", "description": "Keep payloads up to 1 MB in this worker's memory instead of S3 (non-durable; the result has inline: true)", "required": False},
+                "double_write": {"type": "boolean", "description": "Also write a copy to key.shadow for racing downloads", "required": False},
+                "compress": {"type": "boolean", "description": "Gzip the body and store it with Content-Encoding: gzip (download decompresses it)", "required": False},
             },
-            "download": {
-                "description": "Download a file from S3",
-                "parameters": {
-                    "bucket": {"type": "string", "description": "Bucket name", "required": True},
-                    "key": {"type": "string", "description": "Object key", "required": True},
-                },
+        },
+        "download": {
+            "description": "Download a file from S3",
+            "parameters": {
+                "bucket": {"type": "string", "description": "Bucket name", "required": True},
+                "key": {"type": "string", "description": "Object key", "required": True},
+                "racing": {"type": "boolean", "description": "GET key and key.shadow in parallel and return the first response (only for keys always written with double_write)", "required": False},
             },
-            "delete": {
-                "description": "Delete an object",
-                "parameters": {
-                    "bucket": {"type": "string", "description": "Bucket name", "required": True},
-                    "key": {"type": "string", "description": "Object key", "required": True},
-                },
+        },
+        "delete": {
+            "description": "Delete an object",
+            "parameters": {
+                "bucket": {"type": "string", "description": "Bucket name", "required": True},
+                "key": {"type": "string", "description": "Object key", "required": True},
+                "double_write": {"type": "boolean", "description": "Also delete the key.shadow copy", "required": False},
             },
-            "list_objects": {
-                "description": "List objects in a bucket",
-                "parameters": {
-                    "bucket": {"type": "string", "description": "Bucket name", "required": True},
-                    "prefix": {"type": "string", "description": "Key prefix", "required": False},
-                    "max_keys": {"type": "integer", "description": "Max objects to return", "required": False},
-                },
+        },
+        "list_objects": {
+            "description": "List objects in a bucket",
+            "parameters": {
+                "bucket": {"type": "string", "description": "Bucket name", "required": True},
+                "prefix": {"type": "string", "description": "Key prefix", "required": False},
+                "max_keys": {"type": "integer", "description": "Max objects to return (default and limit 1000; resume with list_objects_stream)", "required": False},
+                "timestamp_format": {"type": "string", "description": "iso (default), epoch, or none", "required": False},
+                "raw": {"type": "boolean", "description": "Return S3 entries unchanged (AWS field names, datetime values)", "required": False},
             },
-            "copy": {
-                "description": "Copy an object",
-                "parameters": {
-                    "source_bucket": {"type": "string", "description": "Source bucket", "required": True},
-                    "source_key": {"type": "string", "description": "Source key", "required": True},
-                    "dest_bucket": {"type": "string", "description": "Destination bucket", "required": True},
-                    "dest_key": {"type": "string", "description": "Destination key", "required": True},
-                },
+        },
+        "list_objects_stream": {
+            "description": "List one page of objects; pass continuation_token back to resume",
+            "parameters": {
+                "bucket": {"type": "string", "description": "Bucket name", "required": True},
+                "prefix": {"type": "string", "description": "Key prefix", "required": False},
+                "max_keys": {"type": "integer", "description": "Max objects per page", "required": False},
+                "timestamp_format": {"type": "string", "description": "iso (default), epoch, or none", "required": False},
+                "raw": {"type": "boolean", "description": "Return S3 entries unchanged (AWS field names, datetime values)", "required": False},
+                "continuation_token": {"type": "string", "description": "Token from the previous page", "required": False},
             },
-            "move": {
-                "description": "Move an object (copy + delete)",
-                "parameters": {
-                    "source_bucket": {"type": "string", "description": "Source bucket", "required": True},
-                    "source_key": {"type": "string", "description": "Source key", "required": True},
-                    "dest_bucket": {"type": "string", "description": "Destination bucket", "required": True},
-                    "dest_key": {"type": "string", "description": "Destination key", "required": True},
-                },
+        },
+        "copy": {
+            "description": "Copy an object",
+            "parameters": {
+                "source_bucket": {"type": "string", "description": "Source bucket", "required": True},
+                "source_key": {"type": "string", "description": "Source key", "required": True},
+                "dest_bucket": {"type": "string", "description": "Destination bucket", "required": True},
+                "dest_key": {"type": "string", "description": "Destination key", "required": True},
             },
-            "get_presigned_url": {
-                "description": "Generate a presigned URL",
-                "parameters": {
-                    "bucket": {"type": "string", "description": "Bucket name", "required": True},
-                    "key": {"type": "string", "description": "Object key", "required": True},
-                    "operation": {"type": "string", "description": "get_object or put_object", "required": False},
-                    "expires_in": {"type": "integer", "description": "URL expiry in seconds", "required": False},
-                },
+        },
+        "move": {
+            "description": "Move an object (copy + delete)",
+            "parameters": {
+                "source_bucket": {"type": "string", "description": "Source bucket", "required": True},
+                "source_key": {"type": "string", "description": "Source key", "required": True},
+                "dest_bucket": {"type": "string", "description": "Destination bucket", "required": True},
+                "dest_key": {"type": "string", "description": "Destination key", "required": True},
             },
-            "list_buckets": {
-                "description": "List all buckets",
-                "parameters": {},
+        },
+        "bulk_move": {
+            "description": "Move many objects; copies run concurrently and deletes are batched",
+            "parameters": {
+                "moves": {"type": "array", "description": "List of {source_bucket, source_key, dest_bucket, dest_key}", "required": True},
             },
-            "create_bucket": {
-                "description": "Create a new bucket",
-                "parameters": {
-                    "bucket": {"type": "string", "description": "Bucket name", "required": True},
-                },
+        },
+        "get_presigned_url": {
+            "description": "Generate a presigned URL",
+            "parameters": {
+                "bucket": {"type": "string", "description": "Bucket name", "required": True},
+                "key": {"type": "string", "description": "Object key", "required": True},
+                "operation": {"type": "string", "description": "get_object or put_object", "required": False},
+                "expires_in": {"type": "integer", "description": "URL expiry in seconds", "required": False},
             },
-            "delete_bucket": {
-                "description": "Delete a bucket",
-                "parameters": {
-                    "bucket": {"type": "string", "description": "Bucket name", "required": True},
-                },
+        },
+        "list_buckets": {
+            "description": "List all buckets",
+            "parameters": {
+                "timestamp_format": {"type": "string", "description": "iso (default), epoch, or none", "required": False},
+                "raw": {"type": "boolean", "description": "Return S3 entries unchanged (AWS field names, datetime values)", "required": False},
             },
-            "head_object": {
-                "description": "Get object metadata",
-                "parameters": {
-                    "bucket": {"type": "string", "description": "Bucket name", "required": True},
-                    "key": {"type": "string", "description": "Object key", "required": True},
-                },
+        },
+        "create_bucket": {
+            "description": "Create a new bucket",
+            "parameters": {
+                "bucket": {"type": "string", "description": "Bucket name", "required": True},
             },
-        }
+        },
+        "delete_bucket": {
+            "description": "Delete a bucket",
+            "parameters": {
+                "bucket": {"type": "string", "description": "Bucket name", "required": True},
+            },
+        },
+        "head_object": {
+            "description": "Get object metadata",
+            "parameters": {
+                "bucket": {"type": "string", "description": "Bucket name", "required": True},
+                "key": {"type": "string", "description": "Object key", "required": True},
+            },
+        },
+        "select": {
+            "description": "Filter a CSV, JSON or Parquet object server-side with S3 Select SQL (billed per byte scanned and returned)",
+            "parameters": {
+                "bucket": {"type": "string", "description": "Bucket name", "required": True},
+                "key": {"type": "string", "description": "Object key", "required": True},
+                "expression": {"type": "string", "description": "SQL, e.g. SELECT s.id FROM S3Object s WHERE s.status = 'open'", "required": True},
+                "input_serialization": {"type": "object", "description": "S3 InputSerialization, e.g. {\"Parquet\": {}} (default: CSV with header)", "required": False},
+                "output_serialization": {"type": "object", "description": "S3 OutputSerialization (default: JSON lines)", "required": False},
+            },
+        },
+    }
+
+    @classmethod
+    def get_actions(cls) -> dict[str, dict[str, Any]]:
+        return cls._ACTIONS
+
+    # action -> handler method; every handler takes (client, params)
+    _DISPATCH: dict[str, str] = {
+        "upload": "_upload",
+        "download": "_download",
+        "delete": "_delete",
+        "list_objects": "_list_objects",
+        "list_objects_stream": "_list_objects_stream",
+        "copy": "_copy",
+        "move": "_move",
+        "bulk_move": "_bulk_move",
+        "get_presigned_url": "_get_presigned_url",
+        "list_buckets": "_list_buckets",
+        "create_bucket": "_create_bucket",
+        "delete_bucket": "_delete_bucket",
+        "head_object": "_head_object",
+        "select": "_select",
+    }
 
     async def execute(self, action: str, params: dict[str, Any]) -> ConnectorResult:
+        handler_name = self._DISPATCH.get(action)
+        if handler_name is None:
+            return ConnectorResult(success=False, error=f"Unknown action: {action}")
         try:
             client = await self._get_client()
-
-            if action == "upload":
-                return await self._upload(client, params)
-            elif action == "download":
-                return await self._download(client, params["bucket"], params["key"])
-            elif action == "delete":
-                return await self._delete(client, params["bucket"], params["key"])
-            elif action == "list_objects":
-                return await self._list_objects(client, params)
-            elif action == "copy":
-                return await self._copy(client, params)
-            elif action == "move":
-                return await self._move(client, params)
-            elif action == "get_presigned_url":
-                return await self._get_presigned_url(client, params)
-            elif action == "list_buckets":
-                return await self._list_buckets(client)
-            elif action == "create_bucket":
-                return await self._create_bucket(client, params["bucket"])
-            elif action == "delete_bucket":
-                return await self._delete_bucket(client, params["bucket"])
-            elif action == "head_object":
-                return await self._head_object(client, params["bucket"], params["key"])
-            else:
-                return ConnectorResult(success=False, error=f"Unknown action: {action}")
+            return await getattr(self, handler_name)(client, params)
         except Exception as e:
+            # botocore ClientError; transient codes were already retried by the client
+            response = getattr(e, "response", None)
+            if isinstance(response, dict) and "Error" in response:
+                return ConnectorResult(
+                    success=False,
+                    error=f"{response['Error'].get('Code')}: {response['Error'].get('Message')}",
+                    status_code=response.get("ResponseMetadata", {}).get("HTTPStatusCode"),
+                )
             return ConnectorResult(success=False, error=str(e))
 
     async def _upload(self, client, params: dict) -> ConnectorResult:
-        content = base64.b64decode(params["content"])
+        content = decode_content(params["content"])
         extra_args = {}
         if params.get("content_type"):
             extra_args["ContentType"] = params["content_type"]
 
-        client.put_object(
-            Bucket=params["bucket"],
-            Key=params["key"],
-            Body=content,
-            **extra_args
-        )
+        if params.get("inline_bypass") and len(content) <= _InlineStore.max_object_size:
+            _INLINE_STORE.put(self._account, params["bucket"], params["key"], content, params.get("content_type"))
+            return ConnectorResult(
+                success=True, data={"key": params["key"], "bucket": params["bucket"], "inline": True}
+            )
+        # A durable write replaces any inline copy of the same key
+        _INLINE_STORE.pop(self._account, params["bucket"], params["key"])
+
+        if params.get("compress"):
+            content = gzip_content(content)
+            extra_args["ContentEncoding"] = "gzip"
+
+        if params.get("double_write"):
+            await asyncio.gather(
+                self._put(client, params["bucket"], params["key"], content, extra_args),
+                self._put(client, params["bucket"], params["key"] + _SHADOW_SUFFIX, content, extra_args),
+            )
+        else:
+            await self._put(client, params["bucket"], params["key"], content, extra_args)
         return ConnectorResult(success=True, data={"key": params["key"], "bucket": params["bucket"]})
 
-    async def _download(self, client, bucket: str, key: str) -> ConnectorResult:
-        response = client.get_object(Bucket=bucket, Key=key)
-        content = response["Body"].read()
+    async def _put(self, client, bucket: str, key: str, content: bytes, extra_args: dict):
+        if len(content) > _MULTIPART_THRESHOLD:
+            await self._multipart_upload(client, bucket, key, content, extra_args)
+        else:
+            await client.put_object(Bucket=bucket, Key=key, Body=content, **extra_args)
+
+    async def _multipart_upload(self, client, bucket: str, key: str, content: bytes, extra_args: dict):
+        """Upload a large body as concurrently sent multipart parts."""
+        upload = await client.create_multipart_upload(Bucket=bucket, Key=key, **extra_args)
+        upload_id = upload["UploadId"]
+
+        async def upload_part(number: int, offset: int) -> dict:
+            # Slice only once a slot is free, so at most the in-flight parts
+            # are copied out of the body at any time
+            async with self._semaphore:
+                return await client.upload_part(
+                    Bucket=bucket,
+                    Key=key,
+                    UploadId=upload_id,
+                    PartNumber=number,
+                    Body=content[offset:offset + _MULTIPART_PART_SIZE],
+                )
+
+        try:
+            offsets = range(0, len(content), _MULTIPART_PART_SIZE)
+            responses = await _gather_parts(
+                upload_part(number, offset)
+                for number, offset in enumerate(offsets, start=1)
+            )
+            parts = [
+                {"PartNumber": number, "ETag": response["ETag"]}
+                for number, response in enumerate(responses, start=1)
+            ]
+            await client.complete_multipart_upload(
+                Bucket=bucket,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": parts},
+            )
+        except BaseException:
+            await client.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+            raise
+
+    async def _download(self, client, params: dict) -> ConnectorResult:
+        bucket, key = params["bucket"], params["key"]
+        inline = _INLINE_STORE.get(self._account, bucket, key)
+        if inline is not None:
+            content, content_type = inline
+            return ConnectorResult(
+                success=True,
+                data={
+                    "content": encode_content(content),
+                    "content_type": content_type,
+                    "content_length": len(content),
+                }
+            )
+
+        if params.get("racing"):
+            response, content = await self._racing_download(client, bucket, key)
+        else:
+            response, content = await self._ranged_download(client, bucket, key)
+
+        # S3 stores gzip-encoded bodies as-is, so undo compress=True here
+        if response.get("ContentEncoding") == "gzip":
+            content = gunzip_content(content)
+
         return ConnectorResult(
             success=True,
             data={
-                "content": base64.b64encode(content).decode(),
+                "content": encode_content(content),
                 "content_type": response.get("ContentType"),
-                "content_length": response.get("ContentLength"),
+                "content_length": len(content),
             }
         )
 
-    async def _delete(self, client, bucket: str, key: str) -> ConnectorResult:
-        client.delete_object(Bucket=bucket, Key=key)
-        return ConnectorResult(success=True, data={"deleted": key})
+    async def _get(self, client, bucket: str, key: str) -> tuple[dict, bytes]:
+        response = await client.get_object(Bucket=bucket, Key=key)
+        async with response["Body"] as body:
+            return response, await body.read()
+
+    async def _racing_download(self, client, bucket: str, key: str) -> tuple[dict, bytes]:
+        """GET the object and its double_write shadow, keeping the first success."""
+        tasks = {
+            asyncio.create_task(self._get(client, bucket, key)): "primary",
+            asyncio.create_task(self._get(client, bucket, key + _SHADOW_SUFFIX)): "shadow",
+        }
+        pending = set(tasks)
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        RACE_WINS[tasks[task]] += 1
+                        return task.result()
+                    # Prefer reporting the primary's failure (e.g. NoSuchKey)
+                    if error is None or tasks[task] == "primary":
+                        error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _ranged_download(self, client, bucket: str, key: str) -> tuple[dict, bytes | bytearray]:
+        """
+        GET the first range, which also reports the object size; larger objects
+        fetch the rest as concurrent byte-range GETs into one preallocated buffer.
+        """
+        try:
+            response = await client.get_object(Bucket=bucket, Key=key, Range=f"bytes=0-{_RANGED_DOWNLOAD_PART_SIZE - 1}")
+        except Exception as e:
+            # Empty objects have no byte 0 to range over
+            if getattr(e, "response", {}).get("Error", {}).get("Code") != "InvalidRange":
+                raise
+            return await self._get(client, bucket, key)
+        async with response["Body"] as body:
+            first = await body.read()
+        # "bytes 0-16777215/123456789"; absent if the whole object came back
+        content_range = response.get("ContentRange")
+        size = int(content_range.rpartition("/")[2]) if content_range else len(first)
+        if size <= len(first):
+            return response, first
+
+        buffer = bytearray(size)
+        view = memoryview(buffer)
+        view[:len(first)] = first
+        etag = response["ETag"]
+
+        async def fetch(start: int):
+            end = min(start + _RANGED_DOWNLOAD_PART_SIZE, size) - 1
+            async with self._semaphore:
+                # Pinned to the first part's version: an overwrite mid-download
+                # fails with 412 instead of stitching two versions together
+                part = await client.get_object(Bucket=bucket, Key=key, Range=f"bytes={start}-{end}", IfMatch=etag)
+                async with part["Body"] as body:
+                    view[start:end + 1] = await body.read()
+
+        await _gather_parts(fetch(start) for start in range(len(first), size, _RANGED_DOWNLOAD_PART_SIZE))
+        return response, buffer
+
+    async def _delete(self, client, params: dict) -> ConnectorResult:
+        if not _INLINE_STORE.pop(self._account, params["bucket"], params["key"]):
+            await client.delete_object(Bucket=params["bucket"], Key=params["key"])
+        if params.get("double_write"):
+            await client.delete_object(Bucket=params["bucket"], Key=params["key"] + _SHADOW_SUFFIX)
+        return ConnectorResult(success=True, data={"deleted": params["key"]})
 
     async def _list_objects(self, client, params: dict) -> ConnectorResult:
+        # One ListObjectsV2 call, as before paging was added; a truncated
+        # listing returns a continuation_token for list_objects_stream, so
+        # large buckets are never held in memory whole
+        return await self._list_objects_stream(
+            client, {**params, "max_keys": params.get("max_keys") or _LIST_MAX_KEYS, "continuation_token": None}
+        )
+
+    async def _list_objects_stream(self, client, params: dict) -> ConnectorResult:
+        format_timestamp = timestamp_formatter(params.get("timestamp_format"))
         kwargs = {"Bucket": params["bucket"]}
         if params.get("prefix"):
             kwargs["Prefix"] = params["prefix"]
         if params.get("max_keys"):
             kwargs["MaxKeys"] = params["max_keys"]
+        if params.get("continuation_token"):
+            kwargs["ContinuationToken"] = params["continuation_token"]
 
-        response = client.list_objects_v2(**kwargs)
-        objects = [
-            {
-                "key": obj["Key"],
-                "size": obj["Size"],
-                "last_modified": obj["LastModified"].isoformat(),
+        response = await client.list_objects_v2(**kwargs)
+        contents = response.get("Contents", [])
+        objects = contents if params.get("raw") else _object_infos(contents, format_timestamp)
+        if not params.get("continuation_token"):
+            # Inline objects lead the first page only
+            objects[:0] = _inline_infos(
+                _INLINE_STORE.list(self._account, params["bucket"], params.get("prefix", "")), params.get("raw")
+            )
+        return ConnectorResult(
+            success=True,
+            data={
+                "objects": objects,
+                "count": len(objects),
+                "continuation_token": response.get("NextContinuationToken"),
             }
-            for obj in response.get("Contents", [])
-        ]
-        return ConnectorResult(success=True, data={"objects": objects, "count": len(objects)})
+        )
 
     async def _copy(self, client, params: dict) -> ConnectorResult:
-        client.copy_object(
-            Bucket=params["dest_bucket"],
-            Key=params["dest_key"],
-            CopySource={"Bucket": params["source_bucket"], "Key": params["source_key"]}
-        )
+        inline = _INLINE_STORE.get(self._account, params["source_bucket"], params["source_key"])
+        if inline is not None:
+            # S3 has no (current) copy of the source; the copy stays inline too
+            content, content_type = inline
+            _INLINE_STORE.put(self._account, params["dest_bucket"], params["dest_key"], content, content_type)
+            return ConnectorResult(success=True, data={"copied": params["dest_key"], "inline": True})
+
+        copy_source = {"Bucket": params["source_bucket"], "Key": params["source_key"]}
+        head = await self._call(client.head_object, **copy_source)
+        # A durable write replaces any inline copy of the same key
+        _INLINE_STORE.pop(self._account, params["dest_bucket"], params["dest_key"])
+
+        if head["ContentLength"] > _MULTIPART_COPY_THRESHOLD:
+            await self._multipart_copy(client, copy_source, params["dest_bucket"], params["dest_key"], head)
+        else:
+            await self._call(
+                client.copy_object,
+                Bucket=params["dest_bucket"],
+                Key=params["dest_key"],
+                CopySource=copy_source
+            )
         return ConnectorResult(success=True, data={"copied": params["dest_key"]})
 
+    async def _multipart_copy(self, client, copy_source: dict, bucket: str, key: str, head: dict):
+        """Copy a large object server-side as concurrent UploadPartCopy ranges."""
+        size = head["ContentLength"]
+        headers = {name: head[name] for name in _COPIED_HEADERS if head.get(name)}
+        upload = await client.create_multipart_upload(Bucket=bucket, Key=key, **headers)
+        upload_id = upload["UploadId"]
+
+        try:
+            offsets = range(0, size, _MULTIPART_COPY_PART_SIZE)
+            responses = await _gather_parts(
+                self._call(
+                    client.upload_part_copy,
+                    Bucket=bucket,
+                    Key=key,
+                    UploadId=upload_id,
+                    PartNumber=number,
+                    CopySource=copy_source,
+                    CopySourceRange=f"bytes={offset}-{min(offset + _MULTIPART_COPY_PART_SIZE, size) - 1}",
+                )
+                for number, offset in enumerate(offsets, start=1)
+            )
+            parts = [
+                {"PartNumber": number, "ETag": response["CopyPartResult"]["ETag"]}
+                for number, response in enumerate(responses, start=1)
+            ]
+            await client.complete_multipart_upload(
+                Bucket=bucket,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": parts},
+            )
+        except BaseException:
+            await client.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+            raise
+
     async def _move(self, client, params: dict) -> ConnectorResult:
+        if isinstance(params.get("moves"), list):
+            return await self._bulk_move(client, params)
+
         await self._copy(client, params)
-        await self._delete(client, params["source_bucket"], params["source_key"])
+        await self._delete(client, {"bucket": params["source_bucket"], "key": params["source_key"]})
         return ConnectorResult(success=True, data={"moved": params["dest_key"]})
 
-    async def _get_presigned_url(self, client, params: dict) -> ConnectorResult:
-        url = client.generate_presigned_url(
-            params.get("operation", "get_object"),
-            Params={"Bucket": params["bucket"], "Key": params["key"]},
-            ExpiresIn=params.get("expires_in", 3600)
+    async def _bulk_move(self, client, params: dict) -> ConnectorResult:
+        moves = params["moves"]
+        copies = await asyncio.gather(
+            *[self._copy(client, move) for move in moves],
+            return_exceptions=True,
         )
+
+        results = []
+        sources_by_bucket: dict[str, list[str]] = {}
+        for move, copied in zip(moves, copies):
+            result = {"source_key": move["source_key"], "dest_key": move["dest_key"], "success": True}
+            if isinstance(copied, BaseException):
+                result.update(success=False, error=str(copied))
+            elif copied.data.get("inline"):
+                _INLINE_STORE.pop(self._account, move["source_bucket"], move["source_key"])
+            else:
+                sources_by_bucket.setdefault(move["source_bucket"], []).append(move["source_key"])
+            results.append(result)
+
+        # Delete copied sources with one DeleteObjects call per bucket and batch
+        failed_deletes: dict[tuple[str, str], str] = {}
+        for bucket, keys in sources_by_bucket.items():
+            for start in range(0, len(keys), _DELETE_BATCH_SIZE):
+                batch = keys[start:start + _DELETE_BATCH_SIZE]
+                try:
+                    response = await client.delete_objects(
+                        Bucket=bucket,
+                        Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True},
+                    )
+                except Exception as e:
+                    # The copies already landed; report each key rather than
+                    # losing the per-move results to a generic failure
+                    for key in batch:
+                        failed_deletes[(bucket, key)] = str(e)
+                    continue
+                for error in response.get("Errors", []):
+                    failed_deletes[(bucket, error["Key"])] = error.get("Message", "Delete failed")
+
+        if failed_deletes:
+            for move, result in zip(moves, results):
+                message = failed_deletes.get((move["source_bucket"], move["source_key"]))
+                if result["success"] and message:
+                    result.update(success=False, copied=True, error=f"Copied but source not deleted: {message}")
+
+        moved = sum(1 for result in results if result["success"])
+        failed = len(results) - moved
+        return ConnectorResult(
+            success=failed == 0,
+            data={"results": results, "moved": moved, "failed": failed},
+            error=f"{failed} of {len(results)} moves failed" if failed else None,
+        )
+
+    async def _get_presigned_url(self, client, params: dict) -> ConnectorResult:
+        if _INLINE_STORE.get(self._account, params["bucket"], params["key"]) is not None:
+            return ConnectorResult(
+                success=False, error=f"{params['key']} is stored inline, in process memory, and has no URL"
+            )
+        operation = params.get("operation", "get_object")
+        expires_in = int(params.get("expires_in", 3600))
+        # expires_in is part of the key so URLs are never reused across expirations
+        cache_key = (params["bucket"], params["key"], operation, expires_in)
+
+        url = self._url_cache.get(cache_key)
+        if url is None:
+            url = await client.generate_presigned_url(
+                operation,
+                Params={"Bucket": params["bucket"], "Key": params["key"]},
+                ExpiresIn=expires_in
+            )
+            self._url_cache.set(cache_key, url, ttl=min(_URL_REUSE_MAX, expires_in * _URL_REUSE_FRACTION))
         return ConnectorResult(success=True, data={"url": url})
 
-    async def _list_buckets(self, client) -> ConnectorResult:
-        response = client.list_buckets()
+    async def _list_buckets(self, client, params: dict) -> ConnectorResult:
+        format_timestamp = timestamp_formatter(params.get("timestamp_format"))
+        response = await client.list_buckets()
+        if params.get("raw"):
+            return ConnectorResult(success=True, data={"buckets": response.get("Buckets", [])})
+
         buckets = [
-            {"name": b["Name"], "created": b["CreationDate"].isoformat()}
+            {"name": b["Name"], "created": format_timestamp(b["CreationDate"])}
             for b in response.get("Buckets", [])
         ]
         return ConnectorResult(success=True, data={"buckets": buckets})
 
-    async def _create_bucket(self, client, bucket: str) -> ConnectorResult:
+    async def _create_bucket(self, client, params: dict) -> ConnectorResult:
+        bucket = params["bucket"]
         kwargs = {"Bucket": bucket}
         if self.region != "us-east-1":
             kwargs["CreateBucketConfiguration"] = {"LocationConstraint": self.region}
-        client.create_bucket(**kwargs)
+        await client.create_bucket(**kwargs)
         return ConnectorResult(success=True, data={"created": bucket})
 
-    async def _delete_bucket(self, client, bucket: str) -> ConnectorResult:
-        client.delete_bucket(Bucket=bucket)
-        return ConnectorResult(success=True, data={"deleted": bucket})
+    async def _delete_bucket(self, client, params: dict) -> ConnectorResult:
+        await client.delete_bucket(Bucket=params["bucket"])
+        return ConnectorResult(success=True, data={"deleted": params["bucket"]})
 
-    async def _head_object(self, client, bucket: str, key: str) -> ConnectorResult:
-        response = client.head_object(Bucket=bucket, Key=key)
+    async def _head_object(self, client, params: dict) -> ConnectorResult:
+        inline = _INLINE_STORE.get(self._account, params["bucket"], params["key"])
+        if inline is not None:
+            content, content_type = inline
+            return ConnectorResult(
+                success=True,
+                data={
+                    "content_type": content_type,
+                    "content_length": len(content),
+                    "last_modified": None,
+                    "etag": None,
+                }
+            )
+
+        response = await client.head_object(Bucket=params["bucket"], Key=params["key"])
         return ConnectorResult(
             success=True,
             data={
@@ -250,5 +784,32 @@ class AWSS3Connector(BaseConnector):
             }
         )
 
+    async def _select(self, client, params: dict) -> ConnectorResult:
+        response = await client.select_object_content(
+            Bucket=params["bucket"],
+            Key=params["key"],
+            Expression=params["expression"],
+            ExpressionType="SQL",
+            InputSerialization=params.get("input_serialization") or {"CSV": {"FileHeaderInfo": "USE"}},
+            OutputSerialization=params.get("output_serialization") or {"JSON": {}},
+        )
+        records = bytearray()
+        stats = {}
+        async for event in response["Payload"]:
+            if "Records" in event:
+                records += event["Records"]["Payload"]
+            elif "Stats" in event:
+                stats = event["Stats"]["Details"]
+        return ConnectorResult(
+            success=True,
+            data={
+                "records": records.decode("utf-8"),
+                "bytes_scanned": stats.get("BytesScanned"),
+                "bytes_returned": stats.get("BytesReturned"),
+            }
+        )
+
     async def close(self):
+        # The pooled S3 client stays open for other instances; see close_client_pool()
         self._client = None
+        await super().close()
@@ -4,9 +4,60 @@ Azure Blob Storage Connector
 Connect to Azure Blob Storage for object storage operations.
 """
 
+from datetime import UTC, datetime, timedelta
 from typing import Any
-import base64
+import asyncio
 from ..base import BaseConnector, ConnectorResult
+from ..cache import ClientPool, shared_cache
+from ..codec import decode_content, encode_content, timestamp_formatter
+
+# Number of blocks staged in parallel for large uploads
+_UPLOAD_MAX_CONCURRENCY = 8
+
+# Storage ExponentialRetry: waits initial_backoff + increment_base ** n seconds,
+# so six retries back off 1s, 3s, 5s, 9s, 17s, 33s before giving up
+_RETRY_KWARGS = {"retry_total": 6, "initial_backoff": 1, "increment_base": 2}
+
+# A signed URL is reused only while it keeps nearly its full lifetime: for
+# this fraction of it, and never longer than the cap (seconds)
+_URL_REUSE_FRACTION = 0.05
+_URL_REUSE_MAX = 300
+
+
+async def _close_service_client(service_client) -> None:
+    await service_client.close()
+    # The client doesn't own an Azure AD credential passed to it; close the
+    # credential's token session too (shared keys and SAS tokens have none)
+    close_credential = getattr(service_client.credential, "close", None)
+    if close_credential is not None:
+        await close_credential()
+
+
+# Service clients shared by every connector instance with the same credentials,
+# so the underlying HTTP session keeps its connections alive across calls.
+# Bounded; evicted clients get a long grace period for transfers still
+# running on them.
+_CLIENT_POOL = ClientPool(_close_service_client, maxsize=16, grace=300.0)
+_CLIENT_POOL_LOCK = asyncio.Lock()
+
+
+async def close_client_pool():
+    """Close all pooled Blob service clients. Call on application shutdown."""
+    async with _CLIENT_POOL_LOCK:
+        await _CLIENT_POOL.aclose()
+
+
+async def _blob_infos(blobs, format_timestamp) -> list[dict]:
+    """Summarize BlobProperties entries from a listing (one call per listing, not per row)."""
+    return [
+        {
+            "name": blob.name,
+            "size": blob.size,
+            "last_modified": format_timestamp(blob.last_modified),
+            "content_type": blob.content_settings.content_type if blob.content_settings else None,
+        }
+        async for blob in blobs
+    ]
 
 
 class AzureBlobConnector(BaseConnector):
@@ -18,130 +69,166 @@ class AzureBlobConnector(BaseConnector):
         self.account_name = credentials.get("account_name")
         self.account_key = credentials.get("account_key")
         self.sas_token = credentials.get("sas_token")
+        # Azure AD service principal, for accounts without a key or SAS token
+        self.tenant_id = credentials.get("tenant_id")
+        self.client_id = credentials.get("client_id")
+        self.client_secret = credentials.get("client_secret")
+        self._credentials_key = (
+            self.connection_string, self.account_name, self.account_key, self.sas_token,
+            self.tenant_id, self.client_id, self.client_secret,
+        )
         self._service_client = None
+        # SAS URLs and the user delegation key outlive this instance; shared
+        # per set of credentials
+        self._url_cache = shared_cache(("azure_blob", "urls", *self._credentials_key), maxsize=1024)
+        self._delegation_key_cache = shared_cache(("azure_blob", "delegation_key", *self._credentials_key), maxsize=1)
 
     async def _get_client(self):
-        """Get Blob service client."""
+        """Get async Blob service client from the process-wide pool."""
         if self._service_client is None:
-            from azure.storage.blob import BlobServiceClient
-
-            if self.connection_string:
-                self._service_client = BlobServiceClient.from_connection_string(self.connection_string)
-            elif self.sas_token:
-                account_url = f"https://{self.account_name}.blob.core.windows.net"
-                self._service_client = BlobServiceClient(account_url=account_url, credential=self.sas_token)
-            else:
-                account_url = f"https://{self.account_name}.blob.core.windows.net"
-                self._service_client = BlobServiceClient(account_url=account_url, credential=self.account_key)
+            key = self._credentials_key
+            async with _CLIENT_POOL_LOCK:
+                service_client = _CLIENT_POOL.get(key)
+                if service_client is None:
+                    service_client = self._create_service_client()
+                    _CLIENT_POOL.set(key, service_client)
+            self._service_client = service_client
         return self._service_client
 
-    @classmethod
-    def get_actions(cls) -> dict[str, dict[str, Any]]:
-        return {
-            "upload": {
-                "description": "Upload a blob",
-                "parameters": {
-                    "container": {"type": "string", "description": "Container name", "required": True},
-                    "blob_name": {"type": "string", "description": "Blob name (path)", "required": True},
-                    "content": {"type": "string", "description": "Base64-encoded content", "required": True},
-                    "content_type": {"type": "string", "description": "MIME type", "required": False},
-                },
+    def _create_service_client(self):
+        from azure.storage.blob.aio import BlobServiceClient
+
+        if self.connection_string:
+            return BlobServiceClient.from_connection_string(self.connection_string, **_RETRY_KWARGS)
+        account_url = f"https://{self.account_name}.blob.core.windows.net"
+        if self.sas_token:
+            return BlobServiceClient(account_url=account_url, credential=self.sas_token, **_RETRY_KWARGS)
+        if not self.account_key and self.client_secret:
+            from azure.identity.aio import ClientSecretCredential
+
+            credential = ClientSecretCredential(self.tenant_id, self.client_id, self.client_secret)
+            return BlobServiceClient(account_url=account_url, credential=credential, **_RETRY_KWARGS)
+        return BlobServiceClient(account_url=account_url, credential=self.account_key, **_RETRY_KWARGS)
+
+    # Built once at import; get_actions() returns this shared dict, so treat it as read-only
+    _ACTIONS: dict[str, dict[str, Any]] = {
+        "upload": {
+            "description": "Upload a blob",
+            "parameters": {
+                "container": {"type": "string", "description": "Container name", "required": True},
+                "blob_name": {"type": "string", "description": "Blob name (path)", "required": True},
+                "content": {"type": "string", "description": "Base64-encoded content (or raw bytes)", "required": True},
+                "content_type": {"type": "string", "description": "MIME type", "required": False},
             },
-            "download": {
-                "description": "Download a blob",
-                "parameters": {
-                    "container": {"type": "string", "description": "Container name", "required": True},
-                    "blob_name": {"type": "string", "description": "Blob name", "required": True},
-                },
+        },
+        "download": {
+            "description": "Download a blob",
+            "parameters": {
+                "container": {"type": "string", "description": "Container name", "required": True},
+                "blob_name": {"type": "string", "description": "Blob name", "required": True},
             },
-            "delete": {
-                "description": "Delete a blob",
-                "parameters": {
-                    "container": {"type": "string", "description": "Container name", "required": True},
-                    "blob_name": {"type": "string", "description": "Blob name", "required": True},
-                },
+        },
+        "delete": {
+            "description": "Delete a blob",
+            "parameters": {
+                "container": {"type": "string", "description": "Container name", "required": True},
+                "blob_name": {"type": "string", "description": "Blob name", "required": True},
             },
-            "list_blobs": {
-                "description": "List blobs in a container",
-                "parameters": {
-                    "container": {"type": "string", "description": "Container name", "required": True},
-                    "prefix": {"type": "string", "description": "Name prefix", "required": False},
-                },
+        },
+        "list_blobs": {
+            "description": "List blobs in a container",
+            "parameters": {
+                "container": {"type": "string", "description": "Container name", "required": True},
+                "prefix": {"type": "string", "description": "Name prefix", "required": False},
+                "timestamp_format": {"type": "string", "description": "iso (default), epoch, or none", "required": False},
             },
-            "copy": {
-                "description": "Copy a blob",
-                "parameters": {
-                    "source_container": {"type": "string", "description": "Source container", "required": True},
-                    "source_blob": {"type": "string", "description": "Source blob", "required": True},
-                    "dest_container": {"type": "string", "description": "Destination container", "required": True},
-                    "dest_blob": {"type": "string", "description": "Destination blob", "required": True},
-                },
+        },
+        "list_blobs_stream": {
+            "description": "List one page of blobs; pass continuation_token back to resume",
+            "parameters": {
+                "container": {"type": "string", "description": "Container name", "required": True},
+                "prefix": {"type": "string", "description": "Name prefix", "required": False},
+                "page_size": {"type": "integer", "description": "Max blobs per page", "required": False},
+                "continuation_token": {"type": "string", "description": "Token from the previous page", "required": False},
+                "timestamp_format": {"type": "string", "description": "iso (default), epoch, or none", "required": False},
             },
-            "get_sas_url": {
-                "description": "Generate a SAS URL",
-                "parameters": {
-                    "container": {"type": "string", "description": "Container name", "required": True},
-                    "blob_name": {"type": "string", "description": "Blob name", "required": True},
-                    "permission": {"type": "string", "description": "r, w, d, or combination", "required": False},
-                    "expires_in": {"type": "integer", "description": "Expiry in hours", "required": False},
-                },
+        },
+        "copy": {
+            "description": "Copy a blob",
+            "parameters": {
+                "source_container": {"type": "string", "description": "Source container", "required": True},
+                "source_blob": {"type": "string", "description": "Source blob", "required": True},
+                "dest_container": {"type": "string", "description": "Destination container", "required": True},
+                "dest_blob": {"type": "string", "description": "Destination blob", "required": True},
             },
-            "list_containers": {
-                "description": "List all containers",
-                "parameters": {},
+        },
+        "get_sas_url": {
+            "description": "Generate a SAS URL",
+            "parameters": {
+                "container": {"type": "string", "description": "Container name", "required": True},
+                "blob_name": {"type": "string", "description": "Blob name", "required": True},
+                "permission": {"type": "string", "description": "r, w, d, or combination", "required": False},
+                "expires_in": {"type": "integer", "description": "Expiry in hours", "required": False},
             },
-            "create_container": {
-                "description": "Create a container",
-                "parameters": {
-                    "container": {"type": "string", "description": "Container name", "required": True},
-                },
+        },
+        "list_containers": {
+            "description": "List all containers",
+            "parameters": {
+                "timestamp_format": {"type": "string", "description": "iso (default), epoch, or none", "required": False},
             },
-            "delete_container": {
-                "description": "Delete a container",
-                "parameters": {
-                    "container": {"type": "string", "description": "Container name", "required": True},
-                },
+        },
+        "create_container": {
+            "description": "Create a container",
+            "parameters": {
+                "container": {"type": "string", "description": "Container name", "required": True},
             },
-            "get_blob_properties": {
-                "description": "Get blob metadata",
-                "parameters": {
-                    "container": {"type": "string", "description": "Container name", "required": True},
-                    "blob_name": {"type": "string", "description": "Blob name", "required": True},
-                },
+        },
+        "delete_container": {
+            "description": "Delete a container",
+            "parameters": {
+                "container": {"type": "string", "description": "Container name", "required": True},
             },
-        }
+        },
+        "get_blob_properties": {
+            "description": "Get blob metadata",
+            "parameters": {
+                "container": {"type": "string", "description": "Container name", "required": True},
+                "blob_name": {"type": "string", "description": "Blob name", "required": True},
+            },
+        },
+    }
+
+    @classmethod
+    def get_actions(cls) -> dict[str, dict[str, Any]]:
+        return cls._ACTIONS
+
+    # action -> handler method; every handler takes (client, params)
+    _DISPATCH: dict[str, str] = {
+        "upload": "_upload",
+        "download": "_download",
+        "delete": "_delete",
+        "list_blobs": "_list_blobs",
+        "list_blobs_stream": "_list_blobs_stream",
+        "copy": "_copy",
+        "get_sas_url": "_get_sas_url",
+        "list_containers": "_list_containers",
+        "create_container": "_create_container",
+        "delete_container": "_delete_container",
+        "get_blob_properties": "_get_blob_properties",
+    }
 
     async def execute(self, action: str, params: dict[str, Any]) -> ConnectorResult:
+        handler_name = self._DISPATCH.get(action)
+        if handler_name is None:
+            return ConnectorResult(success=False, error=f"Unknown action: {action}")
         try:
             client = await self._get_client()
-
-            if action == "upload":
-                return await self._upload(client, params)
-            elif action == "download":
-                return await self._download(client, params["container"], params["blob_name"])
-            elif action == "delete":
-                return await self._delete(client, params["container"], params["blob_name"])
-            elif action == "list_blobs":
-                return await self._list_blobs(client, params["container"], params.get("prefix"))
-            elif action == "copy":
-                return await self._copy(client, params)
-            elif action == "get_sas_url":
-                return await self._get_sas_url(client, params)
-            elif action == "list_containers":
-                return await self._list_containers(client)
-            elif action == "create_container":
-                return await self._create_container(client, params["container"])
-            elif action == "delete_container":
-                return await self._delete_container(client, params["container"])
-            elif action == "get_blob_properties":
-                return await self._get_blob_properties(client, params["container"], params["blob_name"])
-            else:
-                return ConnectorResult(success=False, error=f"Unknown action: {action}")
+            return await getattr(self, handler_name)(client, params)
         except Exception as e:
             return ConnectorResult(success=False, error=str(e))
 
     async def _upload(self, client, params: dict) -> ConnectorResult:
-        content = base64.b64decode(params["content"])
+        content = decode_content(params["content"])
         blob_client = client.get_blob_client(params["container"], params["blob_name"])
 
         kwargs = {}
@@ -149,94 +236,149 @@ class AzureBlobConnector(BaseConnector):
             from azure.storage.blob import ContentSettings
             kwargs["content_settings"] = ContentSettings(content_type=params["content_type"])
 
-        blob_client.upload_blob(content, overwrite=True, **kwargs)
+        # Above the SDK's single-put size this stages blocks concurrently, then commits the block list
+        await blob_client.upload_blob(content, overwrite=True, max_concurrency=_UPLOAD_MAX_CONCURRENCY, **kwargs)
         return ConnectorResult(success=True, data={"blob": params["blob_name"], "container": params["container"]})
 
-    async def _download(self, client, container: str, blob_name: str) -> ConnectorResult:
-        blob_client = client.get_blob_client(container, blob_name)
-        download = blob_client.download_blob()
-        content = download.readall()
-        properties = blob_client.get_blob_properties()
+    async def _download(self, client, params: dict) -> ConnectorResult:
+        blob_client = client.get_blob_client(params["container"], params["blob_name"])
+        download = await blob_client.download_blob()
+        content = await download.readall()
+        properties = download.properties
 
         return ConnectorResult(
             success=True,
             data={
-                "content": base64.b64encode(content).decode(),
+                "content": encode_content(content),
                 "content_type": properties.content_settings.content_type,
                 "content_length": properties.size,
             }
         )
 
-    async def _delete(self, client, container: str, blob_name: str) -> ConnectorResult:
-        blob_client = client.get_blob_client(container, blob_name)
-        blob_client.delete_blob()
-        return ConnectorResult(success=True, data={"deleted": blob_name})
-
-    async def _list_blobs(self, client, container: str, prefix: str | None) -> ConnectorResult:
-        container_client = client.get_container_client(container)
-        blobs = container_client.list_blobs(name_starts_with=prefix)
-
-        blob_list = [
-            {
-                "name": blob.name,
-                "size": blob.size,
-                "last_modified": blob.last_modified.isoformat() if blob.last_modified else None,
-                "content_type": blob.content_settings.content_type if blob.content_settings else None,
-            }
-            for blob in blobs
-        ]
+    async def _delete(self, client, params: dict) -> ConnectorResult:
+        blob_client = client.get_blob_client(params["container"], params["blob_name"])
+        await blob_client.delete_blob()
+        return ConnectorResult(success=True, data={"deleted": params["blob_name"]})
+
+    async def _list_blobs(self, client, params: dict) -> ConnectorResult:
+        format_timestamp = timestamp_formatter(params.get("timestamp_format"))
+        container_client = client.get_container_client(params["container"])
+        blobs = container_client.list_blobs(name_starts_with=params.get("prefix"))
+
+        blob_list = await _blob_infos(blobs, format_timestamp)
         return ConnectorResult(success=True, data={"blobs": blob_list, "count": len(blob_list)})
 
+    async def _list_blobs_stream(self, client, params: dict) -> ConnectorResult:
+        format_timestamp = timestamp_formatter(params.get("timestamp_format"))
+        container_client = client.get_container_client(params["container"])
+        pages = container_client.list_blobs(
+            name_starts_with=params.get("prefix"),
+            results_per_page=params.get("page_size"),
+        ).by_page(continuation_token=params.get("continuation_token"))
+
+        page = await anext(pages, None)
+        blob_list = await _blob_infos(page, format_timestamp) if page is not None else []
+        return ConnectorResult(
+            success=True,
+            data={
+                "blobs": blob_list,
+                "count": len(blob_list),
+                "continuation_token": pages.continuation_token,
+            }
+        )
+
     async def _copy(self, client, params: dict) -> ConnectorResult:
         source_blob = client.get_blob_client(params["source_container"], params["source_blob"])
         dest_blob = client.get_blob_client(params["dest_container"], params["dest_blob"])
 
-        dest_blob.start_copy_from_url(source_blob.url)
+        await dest_blob.start_copy_from_url(source_blob.url)
         return ConnectorResult(success=True, data={"copied": params["dest_blob"]})
 
     async def _get_sas_url(self, client, params: dict) -> ConnectorResult:
+        permission = params.get("permission", "r")
+        expires_in = int(params.get("expires_in", 1))
+        cache_key = (params["container"], params["blob_name"], permission, expires_in)
+
+        url = self._url_cache.get(cache_key)
+        if url is not None:
+            return ConnectorResult(success=True, data={"url": url})
+
         from azure.storage.blob import generate_blob_sas, BlobSasPermissions
-        from datetime import datetime, timedelta
 
         permissions = BlobSasPermissions(
-            read="r" in params.get("permission", "r"),
-            write="w" in params.get("permission", ""),
-            delete="d" in params.get("permission", ""),
+            read="r" in permission,
+            write="w" in permission,
+            delete="d" in permission,
         )
 
-        expiry = datetime.utcnow() + timedelta(hours=params.get("expires_in", 1))
+        expiry = datetime.now(UTC) + timedelta(hours=expires_in)
+
+        # Shared key credentials, including one parsed from a connection
+        # string's AccountKey, expose the key they sign with
+        account_key = getattr(client.credential, "account_key", None)
+        if account_key:
+            signing_key = {"account_key": account_key}
+        elif hasattr(client.credential, "get_token"):
+            # Azure AD: a user delegation SAS can't outlive its key
+            delegation_key, key_expiry = await self._get_user_delegation_key(client, expiry)
+            expiry = min(expiry, key_expiry)
+            signing_key = {"user_delegation_key": delegation_key}
+        else:
+            return ConnectorResult(
+                success=False,
+                error="get_sas_url needs an account key, a connection string with an AccountKey, or Azure AD credentials",
+            )
 
         sas_token = generate_blob_sas(
-            account_name=self.account_name,
+            account_name=client.account_name,
             container_name=params["container"],
             blob_name=params["blob_name"],
-            account_key=self.account_key,
             permission=permissions,
             expiry=expiry,
+            **signing_key,
         )
 
-        url = f"https://{self.account_name}.blob.core.windows.net/{params['container']}/{params['blob_name']}?{sas_token}"
+        blob_url = client.get_blob_client(params["container"], params["blob_name"]).url
+        url = f"{blob_url}?{sas_token}"
+
+        lifetime = (expiry - datetime.now(UTC)).total_seconds()
+        self._url_cache.set(cache_key, url, ttl=min(_URL_REUSE_MAX, lifetime * _URL_REUSE_FRACTION))
         return ConnectorResult(success=True, data={"url": url})
 
-    async def _list_containers(self, client) -> ConnectorResult:
+    async def _get_user_delegation_key(self, client, sas_expiry: datetime):
+        """
+        Get a cached (user delegation key, expiry) covering sas_expiry where it
+        can; Azure caps keys at 7 days from their start.
+        """
+        now = datetime.now(UTC)
+        max_expiry = now + timedelta(days=7)
+        cached = self._delegation_key_cache.get("key")
+        if cached is None or cached[1] - now < timedelta(hours=1) or cached[1] < min(sas_expiry, max_expiry):
+            key = await client.get_user_delegation_key(key_start_time=now, key_expiry_time=max_expiry)
+            cached = (key, max_expiry)
+            self._delegation_key_cache.set("key", cached, ttl=(max_expiry - now).total_seconds())
+        return cached
+
+    async def _list_containers(self, client, params: dict) -> ConnectorResult:
+        format_timestamp = timestamp_formatter(params.get("timestamp_format"))
         containers = client.list_containers()
         container_list = [
-            {"name": c.name, "last_modified": c.last_modified.isoformat() if c.last_modified else None}
-            for c in containers
+            {"name": c.name, "last_modified": format_timestamp(c.last_modified)}
+            async for c in containers
         ]
         return ConnectorResult(success=True, data={"containers": container_list})
 
-    async def _create_container(self, client, container: str) -> ConnectorResult:
-        client.create_container(container)
-        return ConnectorResult(success=True, data={"created": container})
+    async def _create_container(self, client, params: dict) -> ConnectorResult:
+        await client.create_container(params["container"])
+        return ConnectorResult(success=True, data={"created": params["container"]})
 
-    async def _delete_container(self, client, container: str) -> ConnectorResult:
-        client.delete_container(container)
-        return ConnectorResult(success=True, data={"deleted": container})
+    async def _delete_container(self, client, params: dict) -> ConnectorResult:
+        await client.delete_container(params["container"])
+        return ConnectorResult(success=True, data={"deleted": params["container"]})
 
-    async def _get_blob_properties(self, client, container: str, blob_name: str) -> ConnectorResult:
-        blob_client = client.get_blob_client(container, blob_name)
-        properties = blob_client.get_blob_properties()
+    async def _get_blob_properties(self, client, params: dict) -> ConnectorResult:
+        blob_client = client.get_blob_client(params["container"], params["blob_name"])
+        properties = await blob_client.get_blob_properties()
 
         return ConnectorResult(
             success=True,
@@ -250,4 +392,6 @@ class AzureBlobConnector(BaseConnector):
         )
 
     async def close(self):
+        # The pooled service client stays open for other instances; see close_client_pool()
         self._service_client = None
+        await super().close()
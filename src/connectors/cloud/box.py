@@ -4,26 +4,110 @@ Box Connector
 Connect to Box for file storage operations.
 """
 
-from typing import Any
+from typing import Any, AsyncIterator
+import asyncio
 import base64
+import os
 import httpx
-from ..base import BaseConnector, ConnectorResult
+from ..base import HTTP2_AVAILABLE, BaseConnector, ConnectorResult, RetryTransport
+from ..cache import shared_cache
+from ..codec import (
+    encode_response_content,
+    json_dumps,
+    json_loads,
+    read_file_chunks,
+    resolve_transfer_path,
+    write_response_to_file,
+)
+
+
+# Folder listings request the fields get_file_info reports, so listed files
+# can seed the file info cache
+_LIST_FIELDS = "id,type,name,size,created_at,modified_at"
+
+
+def _multipart_envelope(boundary: str, attributes: str, filename: str) -> tuple[bytes, bytes]:
+    """Framing before and after a streamed file part: the attributes field, then the file."""
+    # Escaped the way httpx's own multipart encoder does
+    quoted = filename.replace("\\", "\\\\").replace('"', "%22").replace("\r", "%0D").replace("\n", "%0A")
+    head = (
+        f"--{boundary}\r\n"
+        'Content-Disposition: form-data; name="attributes"\r\n\r\n'
+        f"{attributes}\r\n"
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="{quoted}"\r\n'
+        "Content-Type: application/octet-stream\r\n\r\n"
+    ).encode()
+    return head, f"\r\n--{boundary}--\r\n".encode()
+
+
+async def _file_part_body(head: bytes, path: str, tail: bytes) -> AsyncIterator[bytes]:
+    yield head
+    async for chunk in read_file_chunks(path):
+        yield chunk
+    yield tail
+
+
+# One keep-alive pool per process, shared by every BoxConnector; the access
+# token differs per instance, so it is sent as a per-request header
+_SHARED_CLIENT: httpx.AsyncClient | None = None
+
+
+def _shared_client() -> httpx.AsyncClient:
+    global _SHARED_CLIENT
+    if _SHARED_CLIENT is None or _SHARED_CLIENT.is_closed:
+        _SHARED_CLIENT = httpx.AsyncClient(
+            transport=RetryTransport(
+                httpx.AsyncHTTPTransport(
+                    limits=httpx.Limits(max_connections=200, max_keepalive_connections=50, keepalive_expiry=30.0),
+                    # Concurrent calls multiplex as streams over one TLS connection
+                    http2=HTTP2_AVAILABLE,
+                )
+            ),
+            timeout=30.0,
+        )
+    return _SHARED_CLIENT
+
+
+async def close_client_pool():
+    """Close the shared Box HTTP client. Call on application shutdown."""
+    global _SHARED_CLIENT
+    client, _SHARED_CLIENT = _SHARED_CLIENT, None
+    if client is not None:
+        await client.aclose()
 
 
 class BoxConnector(BaseConnector):
     """Connector for Box."""
 
+    base_url = "https://api.box.com/2.0"
+    upload_url = "https://upload.box.com/api/2.0"
+
+    # Absolute URLs skip the client's per-request base_url merge; fixed
+    # endpoints are parsed once here, ID paths are formatted absolute
+    _UPLOAD_URL = httpx.URL(f"{upload_url}/files/content")
+    _FOLDERS_URL = httpx.URL(f"{base_url}/folders")
+    _SEARCH_URL = httpx.URL(f"{base_url}/search")
+
     def __init__(self, credentials: dict[str, Any]):
         super().__init__(credentials)
         self.access_token = credentials.get("access_token")
-        self.base_url = "https://api.box.com/2.0"
-        self.upload_url = "https://upload.box.com/api/2.0"
+        self._headers = {"Authorization": f"Bearer {self.access_token}"}
+        # Bounds fanned-out batch requests to stay within Box rate limits
+        self._semaphore = asyncio.Semaphore(20)
+        # Short-lived read caches, shared by every instance for this token;
+        # writes invalidate what they touch, and clear listings outright when
+        # the affected parent folder is unknown
+        self._file_cache = shared_cache(("box", "files", self.access_token), maxsize=1024, ttl=30)
+        self._folder_cache = shared_cache(("box", "folders", self.access_token), maxsize=256, ttl=30)
+        # (ETag, info) from the last full file info response; outlives the
+        # short TTL (and this instance) so an expired entry revalidates with
+        # If-None-Match
+        self._file_etags = shared_cache(("box", "file_etags", self.access_token), maxsize=1024, ttl=3600)
 
-    def _headers(self):
-        return {
-            "Authorization": f"Bearer {self.access_token}",
-            "Content-Type": "application/json",
-        }
+    def _create_client(self) -> httpx.AsyncClient:
+        # Every request passes an absolute URL, so the shared client needs no base_url
+        return _shared_client()
 
     @classmethod
     def get_actions(cls) -> dict[str, dict[str, Any]]:
@@ -33,13 +117,16 @@ class BoxConnector(BaseConnector):
                 "parameters": {
                     "folder_id": {"type": "string", "description": "Parent folder ID (0 for root)", "required": True},
                     "name": {"type": "string", "description": "File name", "required": True},
-                    "content": {"type": "string", "description": "Base64-encoded content", "required": True},
+                    "content": {"type": "string", "description": "Base64-encoded content (or use content_path)", "required": False},
+                    "content_path": {"type": "string", "description": "File under LOCAL_TRANSFER_DIR to stream instead of content", "required": False},
                 },
             },
             "download": {
                 "description": "Download a file",
                 "parameters": {
                     "file_id": {"type": "string", "description": "File ID", "required": True},
+                    "output_path": {"type": "string", "description": "Stream to this file under LOCAL_TRANSFER_DIR instead of returning base64 content", "required": False},
+                    "encoding": {"type": "string", "description": "base64 (default) or raw (return bytes unencoded)", "required": False},
                 },
             },
             "delete": {
@@ -52,6 +139,16 @@ class BoxConnector(BaseConnector):
                 "description": "List items in a folder",
                 "parameters": {
                     "folder_id": {"type": "string", "description": "Folder ID (0 for root)", "required": True},
+                    "raw": {"type": "boolean", "description": "Return the API's entries unchanged", "required": False},
+                },
+            },
+            "list_folder_stream": {
+                "description": "List one page of folder items; pass marker back to resume",
+                "parameters": {
+                    "folder_id": {"type": "string", "description": "Folder ID (0 for root)", "required": True},
+                    "limit": {"type": "integer", "description": "Max items per page (up to 1000)", "required": False},
+                    "marker": {"type": "string", "description": "Marker from the previous page", "required": False},
+                    "raw": {"type": "boolean", "description": "Return the API's entries unchanged", "required": False},
                 },
             },
             "create_folder": {
@@ -89,8 +186,22 @@ class BoxConnector(BaseConnector):
                     "file_id": {"type": "string", "description": "File ID", "required": True},
                 },
             },
+            "get_file_info_batch": {
+                "description": "Get information for many files concurrently",
+                "parameters": {
+                    "file_ids": {"type": "array", "description": "File IDs", "required": True},
+                },
+            },
             "search": {
                 "description": "Search for files",
+                "parameters": {
+                    "query": {"type": "string", "description": "Search query", "required": True},
+                    "type": {"type": "string", "description": "file or folder", "required": False},
+                    "raw": {"type": "boolean", "description": "Return the API's entries unchanged", "required": False},
+                },
+            },
+            "search_with_metadata": {
+                "description": "Search for files and fetch each result's file information concurrently",
                 "parameters": {
                     "query": {"type": "string", "description": "Search query", "required": True},
                     "type": {"type": "string", "description": "file or folder", "required": False},
@@ -105,187 +216,306 @@ class BoxConnector(BaseConnector):
             },
         }
 
+    # action -> handler method; every handler takes (params)
+    _DISPATCH: dict[str, str] = {
+        "upload": "_upload",
+        "download": "_download",
+        "delete": "_delete",
+        "list_folder": "_list_folder",
+        "list_folder_stream": "_list_folder_stream",
+        "create_folder": "_create_folder",
+        "delete_folder": "_delete_folder",
+        "copy": "_copy",
+        "move": "_move",
+        "get_file_info": "_get_file_info",
+        "get_file_info_batch": "_get_file_info_batch",
+        "search": "_search",
+        "search_with_metadata": "_search_with_metadata",
+        "create_shared_link": "_create_shared_link",
+    }
+
     async def execute(self, action: str, params: dict[str, Any]) -> ConnectorResult:
+        handler_name = self._DISPATCH.get(action)
+        if handler_name is None:
+            return ConnectorResult(success=False, error=f"Unknown action: {action}")
         try:
-            if action == "upload":
-                return await self._upload(params)
-            elif action == "download":
-                return await self._download(params["file_id"])
-            elif action == "delete":
-                return await self._delete(params["file_id"])
-            elif action == "list_folder":
-                return await self._list_folder(params["folder_id"])
-            elif action == "create_folder":
-                return await self._create_folder(params["name"], params["parent_id"])
-            elif action == "delete_folder":
-                return await self._delete_folder(params["folder_id"], params.get("recursive", True))
-            elif action == "copy":
-                return await self._copy(params["file_id"], params["parent_id"], params.get("name"))
-            elif action == "move":
-                return await self._move(params["file_id"], params["parent_id"])
-            elif action == "get_file_info":
-                return await self._get_file_info(params["file_id"])
-            elif action == "search":
-                return await self._search(params["query"], params.get("type"))
-            elif action == "create_shared_link":
-                return await self._create_shared_link(params["file_id"], params.get("access", "open"))
-            else:
-                return ConnectorResult(success=False, error=f"Unknown action: {action}")
+            return await getattr(self, handler_name)(params)
         except Exception as e:
             return ConnectorResult(success=False, error=str(e))
 
     async def _upload(self, params: dict) -> ConnectorResult:
-        content = base64.b64decode(params["content"])
-
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.upload_url}/files/content",
-                headers={"Authorization": f"Bearer {self.access_token}"},
-                data={
-                    "attributes": f'{{"name":"{params["name"]}","parent":{{"id":"{params["folder_id"]}"}}}}'
+        form = {
+            "attributes": json_dumps({"name": params["name"], "parent": {"id": params["folder_id"]}})
+        }
+        if params.get("content_path"):
+            # httpx's multipart encoder reads files synchronously, so the body
+            # is framed by hand and the file streamed through aiofiles
+            path = resolve_transfer_path(params["content_path"])
+            boundary = os.urandom(16).hex()
+            head, tail = _multipart_envelope(boundary, form["attributes"], params["name"])
+            size = await asyncio.to_thread(os.path.getsize, path)
+            response = await self.client.post(
+                self._UPLOAD_URL,
+                content=_file_part_body(head, path, tail),
+                headers={
+                    **self._headers,
+                    "Content-Type": f"multipart/form-data; boundary={boundary}",
+                    "Content-Length": str(len(head) + size + len(tail)),
                 },
-                files={"file": (params["name"], content)},
             )
-            response.raise_for_status()
-            data = response.json()
-            entry = data["entries"][0]
-            return ConnectorResult(success=True, data={"id": entry["id"], "name": entry["name"]})
-
-    async def _download(self, file_id: str) -> ConnectorResult:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/files/{file_id}/content",
-                headers=self._headers(),
-                follow_redirects=True,
-            )
-            response.raise_for_status()
-            content = response.content
-            return ConnectorResult(
-                success=True,
-                data={"content": base64.b64encode(content).decode()}
+        else:
+            content = base64.b64decode(params["content"])
+            response = await self.client.post(
+                self._UPLOAD_URL,
+                data=form,
+                files={"file": (params["name"], content)},
+                headers=self._headers,
             )
+        response.raise_for_status()
+        self._folder_cache.pop(params["folder_id"])
+        data = json_loads(response.content)
+        entry = data["entries"][0]
+        return ConnectorResult(success=True, data={"id": entry["id"], "name": entry["name"]})
 
-    async def _delete(self, file_id: str) -> ConnectorResult:
-        async with httpx.AsyncClient() as client:
-            response = await client.delete(
-                f"{self.base_url}/files/{file_id}",
-                headers=self._headers(),
-            )
+    async def _download(self, params: dict) -> ConnectorResult:
+        url = f"{self.base_url}/files/{params['file_id']}/content"
+        output_path = params.get("output_path")
+        if output_path:
+            path = resolve_transfer_path(output_path)
+            async with self.client.stream("GET", url, follow_redirects=True, headers=self._headers) as response:
+                response.raise_for_status()
+                size = await write_response_to_file(response, path)
+            return ConnectorResult(success=True, data={"path": output_path, "size": size})
+
+        if params.get("encoding") == "raw":
+            response = await self.client.get(url, follow_redirects=True, headers=self._headers)
             response.raise_for_status()
-            return ConnectorResult(success=True, data={"deleted": file_id})
+            return ConnectorResult(success=True, data={"content": response.content})
 
-    async def _list_folder(self, folder_id: str) -> ConnectorResult:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/folders/{folder_id}/items",
-                headers=self._headers(),
-            )
+        async with self.client.stream("GET", url, follow_redirects=True, headers=self._headers) as response:
             response.raise_for_status()
-            data = response.json()
+            content = await encode_response_content(response)
+        return ConnectorResult(success=True, data={"content": content})
 
+    async def _delete(self, params: dict) -> ConnectorResult:
+        file_id = params["file_id"]
+        response = await self.client.delete(f"{self.base_url}/files/{file_id}", headers=self._headers)
+        response.raise_for_status()
+        self._file_cache.pop(file_id)
+        self._folder_cache.clear()
+        return ConnectorResult(success=True, data={"deleted": file_id})
+
+    async def _list_folder(self, params: dict) -> ConnectorResult:
+        folder_id = params["folder_id"]
+        # The cache holds Box's entries as returned; raw callers get them without a copy per item
+        entries = self._folder_cache.get(folder_id)
+        if entries is None:
+            entries = [entry async for entry in self.iter_folder(folder_id)]
+            self._folder_cache.set(folder_id, entries)
+
+        if params.get("raw"):
+            items = list(entries)
+        else:
             items = [
                 {
                     "id": item["id"],
                     "name": item["name"],
                     "type": item["type"],
                 }
-                for item in data.get("entries", [])
+                for item in entries
             ]
-            return ConnectorResult(success=True, data={"items": items, "count": len(items)})
-
-    async def _create_folder(self, name: str, parent_id: str) -> ConnectorResult:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/folders",
-                headers=self._headers(),
-                json={"name": name, "parent": {"id": parent_id}},
-            )
-            response.raise_for_status()
-            data = response.json()
-            return ConnectorResult(success=True, data={"id": data["id"], "name": data["name"]})
-
-    async def _delete_folder(self, folder_id: str, recursive: bool) -> ConnectorResult:
-        async with httpx.AsyncClient() as client:
-            response = await client.delete(
-                f"{self.base_url}/folders/{folder_id}",
-                headers=self._headers(),
-                params={"recursive": str(recursive).lower()},
-            )
-            response.raise_for_status()
-            return ConnectorResult(success=True, data={"deleted": folder_id})
+        return ConnectorResult(success=True, data={"items": items, "count": len(items)})
+
+    async def _list_folder_stream(self, params: dict) -> ConnectorResult:
+        entries, marker = await self._fetch_folder_page(
+            params["folder_id"], params.get("marker"), params.get("limit", 1000)
+        )
+        if params.get("raw"):
+            items = entries
+        else:
+            items = [{"id": item["id"], "name": item["name"], "type": item["type"]} for item in entries]
+        return ConnectorResult(success=True, data={"items": items, "count": len(items), "marker": marker})
+
+    async def iter_folder(self, folder_id: str) -> AsyncIterator[dict]:
+        """Yield a folder's items as returned by Box, fetching pages as the caller consumes them."""
+        marker = None
+        while True:
+            entries, marker = await self._fetch_folder_page(folder_id, marker)
+            for entry in entries:
+                yield entry
+            if not marker:
+                return
+
+    async def _fetch_folder_page(
+        self, folder_id: str, marker: str | None, limit: int = 1000
+    ) -> tuple[list[dict], str | None]:
+        # Marker-based paging has no offset ceiling, unlike offset/limit
+        params = {"usemarker": "true", "limit": limit, "fields": _LIST_FIELDS}
+        if marker:
+            params["marker"] = marker
+        response = await self.client.get(
+            f"{self.base_url}/folders/{folder_id}/items",
+            params=params,
+            headers=self._headers,
+        )
+        response.raise_for_status()
+        data = json_loads(response.content)
+        entries = data.get("entries") or []
+
+        # The listing already carries everything get_file_info returns
+        for entry in entries:
+            if entry["type"] == "file":
+                self._file_cache.set(entry["id"], {
+                    "id": entry["id"],
+                    "name": entry["name"],
+                    "size": entry.get("size"),
+                    "created_at": entry.get("created_at"),
+                    "modified_at": entry.get("modified_at"),
+                })
+        return entries, data.get("next_marker") or None
 
-    async def _copy(self, file_id: str, parent_id: str, name: str | None) -> ConnectorResult:
+    async def _create_folder(self, params: dict) -> ConnectorResult:
+        name, parent_id = params["name"], params["parent_id"]
+        response = await self.client.post(
+            self._FOLDERS_URL,
+            json={"name": name, "parent": {"id": parent_id}},
+            headers=self._headers,
+        )
+        response.raise_for_status()
+        self._folder_cache.pop(parent_id)
+        data = json_loads(response.content)
+        return ConnectorResult(success=True, data={"id": data["id"], "name": data["name"]})
+
+    async def _delete_folder(self, params: dict) -> ConnectorResult:
+        folder_id, recursive = params["folder_id"], params.get("recursive", True)
+        response = await self.client.delete(
+            f"{self.base_url}/folders/{folder_id}",
+            params={"recursive": "true" if recursive else "false"},
+            headers=self._headers,
+        )
+        response.raise_for_status()
+        self._file_cache.clear()
+        self._folder_cache.clear()
+        return ConnectorResult(success=True, data={"deleted": folder_id})
+
+    async def _copy(self, params: dict) -> ConnectorResult:
+        file_id, parent_id = params["file_id"], params["parent_id"]
         body = {"parent": {"id": parent_id}}
-        if name:
-            body["name"] = name
-
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/files/{file_id}/copy",
-                headers=self._headers(),
-                json=body,
-            )
-            response.raise_for_status()
-            data = response.json()
-            return ConnectorResult(success=True, data={"id": data["id"], "name": data["name"]})
-
-    async def _move(self, file_id: str, parent_id: str) -> ConnectorResult:
-        async with httpx.AsyncClient() as client:
-            response = await client.put(
-                f"{self.base_url}/files/{file_id}",
-                headers=self._headers(),
-                json={"parent": {"id": parent_id}},
-            )
-            response.raise_for_status()
-            data = response.json()
-            return ConnectorResult(success=True, data={"id": data["id"], "name": data["name"]})
-
-    async def _get_file_info(self, file_id: str) -> ConnectorResult:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/files/{file_id}",
-                headers=self._headers(),
-            )
-            response.raise_for_status()
-            data = response.json()
-            return ConnectorResult(
-                success=True,
-                data={
-                    "id": data["id"],
-                    "name": data["name"],
-                    "size": data.get("size"),
-                    "created_at": data.get("created_at"),
-                    "modified_at": data.get("modified_at"),
-                }
-            )
+        if params.get("name"):
+            body["name"] = params["name"]
 
-    async def _search(self, query: str, type: str | None) -> ConnectorResult:
-        params = {"query": query}
-        if type:
-            params["type"] = type
+        response = await self.client.post(
+            f"{self.base_url}/files/{file_id}/copy",
+            json=body,
+            headers=self._headers,
+        )
+        response.raise_for_status()
+        self._folder_cache.pop(parent_id)
+        data = json_loads(response.content)
+        return ConnectorResult(success=True, data={"id": data["id"], "name": data["name"]})
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/search",
-                headers=self._headers(),
-                params=params,
-            )
-            response.raise_for_status()
-            data = response.json()
+    async def _move(self, params: dict) -> ConnectorResult:
+        file_id, parent_id = params["file_id"], params["parent_id"]
+        response = await self.client.put(
+            f"{self.base_url}/files/{file_id}",
+            json={"parent": {"id": parent_id}},
+            headers=self._headers,
+        )
+        response.raise_for_status()
+        self._file_cache.pop(file_id)
+        self._folder_cache.clear()
+        data = json_loads(response.content)
+        return ConnectorResult(success=True, data={"id": data["id"], "name": data["name"]})
+
+    async def _get_file_info(self, params: dict) -> ConnectorResult:
+        return ConnectorResult(success=True, data=await self._fetch_file_info(params["file_id"]))
+
+    async def _get_file_info_batch(self, params: dict) -> ConnectorResult:
+        files = await self._fetch_file_infos(params["file_ids"])
+        return ConnectorResult(success=True, data={"files": files, "count": len(files)})
+
+    async def _fetch_file_infos(self, file_ids: list[str]) -> dict[str, dict]:
+        """Fetch file info concurrently; a failed item maps to {"error": ...}."""
+        async def fetch(file_id: str) -> dict:
+            async with self._semaphore:
+                try:
+                    return await self._fetch_file_info(file_id)
+                except Exception as e:
+                    return {"error": str(e)}
+
+        async with asyncio.TaskGroup() as tg:
+            tasks = {file_id: tg.create_task(fetch(file_id)) for file_id in file_ids}
+        return {file_id: task.result() for file_id, task in tasks.items()}
+
+    async def _fetch_file_info(self, file_id: str) -> dict:
+        info = self._file_cache.get(file_id)
+        if info is not None:
+            return dict(info)
+
+        headers = self._headers
+        validated = self._file_etags.get(file_id)
+        if validated is not None:
+            headers = {**headers, "If-None-Match": validated[0]}
 
+        response = await self.client.get(f"{self.base_url}/files/{file_id}", headers=headers)
+        if response.status_code == 304:
+            info = validated[1]
+            self._file_cache.set(file_id, info)
+            return dict(info)
+        response.raise_for_status()
+        data = json_loads(response.content)
+        info = {
+            "id": data["id"],
+            "name": data["name"],
+            "size": data.get("size"),
+            "created_at": data.get("created_at"),
+            "modified_at": data.get("modified_at"),
+        }
+        self._file_cache.set(file_id, info)
+        if etag := response.headers.get("ETag"):
+            self._file_etags.set(file_id, (etag, info))
+        return dict(info)
+
+    async def _search(self, params: dict) -> ConnectorResult:
+        query_params = {"query": params["query"]}
+        if params.get("type"):
+            query_params["type"] = params["type"]
+
+        response = await self.client.get(
+            self._SEARCH_URL,
+            params=query_params,
+            headers=self._headers,
+        )
+        response.raise_for_status()
+        entries = json_loads(response.content).get("entries") or []
+
+        if params.get("raw"):
+            results = entries
+        else:
             results = [
                 {"id": item["id"], "name": item["name"], "type": item["type"]}
-                for item in data.get("entries", [])
+                for item in entries
             ]
-            return ConnectorResult(success=True, data={"results": results, "count": len(results)})
-
-    async def _create_shared_link(self, file_id: str, access: str) -> ConnectorResult:
-        async with httpx.AsyncClient() as client:
-            response = await client.put(
-                f"{self.base_url}/files/{file_id}",
-                headers=self._headers(),
-                json={"shared_link": {"access": access}},
-            )
-            response.raise_for_status()
-            data = response.json()
-            return ConnectorResult(success=True, data={"url": data["shared_link"]["url"]})
+        return ConnectorResult(success=True, data={"results": results, "count": len(results)})
+
+    async def _search_with_metadata(self, params: dict) -> ConnectorResult:
+        result = await self._search({"query": params["query"], "type": params.get("type")})
+        results = result.data["results"]
+        # /files/{id} only describes files; folder hits are returned as found
+        infos = await self._fetch_file_infos([r["id"] for r in results if r["type"] == "file"])
+        enriched = [{**r, **infos[r["id"]]} if r["id"] in infos else r for r in results]
+        return ConnectorResult(success=True, data={"results": enriched, "count": len(enriched)})
+
+    async def _create_shared_link(self, params: dict) -> ConnectorResult:
+        response = await self.client.put(
+            f"{self.base_url}/files/{params['file_id']}",
+            json={"shared_link": {"access": params.get("access", "open")}},
+            headers=self._headers,
+        )
+        response.raise_for_status()
+        data = json_loads(response.content)
+        return ConnectorResult(success=True, data={"url": data["shared_link"]["url"]})
+
+    async def close(self):
+        # The shared client stays open for other instances; see close_client_pool()
+        pass
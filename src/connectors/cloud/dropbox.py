@@ -4,26 +4,92 @@ Dropbox Connector
 Connect to Dropbox for file storage operations.
 """
 
-from typing import Any
+from typing import Any, AsyncIterator
+import asyncio
 import base64
+import json
 import httpx
-from ..base import BaseConnector, ConnectorResult
+from ..base import HTTP2_AVAILABLE, BaseConnector, ConnectorResult, RetryTransport
+from ..cache import shared_cache
+from ..codec import (
+    encode_response_content,
+    json_loads,
+    read_file_chunks,
+    resolve_transfer_path,
+    write_response_to_file,
+)
+
+
+# One keep-alive pool per process, shared by every DropboxConnector; the access
+# token differs per instance, so it is sent as a per-request header
+_SHARED_CLIENT: httpx.AsyncClient | None = None
+
+
+def _shared_client() -> httpx.AsyncClient:
+    global _SHARED_CLIENT
+    if _SHARED_CLIENT is None or _SHARED_CLIENT.is_closed:
+        _SHARED_CLIENT = httpx.AsyncClient(
+            transport=RetryTransport(
+                httpx.AsyncHTTPTransport(
+                    limits=httpx.Limits(max_connections=200, max_keepalive_connections=50, keepalive_expiry=30.0),
+                    # Concurrent calls multiplex as streams over one TLS connection
+                    http2=HTTP2_AVAILABLE,
+                )
+            ),
+            timeout=30.0,
+        )
+    return _SHARED_CLIENT
+
+
+async def close_client_pool():
+    """Close the shared Dropbox HTTP client. Call on application shutdown."""
+    global _SHARED_CLIENT
+    client, _SHARED_CLIENT = _SHARED_CLIENT, None
+    if client is not None:
+        await client.aclose()
+
+
+# Dropbox-API-Arg for the default upload and for downloads, with only the
+# JSON-escaped path substituted in per call
+_UPLOAD_ARG_OVERWRITE = '{"path":%s,"mode":"overwrite","autorename":true}'
+_DOWNLOAD_ARG = '{"path":%s}'
 
 
 class DropboxConnector(BaseConnector):
     """Connector for Dropbox."""
 
+    base_url = "https://api.dropboxapi.com/2"
+    content_url = "https://content.dropboxapi.com/2"
+
+    # Endpoint URLs parsed once; absolute URLs also skip the client's
+    # per-request base_url merge
+    _UPLOAD_URL = httpx.URL(f"{content_url}/files/upload")
+    _DOWNLOAD_URL = httpx.URL(f"{content_url}/files/download")
+    _DELETE_URL = httpx.URL(f"{base_url}/files/delete_v2")
+    _LIST_FOLDER_URL = httpx.URL(f"{base_url}/files/list_folder")
+    _LIST_FOLDER_CONTINUE_URL = httpx.URL(f"{base_url}/files/list_folder/continue")
+    _CREATE_FOLDER_URL = httpx.URL(f"{base_url}/files/create_folder_v2")
+    _MOVE_URL = httpx.URL(f"{base_url}/files/move_v2")
+    _COPY_URL = httpx.URL(f"{base_url}/files/copy_v2")
+    _GET_METADATA_URL = httpx.URL(f"{base_url}/files/get_metadata")
+    _SEARCH_URL = httpx.URL(f"{base_url}/files/search_v2")
+    _SHARED_LINK_URL = httpx.URL(f"{base_url}/sharing/create_shared_link_with_settings")
+
     def __init__(self, credentials: dict[str, Any]):
         super().__init__(credentials)
         self.access_token = credentials.get("access_token")
-        self.base_url = "https://api.dropboxapi.com/2"
-        self.content_url = "https://content.dropboxapi.com/2"
+        self._headers = {"Authorization": f"Bearer {self.access_token}"}
+        # Bounds fanned-out batch requests to stay within Dropbox rate limits
+        self._semaphore = asyncio.Semaphore(20)
+        # Short-lived read caches keyed by lowercased path (Dropbox paths are
+        # case-insensitive), shared by every instance for this token; writes
+        # drop the paths they touch and all listings
+        self._metadata_cache = shared_cache(("dropbox", "metadata", self.access_token), maxsize=1024, ttl=30)
+        self._folder_cache = shared_cache(("dropbox", "folders", self.access_token), maxsize=256, ttl=30)
 
-    def _headers(self):
-        return {
-            "Authorization": f"Bearer {self.access_token}",
-            "Content-Type": "application/json",
-        }
+    def _create_client(self) -> httpx.AsyncClient:
+        # Every request passes an absolute URL, so the shared client needs no base_url
+        return _shared_client()
 
     @classmethod
     def get_actions(cls) -> dict[str, dict[str, Any]]:
@@ -32,7 +98,8 @@ class DropboxConnector(BaseConnector):
                 "description": "Upload a file",
                 "parameters": {
                     "path": {"type": "string", "description": "File path (e.g., /folder/file.txt)", "required": True},
-                    "content": {"type": "string", "description": "Base64-encoded content", "required": True},
+                    "content": {"type": "string", "description": "Base64-encoded content (or use content_path)", "required": False},
+                    "content_path": {"type": "string", "description": "File under LOCAL_TRANSFER_DIR to stream instead of content", "required": False},
                     "mode": {"type": "string", "description": "add, overwrite, or update", "required": False},
                 },
             },
@@ -40,6 +107,8 @@ class DropboxConnector(BaseConnector):
                 "description": "Download a file",
                 "parameters": {
                     "path": {"type": "string", "description": "File path", "required": True},
+                    "output_path": {"type": "string", "description": "Stream to this file under LOCAL_TRANSFER_DIR instead of returning base64 content", "required": False},
+                    "encoding": {"type": "string", "description": "base64 (default) or raw (return bytes unencoded)", "required": False},
                 },
             },
             "delete": {
@@ -53,6 +122,17 @@ class DropboxConnector(BaseConnector):
                 "parameters": {
                     "path": {"type": "string", "description": "Folder path (empty for root)", "required": False},
                     "recursive": {"type": "boolean", "description": "Include subfolders", "required": False},
+                    "raw": {"type": "boolean", "description": "Return the API's entries unchanged", "required": False},
+                },
+            },
+            "list_folder_stream": {
+                "description": "List one page of a folder; pass cursor back to resume",
+                "parameters": {
+                    "path": {"type": "string", "description": "Folder path (empty for root)", "required": False},
+                    "recursive": {"type": "boolean", "description": "Include subfolders", "required": False},
+                    "limit": {"type": "integer", "description": "Approximate max entries per page", "required": False},
+                    "cursor": {"type": "string", "description": "Cursor from the previous page", "required": False},
+                    "raw": {"type": "boolean", "description": "Return the API's entries unchanged", "required": False},
                 },
             },
             "create_folder": {
@@ -81,8 +161,22 @@ class DropboxConnector(BaseConnector):
                     "path": {"type": "string", "description": "Path", "required": True},
                 },
             },
+            "get_metadata_batch": {
+                "description": "Get metadata for many files/folders concurrently",
+                "parameters": {
+                    "paths": {"type": "array", "description": "Paths", "required": True},
+                },
+            },
             "search": {
                 "description": "Search for files",
+                "parameters": {
+                    "query": {"type": "string", "description": "Search query", "required": True},
+                    "path": {"type": "string", "description": "Path to search in", "required": False},
+                    "raw": {"type": "boolean", "description": "Return the API's entries unchanged", "required": False},
+                },
+            },
+            "search_with_metadata": {
+                "description": "Search for files and fetch each match's metadata concurrently",
                 "parameters": {
                     "query": {"type": "string", "description": "Search query", "required": True},
                     "path": {"type": "string", "description": "Path to search in", "required": False},
@@ -96,103 +190,123 @@ class DropboxConnector(BaseConnector):
             },
         }
 
+    # action -> handler method; every handler takes (params)
+    _DISPATCH: dict[str, str] = {
+        "upload": "_upload",
+        "download": "_download",
+        "delete": "_delete",
+        "list_folder": "_list_folder",
+        "list_folder_stream": "_list_folder_stream",
+        "create_folder": "_create_folder",
+        "move": "_move",
+        "copy": "_copy",
+        "get_metadata": "_get_metadata",
+        "get_metadata_batch": "_get_metadata_batch",
+        "search": "_search",
+        "search_with_metadata": "_search_with_metadata",
+        "get_shared_link": "_get_shared_link",
+    }
+
     async def execute(self, action: str, params: dict[str, Any]) -> ConnectorResult:
+        handler_name = self._DISPATCH.get(action)
+        if handler_name is None:
+            return ConnectorResult(success=False, error=f"Unknown action: {action}")
         try:
-            if action == "upload":
-                return await self._upload(params)
-            elif action == "download":
-                return await self._download(params["path"])
-            elif action == "delete":
-                return await self._delete(params["path"])
-            elif action == "list_folder":
-                return await self._list_folder(params.get("path", ""), params.get("recursive", False))
-            elif action == "create_folder":
-                return await self._create_folder(params["path"])
-            elif action == "move":
-                return await self._move(params["from_path"], params["to_path"])
-            elif action == "copy":
-                return await self._copy(params["from_path"], params["to_path"])
-            elif action == "get_metadata":
-                return await self._get_metadata(params["path"])
-            elif action == "search":
-                return await self._search(params["query"], params.get("path", ""))
-            elif action == "get_shared_link":
-                return await self._get_shared_link(params["path"])
-            else:
-                return ConnectorResult(success=False, error=f"Unknown action: {action}")
+            return await getattr(self, handler_name)(params)
         except Exception as e:
             return ConnectorResult(success=False, error=str(e))
 
     async def _upload(self, params: dict) -> ConnectorResult:
-        content = base64.b64decode(params["content"])
-        import json
+        if params.get("content_path"):
+            content = read_file_chunks(resolve_transfer_path(params["content_path"]))
+        else:
+            content = base64.b64decode(params["content"])
 
+        # Dropbox-API-Arg stays on stdlib json: header values must be ASCII,
+        # and json.dumps escapes non-ASCII paths as \uXXXX
+        mode = params.get("mode", "overwrite")
+        if mode == "overwrite":
+            api_arg = _UPLOAD_ARG_OVERWRITE % json.dumps(params["path"])
+        else:
+            api_arg = json.dumps({"path": params["path"], "mode": mode, "autorename": True})
         headers = {
-            "Authorization": f"Bearer {self.access_token}",
+            **self._headers,
             "Content-Type": "application/octet-stream",
-            "Dropbox-API-Arg": json.dumps({
-                "path": params["path"],
-                "mode": params.get("mode", "overwrite"),
-                "autorename": True,
-            }),
+            "Dropbox-API-Arg": api_arg,
         }
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.content_url}/files/upload",
-                headers=headers,
-                content=content,
-            )
-            response.raise_for_status()
-            data = response.json()
-            return ConnectorResult(success=True, data={"path": data["path_display"], "id": data["id"]})
-
-    async def _download(self, path: str) -> ConnectorResult:
-        import json
+        response = await self.client.post(
+            self._UPLOAD_URL,
+            headers=headers,
+            content=content,
+        )
+        response.raise_for_status()
+        data = json_loads(response.content)
+        # autorename may have stored the file under a different path
+        self._metadata_cache.pop(params["path"].lower())
+        self._metadata_cache.pop(data["path_display"].lower())
+        self._folder_cache.clear()
+        return ConnectorResult(success=True, data={"path": data["path_display"], "id": data["id"]})
 
+    async def _download(self, params: dict) -> ConnectorResult:
+        path, output_path = params["path"], params.get("output_path")
         headers = {
-            "Authorization": f"Bearer {self.access_token}",
-            "Dropbox-API-Arg": json.dumps({"path": path}),
+            **self._headers,
+            "Dropbox-API-Arg": _DOWNLOAD_ARG % json.dumps(path),
         }
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.content_url}/files/download",
-                headers=headers,
-            )
-            response.raise_for_status()
-            content = response.content
-            metadata = json.loads(response.headers.get("Dropbox-API-Result", "{}"))
-
+        if output_path:
+            async with self.client.stream("POST", self._DOWNLOAD_URL, headers=headers) as response:
+                response.raise_for_status()
+                metadata = json_loads(response.headers.get("Dropbox-API-Result", "{}"))
+                size = await write_response_to_file(response, resolve_transfer_path(output_path))
             return ConnectorResult(
                 success=True,
-                data={
-                    "content": base64.b64encode(content).decode(),
-                    "name": metadata.get("name"),
-                    "size": metadata.get("size"),
-                }
+                data={"path": output_path, "name": metadata.get("name"), "size": size}
             )
 
-    async def _delete(self, path: str) -> ConnectorResult:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/files/delete_v2",
-                headers=self._headers(),
-                json={"path": path},
-            )
+        async with self.client.stream("POST", self._DOWNLOAD_URL, headers=headers) as response:
             response.raise_for_status()
-            return ConnectorResult(success=True, data={"deleted": path})
-
-    async def _list_folder(self, path: str, recursive: bool) -> ConnectorResult:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/files/list_folder",
-                headers=self._headers(),
-                json={"path": path or "", "recursive": recursive},
-            )
-            response.raise_for_status()
-            data = response.json()
+            metadata = json_loads(response.headers.get("Dropbox-API-Result", "{}"))
+            if params.get("encoding") == "raw":
+                content = await response.aread()
+            else:
+                content = await encode_response_content(response)
 
+        return ConnectorResult(
+            success=True,
+            data={
+                "content": content,
+                "name": metadata.get("name"),
+                "size": metadata.get("size"),
+            }
+        )
+
+    async def _delete(self, params: dict) -> ConnectorResult:
+        path = params["path"]
+        response = await self.client.post(
+            self._DELETE_URL,
+            json={"path": path},
+            headers=self._headers,
+        )
+        response.raise_for_status()
+        # Deleting a folder removes everything under it
+        self._metadata_cache.clear()
+        self._folder_cache.clear()
+        return ConnectorResult(success=True, data={"deleted": path})
+
+    async def _list_folder(self, params: dict) -> ConnectorResult:
+        path, recursive = params.get("path", ""), params.get("recursive", False)
+        # The cache holds Dropbox's entries as returned; raw callers get them without a copy per item
+        cache_key = ((path or "").lower(), recursive)
+        server_entries = self._folder_cache.get(cache_key)
+        if server_entries is None:
+            server_entries = [entry async for entry in self.iter_folder(path, recursive)]
+            self._folder_cache.set(cache_key, server_entries)
+
+        if params.get("raw"):
+            entries = list(server_entries)
+        else:
             entries = [
                 {
                     "name": e["name"],
@@ -201,93 +315,195 @@ class DropboxConnector(BaseConnector):
                     "size": e.get("size"),
                     "modified": e.get("server_modified"),
                 }
-                for e in data.get("entries", [])
+                for e in server_entries
             ]
-            return ConnectorResult(success=True, data={"entries": entries, "count": len(entries)})
-
-    async def _create_folder(self, path: str) -> ConnectorResult:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/files/create_folder_v2",
-                headers=self._headers(),
-                json={"path": path},
-            )
-            response.raise_for_status()
-            data = response.json()
-            return ConnectorResult(success=True, data={"path": data["metadata"]["path_display"]})
-
-    async def _move(self, from_path: str, to_path: str) -> ConnectorResult:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/files/move_v2",
-                headers=self._headers(),
-                json={"from_path": from_path, "to_path": to_path},
-            )
-            response.raise_for_status()
-            data = response.json()
-            return ConnectorResult(success=True, data={"path": data["metadata"]["path_display"]})
-
-    async def _copy(self, from_path: str, to_path: str) -> ConnectorResult:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/files/copy_v2",
-                headers=self._headers(),
-                json={"from_path": from_path, "to_path": to_path},
-            )
-            response.raise_for_status()
-            data = response.json()
-            return ConnectorResult(success=True, data={"path": data["metadata"]["path_display"]})
-
-    async def _get_metadata(self, path: str) -> ConnectorResult:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/files/get_metadata",
-                headers=self._headers(),
-                json={"path": path},
-            )
-            response.raise_for_status()
-            data = response.json()
-            return ConnectorResult(
-                success=True,
-                data={
-                    "name": data["name"],
-                    "path": data["path_display"],
-                    "type": data[".tag"],
-                    "size": data.get("size"),
-                    "modified": data.get("server_modified"),
+        return ConnectorResult(success=True, data={"entries": entries, "count": len(entries)})
+
+    async def _list_folder_stream(self, params: dict) -> ConnectorResult:
+        server_entries, cursor = await self._fetch_folder_page(
+            params.get("path", ""), params.get("recursive", False), params.get("cursor"), params.get("limit")
+        )
+        if params.get("raw"):
+            entries = server_entries
+        else:
+            entries = [
+                {
+                    "name": e["name"],
+                    "path": e["path_display"],
+                    "type": e[".tag"],
+                    "size": e.get("size"),
+                    "modified": e.get("server_modified"),
                 }
-            )
+                for e in server_entries
+            ]
+        return ConnectorResult(success=True, data={"entries": entries, "count": len(entries), "cursor": cursor})
 
-    async def _search(self, query: str, path: str) -> ConnectorResult:
-        async with httpx.AsyncClient() as client:
-            body = {"query": query}
-            if path:
-                body["options"] = {"path": path}
+    async def iter_folder(self, path: str = "", recursive: bool = False) -> AsyncIterator[dict]:
+        """Yield a folder's entries as returned by Dropbox, fetching pages as the caller consumes them."""
+        cursor = None
+        while True:
+            entries, cursor = await self._fetch_folder_page(path, recursive, cursor)
+            for entry in entries:
+                yield entry
+            if not cursor:
+                return
 
-            response = await client.post(
-                f"{self.base_url}/files/search_v2",
-                headers=self._headers(),
-                json=body,
+    async def _fetch_folder_page(
+        self, path: str, recursive: bool, cursor: str | None, limit: int | None = None
+    ) -> tuple[list[dict], str | None]:
+        """Fetch one listing page; the returned cursor is None once has_more is false."""
+        if cursor:
+            response = await self.client.post(
+                self._LIST_FOLDER_CONTINUE_URL,
+                json={"cursor": cursor},
+                headers=self._headers,
             )
-            response.raise_for_status()
-            data = response.json()
+        else:
+            body = {"path": path or "", "recursive": recursive}
+            if limit:
+                body["limit"] = limit
+            response = await self.client.post(self._LIST_FOLDER_URL, json=body, headers=self._headers)
+        response.raise_for_status()
+        data = json_loads(response.content)
+        entries = data.get("entries") or []
+
+        # Listing entries carry everything get_metadata returns
+        for e in entries:
+            if e[".tag"] != "deleted":
+                self._metadata_cache.set(e["path_display"].lower(), {
+                    "name": e["name"],
+                    "path": e["path_display"],
+                    "type": e[".tag"],
+                    "size": e.get("size"),
+                    "modified": e.get("server_modified"),
+                })
+        return entries, data["cursor"] if data.get("has_more") else None
+
+    async def _create_folder(self, params: dict) -> ConnectorResult:
+        path = params["path"]
+        response = await self.client.post(
+            self._CREATE_FOLDER_URL,
+            json={"path": path},
+            headers=self._headers,
+        )
+        response.raise_for_status()
+        self._metadata_cache.pop(path.lower())
+        self._folder_cache.clear()
+        data = json_loads(response.content)
+        return ConnectorResult(success=True, data={"path": data["metadata"]["path_display"]})
+
+    async def _move(self, params: dict) -> ConnectorResult:
+        from_path, to_path = params["from_path"], params["to_path"]
+        response = await self.client.post(
+            self._MOVE_URL,
+            json={"from_path": from_path, "to_path": to_path},
+            headers=self._headers,
+        )
+        response.raise_for_status()
+        # Moving a folder relocates everything under it
+        self._metadata_cache.clear()
+        self._folder_cache.clear()
+        data = json_loads(response.content)
+        return ConnectorResult(success=True, data={"path": data["metadata"]["path_display"]})
+
+    async def _copy(self, params: dict) -> ConnectorResult:
+        from_path, to_path = params["from_path"], params["to_path"]
+        response = await self.client.post(
+            self._COPY_URL,
+            json={"from_path": from_path, "to_path": to_path},
+            headers=self._headers,
+        )
+        response.raise_for_status()
+        self._metadata_cache.pop(to_path.lower())
+        self._folder_cache.clear()
+        data = json_loads(response.content)
+        return ConnectorResult(success=True, data={"path": data["metadata"]["path_display"]})
+
+    async def _get_metadata(self, params: dict) -> ConnectorResult:
+        return ConnectorResult(success=True, data=await self._fetch_metadata(params["path"]))
+
+    async def _get_metadata_batch(self, params: dict) -> ConnectorResult:
+        metadata = await self._fetch_metadata_many(params["paths"])
+        return ConnectorResult(success=True, data={"metadata": metadata, "count": len(metadata)})
+
+    async def _fetch_metadata_many(self, paths: list[str]) -> dict[str, dict]:
+        """Fetch metadata concurrently; a failed item maps to {"error": ...}."""
+        async def fetch(path: str) -> dict:
+            async with self._semaphore:
+                try:
+                    return await self._fetch_metadata(path)
+                except Exception as e:
+                    return {"error": str(e)}
+
+        async with asyncio.TaskGroup() as tg:
+            tasks = {path: tg.create_task(fetch(path)) for path in paths}
+        return {path: task.result() for path, task in tasks.items()}
 
+    async def _fetch_metadata(self, path: str) -> dict:
+        metadata = self._metadata_cache.get(path.lower())
+        if metadata is not None:
+            return dict(metadata)
+
+        response = await self.client.post(
+            self._GET_METADATA_URL,
+            json={"path": path},
+            headers=self._headers,
+        )
+        response.raise_for_status()
+        data = json_loads(response.content)
+        metadata = {
+            "name": data["name"],
+            "path": data["path_display"],
+            "type": data[".tag"],
+            "size": data.get("size"),
+            "modified": data.get("server_modified"),
+        }
+        self._metadata_cache.set(path.lower(), metadata)
+        return dict(metadata)
+
+    async def _search(self, params: dict) -> ConnectorResult:
+        body = {"query": params["query"]}
+        if params.get("path"):
+            body["options"] = {"path": params["path"]}
+
+        response = await self.client.post(
+            self._SEARCH_URL,
+            json=body,
+            headers=self._headers,
+        )
+        response.raise_for_status()
+        server_matches = json_loads(response.content).get("matches") or []
+
+        if params.get("raw"):
+            matches = server_matches
+        else:
             matches = [
                 {
                     "name": m["metadata"]["metadata"]["name"],
                     "path": m["metadata"]["metadata"]["path_display"],
                 }
-                for m in data.get("matches", [])
+                for m in server_matches
             ]
-            return ConnectorResult(success=True, data={"matches": matches, "count": len(matches)})
-
-    async def _get_shared_link(self, path: str) -> ConnectorResult:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/sharing/create_shared_link_with_settings",
-                headers=self._headers(),
-                json={"path": path},
-            )
-            response.raise_for_status()
-            data = response.json()
-            return ConnectorResult(success=True, data={"url": data["url"]})
+        return ConnectorResult(success=True, data={"matches": matches, "count": len(matches)})
+
+    async def _search_with_metadata(self, params: dict) -> ConnectorResult:
+        result = await self._search({"query": params["query"], "path": params.get("path")})
+        matches = result.data["matches"]
+        metadata = await self._fetch_metadata_many([m["path"] for m in matches])
+        enriched = [{**m, **metadata[m["path"]]} for m in matches]
+        return ConnectorResult(success=True, data={"matches": enriched, "count": len(enriched)})
+
+    async def _get_shared_link(self, params: dict) -> ConnectorResult:
+        path = params["path"]
+        response = await self.client.post(
+            self._SHARED_LINK_URL,
+            json={"path": path},
+            headers=self._headers,
+        )
+        response.raise_for_status()
+        data = json_loads(response.content)
+        return ConnectorResult(success=True, data={"url": data["url"]})
+
+    async def close(self):
+        # The shared client stays open for other instances; see close_client_pool()
+        pass
@@ -4,9 +4,62 @@ Google Cloud Storage Connector
 Connect to Google Cloud Storage for object storage operations.
 """
 
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from typing import Any
-import base64
+import asyncio
+import functools
+import tempfile
 from ..base import BaseConnector, ConnectorResult
+from ..cache import TTLCache
+from ..codec import Base64Writer, decode_content, json_loads
+
+try:
+    from google.api_core.exceptions import NotFound
+    from google.cloud import storage
+    from google.cloud.storage import transfer_manager
+    from google.oauth2 import service_account
+except ImportError:  # optional dependency, reported when the connector is used
+    storage = None
+
+
+# Partial-response masks: fetch only the fields each action reports
+_BLOB_LIST_FIELDS = "items(name,size,updated,contentType),nextPageToken"
+_BUCKET_LIST_FIELDS = "items(name,timeCreated),nextPageToken"
+_BLOB_METADATA_FIELDS = "name,size,contentType,updated,md5Hash,etag"
+
+# Uploads above this size go up as concurrently uploaded parts (XML multipart
+# upload) instead of a single resumable upload
+_PARALLEL_UPLOAD_THRESHOLD = 32 * 1024 * 1024
+_PARALLEL_UPLOAD_CHUNK_SIZE = 16 * 1024 * 1024
+_PARALLEL_UPLOAD_WORKERS = 8
+
+# The storage client is blocking; its calls run on a dedicated bounded pool
+# so GCS actions overlap without exhausting the loop's default executor
+_EXECUTOR = ThreadPoolExecutor(max_workers=32, thread_name_prefix="gcs")
+
+
+async def _run(fn, *args, **kwargs):
+    """Run a blocking storage client call on the GCS thread pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_EXECUTOR, functools.partial(fn, *args, **kwargs))
+
+
+def _upload_in_parts(blob, content: bytes | bytearray, content_type: str | None) -> None:
+    """Upload a large payload as parts sent in parallel, then completed as one object."""
+    # The transfer manager reads parts from a file by name
+    with tempfile.NamedTemporaryFile() as tmp:
+        tmp.write(content)
+        tmp.flush()
+        transfer_manager.upload_chunks_concurrently(
+            tmp.name,
+            blob,
+            content_type=content_type,
+            chunk_size=_PARALLEL_UPLOAD_CHUNK_SIZE,
+            # threads share the authorized client; process workers would each rebuild it
+            worker_type=transfer_manager.THREAD,
+            max_workers=_PARALLEL_UPLOAD_WORKERS,
+        )
 
 
 class GCSConnector(BaseConnector):
@@ -17,188 +70,211 @@ class GCSConnector(BaseConnector):
         self.project_id = credentials.get("project_id")
         self.credentials_json = credentials.get("credentials_json")
         self._client = None
+        # Bucket wrappers by name, reused across actions on the same client
+        self._buckets = TTLCache(maxsize=64, ttl=3600)
 
     async def _get_client(self):
         """Get GCS client."""
         if self._client is None:
-            from google.cloud import storage
-            from google.oauth2 import service_account
-            import json
-
+            if storage is None:
+                raise ImportError("google-cloud-storage is required for the GCS connector")
+            # Parsed here, inside execute's error handling, so malformed JSON
+            # comes back as a failed result rather than a constructor error
             if isinstance(self.credentials_json, str):
-                creds_dict = json.loads(self.credentials_json)
+                creds_dict = json_loads(self.credentials_json)
             else:
                 creds_dict = self.credentials_json
-
             credentials = service_account.Credentials.from_service_account_info(creds_dict)
             self._client = storage.Client(project=self.project_id, credentials=credentials)
         return self._client
 
-    @classmethod
-    def get_actions(cls) -> dict[str, dict[str, Any]]:
-        return {
-            "upload": {
-                "description": "Upload a file to GCS",
-                "parameters": {
-                    "bucket": {"type": "string", "description": "Bucket name", "required": True},
-                    "blob_name": {"type": "string", "description": "Object name (path)", "required": True},
-                    "content": {"type": "string", "description": "Base64-encoded content", "required": True},
-                    "content_type": {"type": "string", "description": "MIME type", "required": False},
-                },
-            },
-            "download": {
-                "description": "Download a file from GCS",
-                "parameters": {
-                    "bucket": {"type": "string", "description": "Bucket name", "required": True},
-                    "blob_name": {"type": "string", "description": "Object name", "required": True},
-                },
+    def _bucket(self, client, name: str):
+        """Get a (cached) bucket wrapper; creating one makes no request."""
+        bucket = self._buckets.get(name)
+        if bucket is None:
+            bucket = client.bucket(name)
+            self._buckets.set(name, bucket)
+        return bucket
+
+    # Built once at import; get_actions() returns this shared dict, so treat it as read-only
+    _ACTIONS: dict[str, dict[str, Any]] = {
+        "upload": {
+            "description": "Upload a file to GCS",
+            "parameters": {
+                "bucket": {"type": "string", "description": "Bucket name", "required": True},
+                "blob_name": {"type": "string", "description": "Object name (path)", "required": True},
+                "content": {"type": "string", "description": "Base64-encoded content (or raw bytes)", "required": True},
+                "content_type": {"type": "string", "description": "MIME type", "required": False},
             },
-            "delete": {
-                "description": "Delete an object",
-                "parameters": {
-                    "bucket": {"type": "string", "description": "Bucket name", "required": True},
-                    "blob_name": {"type": "string", "description": "Object name", "required": True},
-                },
+        },
+        "download": {
+            "description": "Download a file from GCS",
+            "parameters": {
+                "bucket": {"type": "string", "description": "Bucket name", "required": True},
+                "blob_name": {"type": "string", "description": "Object name", "required": True},
+                "encoding": {"type": "string", "description": "base64 (default) or raw (return bytes unencoded)", "required": False},
             },
-            "list_blobs": {
-                "description": "List objects in a bucket",
-                "parameters": {
-                    "bucket": {"type": "string", "description": "Bucket name", "required": True},
-                    "prefix": {"type": "string", "description": "Name prefix", "required": False},
-                    "max_results": {"type": "integer", "description": "Max objects", "required": False},
-                },
+        },
+        "delete": {
+            "description": "Delete an object",
+            "parameters": {
+                "bucket": {"type": "string", "description": "Bucket name", "required": True},
+                "blob_name": {"type": "string", "description": "Object name", "required": True},
             },
-            "copy": {
-                "description": "Copy an object",
-                "parameters": {
-                    "source_bucket": {"type": "string", "description": "Source bucket", "required": True},
-                    "source_blob": {"type": "string", "description": "Source object", "required": True},
-                    "dest_bucket": {"type": "string", "description": "Destination bucket", "required": True},
-                    "dest_blob": {"type": "string", "description": "Destination object", "required": True},
-                },
+        },
+        "list_blobs": {
+            "description": "List objects in a bucket",
+            "parameters": {
+                "bucket": {"type": "string", "description": "Bucket name", "required": True},
+                "prefix": {"type": "string", "description": "Name prefix", "required": False},
+                "max_results": {"type": "integer", "description": "Max objects", "required": False},
             },
-            "get_signed_url": {
-                "description": "Generate a signed URL",
-                "parameters": {
-                    "bucket": {"type": "string", "description": "Bucket name", "required": True},
-                    "blob_name": {"type": "string", "description": "Object name", "required": True},
-                    "method": {"type": "string", "description": "GET or PUT", "required": False},
-                    "expires_in": {"type": "integer", "description": "Expiry in minutes", "required": False},
-                },
+        },
+        "copy": {
+            "description": "Copy an object",
+            "parameters": {
+                "source_bucket": {"type": "string", "description": "Source bucket", "required": True},
+                "source_blob": {"type": "string", "description": "Source object", "required": True},
+                "dest_bucket": {"type": "string", "description": "Destination bucket", "required": True},
+                "dest_blob": {"type": "string", "description": "Destination object", "required": True},
             },
-            "list_buckets": {
-                "description": "List all buckets",
-                "parameters": {},
+        },
+        "get_signed_url": {
+            "description": "Generate a signed URL",
+            "parameters": {
+                "bucket": {"type": "string", "description": "Bucket name", "required": True},
+                "blob_name": {"type": "string", "description": "Object name", "required": True},
+                "method": {"type": "string", "description": "GET or PUT", "required": False},
+                "expires_in": {"type": "integer", "description": "Expiry in minutes", "required": False},
             },
-            "create_bucket": {
-                "description": "Create a bucket",
-                "parameters": {
-                    "bucket": {"type": "string", "description": "Bucket name", "required": True},
-                    "location": {"type": "string", "description": "Location (e.g., US)", "required": False},
-                },
+        },
+        "list_buckets": {
+            "description": "List all buckets",
+            "parameters": {},
+        },
+        "create_bucket": {
+            "description": "Create a bucket",
+            "parameters": {
+                "bucket": {"type": "string", "description": "Bucket name", "required": True},
+                "location": {"type": "string", "description": "Location (e.g., US)", "required": False},
             },
-            "delete_bucket": {
-                "description": "Delete a bucket",
-                "parameters": {
-                    "bucket": {"type": "string", "description": "Bucket name", "required": True},
-                },
+        },
+        "delete_bucket": {
+            "description": "Delete a bucket",
+            "parameters": {
+                "bucket": {"type": "string", "description": "Bucket name", "required": True},
             },
-            "get_blob_metadata": {
-                "description": "Get object metadata",
-                "parameters": {
-                    "bucket": {"type": "string", "description": "Bucket name", "required": True},
-                    "blob_name": {"type": "string", "description": "Object name", "required": True},
-                },
+        },
+        "get_blob_metadata": {
+            "description": "Get object metadata",
+            "parameters": {
+                "bucket": {"type": "string", "description": "Bucket name", "required": True},
+                "blob_name": {"type": "string", "description": "Object name", "required": True},
             },
-        }
+        },
+    }
+
+    @classmethod
+    def get_actions(cls) -> dict[str, dict[str, Any]]:
+        return cls._ACTIONS
+
+    # action -> handler method; every handler takes (client, params)
+    _DISPATCH: dict[str, str] = {
+        "upload": "_upload",
+        "download": "_download",
+        "delete": "_delete",
+        "list_blobs": "_list_blobs",
+        "copy": "_copy",
+        "get_signed_url": "_get_signed_url",
+        "list_buckets": "_list_buckets",
+        "create_bucket": "_create_bucket",
+        "delete_bucket": "_delete_bucket",
+        "get_blob_metadata": "_get_blob_metadata",
+    }
 
     async def execute(self, action: str, params: dict[str, Any]) -> ConnectorResult:
+        handler_name = self._DISPATCH.get(action)
+        if handler_name is None:
+            return ConnectorResult(success=False, error=f"Unknown action: {action}")
         try:
             client = await self._get_client()
-
-            if action == "upload":
-                return await self._upload(client, params)
-            elif action == "download":
-                return await self._download(client, params["bucket"], params["blob_name"])
-            elif action == "delete":
-                return await self._delete(client, params["bucket"], params["blob_name"])
-            elif action == "list_blobs":
-                return await self._list_blobs(client, params)
-            elif action == "copy":
-                return await self._copy(client, params)
-            elif action == "get_signed_url":
-                return await self._get_signed_url(client, params)
-            elif action == "list_buckets":
-                return await self._list_buckets(client)
-            elif action == "create_bucket":
-                return await self._create_bucket(client, params["bucket"], params.get("location", "US"))
-            elif action == "delete_bucket":
-                return await self._delete_bucket(client, params["bucket"])
-            elif action == "get_blob_metadata":
-                return await self._get_blob_metadata(client, params["bucket"], params["blob_name"])
-            else:
-                return ConnectorResult(success=False, error=f"Unknown action: {action}")
+            return await getattr(self, handler_name)(client, params)
         except Exception as e:
             return ConnectorResult(success=False, error=str(e))
 
     async def _upload(self, client, params: dict) -> ConnectorResult:
-        content = base64.b64decode(params["content"])
-        bucket = client.bucket(params["bucket"])
+        content = decode_content(params["content"])
+        bucket = self._bucket(client, params["bucket"])
         blob = bucket.blob(params["blob_name"])
 
-        blob.upload_from_string(content, content_type=params.get("content_type"))
+        if len(content) > _PARALLEL_UPLOAD_THRESHOLD:
+            await _run(_upload_in_parts, blob, content, params.get("content_type"))
+        else:
+            await _run(blob.upload_from_string, content, content_type=params.get("content_type"))
         return ConnectorResult(success=True, data={"blob": params["blob_name"], "bucket": params["bucket"]})
 
-    async def _download(self, client, bucket_name: str, blob_name: str) -> ConnectorResult:
-        bucket = client.bucket(bucket_name)
-        blob = bucket.blob(blob_name)
-        content = blob.download_as_bytes()
+    async def _download(self, client, params: dict) -> ConnectorResult:
+        bucket = self._bucket(client, params["bucket"])
+        blob = bucket.blob(params["blob_name"])
+        if params.get("encoding") == "raw":
+            content = await _run(blob.download_as_bytes)
+            size = len(content)
+        else:
+            # Encode as the body streams in rather than buffering the raw bytes
+            writer = Base64Writer()
+            await _run(blob.download_to_file, writer)
+            content, size = writer.getvalue(), writer.size
 
         return ConnectorResult(
             success=True,
             data={
-                "content": base64.b64encode(content).decode(),
+                "content": content,
                 "content_type": blob.content_type,
-                "size": blob.size,
+                "size": size,
             }
         )
 
-    async def _delete(self, client, bucket_name: str, blob_name: str) -> ConnectorResult:
-        bucket = client.bucket(bucket_name)
-        blob = bucket.blob(blob_name)
-        blob.delete()
-        return ConnectorResult(success=True, data={"deleted": blob_name})
+    async def _delete(self, client, params: dict) -> ConnectorResult:
+        bucket = self._bucket(client, params["bucket"])
+        blob = bucket.blob(params["blob_name"])
+        await _run(blob.delete)
+        return ConnectorResult(success=True, data={"deleted": params["blob_name"]})
 
     async def _list_blobs(self, client, params: dict) -> ConnectorResult:
-        bucket = client.bucket(params["bucket"])
-        blobs = bucket.list_blobs(
+        bucket = self._bucket(client, params["bucket"])
+        pages = bucket.list_blobs(
             prefix=params.get("prefix"),
-            max_results=params.get("max_results")
-        )
+            max_results=params.get("max_results"),
+            fields=_BLOB_LIST_FIELDS,
+        ).pages
 
-        blob_list = [
-            {
-                "name": blob.name,
-                "size": blob.size,
-                "updated": blob.updated.isoformat() if blob.updated else None,
-                "content_type": blob.content_type,
-            }
-            for blob in blobs
-        ]
+        # Each page is a blocking request; fetch the next one in a worker
+        # thread while the current page is materialized
+        blob_list = []
+        next_page = asyncio.create_task(_run(next, pages, None))
+        while (page := await next_page) is not None:
+            next_page = asyncio.create_task(_run(next, pages, None))
+            blob_list.extend(
+                {
+                    "name": blob.name,
+                    "size": blob.size,
+                    "updated": blob.updated.isoformat() if blob.updated else None,
+                    "content_type": blob.content_type,
+                }
+                for blob in page
+            )
         return ConnectorResult(success=True, data={"blobs": blob_list, "count": len(blob_list)})
 
     async def _copy(self, client, params: dict) -> ConnectorResult:
-        source_bucket = client.bucket(params["source_bucket"])
+        source_bucket = self._bucket(client, params["source_bucket"])
         source_blob = source_bucket.blob(params["source_blob"])
-        dest_bucket = client.bucket(params["dest_bucket"])
+        dest_bucket = self._bucket(client, params["dest_bucket"])
 
-        source_bucket.copy_blob(source_blob, dest_bucket, params["dest_blob"])
+        await _run(source_bucket.copy_blob, source_blob, dest_bucket, params["dest_blob"])
         return ConnectorResult(success=True, data={"copied": params["dest_blob"]})
 
     async def _get_signed_url(self, client, params: dict) -> ConnectorResult:
-        from datetime import timedelta
-
-        bucket = client.bucket(params["bucket"])
+        bucket = self._bucket(client, params["bucket"])
         blob = bucket.blob(params["blob_name"])
 
         url = blob.generate_signed_url(
@@ -208,43 +284,54 @@ class GCSConnector(BaseConnector):
         )
         return ConnectorResult(success=True, data={"url": url})
 
-    async def _list_buckets(self, client) -> ConnectorResult:
-        buckets = list(client.list_buckets())
+    async def _list_buckets(self, client, params: dict) -> ConnectorResult:
+        buckets = await _run(list, client.list_buckets(fields=_BUCKET_LIST_FIELDS))
         bucket_list = [
             {"name": b.name, "created": b.time_created.isoformat() if b.time_created else None}
             for b in buckets
         ]
         return ConnectorResult(success=True, data={"buckets": bucket_list})
 
-    async def _create_bucket(self, client, bucket_name: str, location: str) -> ConnectorResult:
-        bucket = client.bucket(bucket_name)
-        bucket.location = location
-        client.create_bucket(bucket)
-        return ConnectorResult(success=True, data={"created": bucket_name})
-
-    async def _delete_bucket(self, client, bucket_name: str) -> ConnectorResult:
-        bucket = client.bucket(bucket_name)
-        bucket.delete()
-        return ConnectorResult(success=True, data={"deleted": bucket_name})
+    async def _create_bucket(self, client, params: dict) -> ConnectorResult:
+        # A fresh wrapper, since location is set on it before creation
+        bucket = client.bucket(params["bucket"])
+        bucket.location = params.get("location", "US")
+        await _run(client.create_bucket, bucket)
+        return ConnectorResult(success=True, data={"created": params["bucket"]})
 
-    async def _get_blob_metadata(self, client, bucket_name: str, blob_name: str) -> ConnectorResult:
-        bucket = client.bucket(bucket_name)
-        blob = bucket.get_blob(blob_name)
+    async def _delete_bucket(self, client, params: dict) -> ConnectorResult:
+        bucket = self._bucket(client, params["bucket"])
+        await _run(bucket.delete)
+        self._buckets.pop(params["bucket"])
+        return ConnectorResult(success=True, data={"deleted": params["bucket"]})
 
-        if not blob:
+    async def _get_blob_metadata(self, client, params: dict) -> ConnectorResult:
+        bucket = self._bucket(client, params["bucket"])
+        # get_blob() has no field mask and returns the full resource (ACLs,
+        # encryption, custom metadata), so request the masked resource directly
+        try:
+            resource = await _run(
+                client._connection.api_request,
+                method="GET",
+                path=bucket.blob(params["blob_name"]).path,
+                query_params={"fields": _BLOB_METADATA_FIELDS},
+            )
+        except NotFound:
             return ConnectorResult(success=False, error="Blob not found")
 
+        updated = resource.get("updated")
         return ConnectorResult(
             success=True,
             data={
-                "name": blob.name,
-                "size": blob.size,
-                "content_type": blob.content_type,
-                "updated": blob.updated.isoformat() if blob.updated else None,
-                "md5_hash": blob.md5_hash,
-                "etag": blob.etag,
+                "name": resource["name"],
+                "size": int(resource["size"]) if "size" in resource else None,
+                "content_type": resource.get("contentType"),
+                "updated": datetime.fromisoformat(updated).isoformat() if updated else None,
+                "md5_hash": resource.get("md5Hash"),
+                "etag": resource.get("etag"),
             }
         )
 
     async def close(self):
         self._client = None
+        self._buckets.clear()
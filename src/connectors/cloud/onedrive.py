@@ -4,126 +4,323 @@ OneDrive Connector
 Connect to Microsoft OneDrive for file storage operations.
 """
 
-from typing import Any
-import base64
+from typing import Any, AsyncGenerator, AsyncIterator, Awaitable, Callable
+from urllib.parse import quote
+import asyncio
 import httpx
-from ..base import BaseConnector, ConnectorResult
+from ..auth import OAuth2Config, OAuth2Provider, TokenData, TokenStore
+from ..base import HTTP2_AVAILABLE, BaseConnector, ConnectorResult, RetryTransport
+from ..cache import ClientPool, shared_cache
+from ..codec import decode_content, encode_response_content, json_loads
+
+
+# Graph's simple upload rejects bodies over 4 MiB; larger files go through an
+# upload session, in fragments that must be a multiple of 320 KiB
+_SIMPLE_UPLOAD_LIMIT = 4 * 1024 * 1024
+_UPLOAD_FRAGMENT_SIZE = 32 * 320 * 1024
+
+# Listings ask for larger pages and, unless raw items were requested, only the
+# fields each action reports
+_PAGE_SIZE = 200
+_LIST_FIELDS = "id,name,folder,size,lastModifiedDateTime"
+_SEARCH_FIELDS = "id,name,folder,parentReference"
+# Listings follow @odata.nextLink until this many items unless max_items says otherwise
+_MAX_ITEMS = 1000
+
+_GRAPH_TOKEN_URL = "https://login.microsoftonline.com/common/oauth2/v2.0/token"
+
+# One pooled client (and its _GraphAuth) per account, shared by every
+# connector instance for it; bounded, closing the clients it evicts
+_CLIENT_POOL = ClientPool(lambda client: client.aclose())
+
+
+async def close_client_pool():
+    """Close all pooled OneDrive HTTP clients. Call on application shutdown."""
+    await _CLIENT_POOL.aclose()
+
+
+def _account_identity(credentials: dict[str, Any]) -> tuple:
+    """
+    Identify an account by what stays fixed while its tokens refresh: the app
+    and the original refresh token (rotated ones live in the TokenStore), or
+    the access token itself when it can't be refreshed.
+    """
+    if credentials.get("refresh_token") and credentials.get("client_id"):
+        return (credentials["client_id"], credentials["refresh_token"])
+    return (None, credentials.get("access_token"))
+
+
+class _GraphAuth(httpx.Auth):
+    """
+    Bearer auth backed by the TokenStore, so tokens outlive the per-call
+    connector instances.
+
+    Requests use the stored access token while it is valid. Once it has
+    expired (or a request gets a 401) the latest refresh token is redeemed
+    and both new tokens are saved back to the store.
+    """
+
+    def __init__(
+        self,
+        access_token: str | None,
+        provider: OAuth2Provider | None = None,
+        cache_key: str | None = None,
+        refresh_token: str | None = None,
+    ):
+        self._token = access_token
+        self._provider = provider
+        self._cache_key = cache_key
+        # Refresh tokens outlive the access tokens they came with, and stores
+        # drop expired entries, so the latest one is saved under its own key
+        self._refresh_key = TokenStore.generate_key(cache_key, "refresh_token") if cache_key else None
+        self._refresh_token = refresh_token
+        self._lock = asyncio.Lock()
+
+    async def async_auth_flow(self, request: httpx.Request) -> AsyncGenerator[httpx.Request, httpx.Response]:
+        token = await self._access_token()
+        request.headers["Authorization"] = f"Bearer {token}"
+        response = yield request
+        if response.status_code == 401 and self._provider is not None:
+            token = await self._refresh(token)
+            request.headers["Authorization"] = f"Bearer {token}"
+            yield request
+
+    async def _access_token(self) -> str | None:
+        if self._provider is None:
+            return self._token
+        cached = await self._provider.store.get(self._cache_key)
+        if cached is not None:
+            return cached.access_token
+        if await self._provider.store.get(self._refresh_key) is not None:
+            # Refreshed before and the stored access token has since expired
+            return await self._refresh(None)
+        return self._token  # first use: the credentials' own access token
+
+    async def _refresh(self, stale_token: str | None) -> str:
+        async with self._lock:
+            store = self._provider.store
+            cached = await store.get(self._cache_key)
+            if cached is not None and cached.access_token != stale_token:
+                return cached.access_token  # another request already refreshed it
+            saved = await store.get(self._refresh_key)
+            token = await self._provider.refresh(saved.access_token if saved else self._refresh_token)
+            if token.refresh_token:
+                # Microsoft rotates refresh tokens; the next refresh must use the new one
+                await store.set(self._refresh_key, TokenData(access_token=token.refresh_token))
+            self._token = token.access_token
+            return token.access_token
+
+
+class _GraphPages:
+    """
+    Each page's items of a Graph collection, fetching the next page while the
+    caller works.
+
+    Stops after ``max_items`` items without fetching further; ``has_more``
+    then tells whether the collection had more.
+    """
+
+    def __init__(self, get_page: Callable[[str], Awaitable[dict]], page: dict, max_items: int):
+        self._get_page = get_page
+        self._page = page
+        self._remaining = max_items
+        self.has_more = False
+
+    async def __aiter__(self) -> AsyncIterator[list]:
+        page = self._page
+        while True:
+            entries = page.get("value") or []
+            next_link = page.get("@odata.nextLink")
+            if len(entries) >= self._remaining:
+                self.has_more = len(entries) > self._remaining or bool(next_link)
+                yield entries[:self._remaining]
+                return
+            self._remaining -= len(entries)
+            next_page = asyncio.create_task(self._get_page(next_link)) if next_link else None
+            try:
+                yield entries
+            except BaseException:
+                # The caller stopped early; don't leave the prefetch running
+                if next_page is not None:
+                    next_page.cancel()
+                raise
+            if next_page is None:
+                return
+            page = await next_page
 
 
 class OneDriveConnector(BaseConnector):
     """Connector for Microsoft OneDrive."""
 
+    base_url = "https://graph.microsoft.com/v1.0"
+    _UPLOAD_HEADERS = {"Content-Type": "application/octet-stream"}
+
     def __init__(self, credentials: dict[str, Any]):
         super().__init__(credentials)
         self.access_token = credentials.get("access_token")
-        self.base_url = "https://graph.microsoft.com/v1.0"
+        # Identifies the account across the per-call instances
+        self._account = _account_identity(credentials)
+        # Destination folder IDs for copy/move, keyed by lowercased path
+        # (OneDrive paths are case-insensitive) and shared by every instance
+        # for the account; delete and move clear it
+        self._id_cache = shared_cache(("onedrive", "ids", *self._account), maxsize=256, ttl=60)
+        # (ETag, parsed body) per GET URL, revalidated with If-None-Match and
+        # shared by every instance for the account; the server decides
+        # freshness, so writes need not invalidate it
+        self._etags = shared_cache(("onedrive", "etags", *self._account), maxsize=256, ttl=3600)
 
-    def _headers(self):
-        return {
-            "Authorization": f"Bearer {self.access_token}",
-            "Content-Type": "application/json",
-        }
+    def _create_client(self) -> httpx.AsyncClient:
+        # Instances are built per call, so the keep-alive pool is shared per
+        # account and app settings (none of which change on refresh); the
+        # token comes from _GraphAuth and JSON bodies set their own
+        # Content-Type
+        key = (
+            *_account_identity(self.credentials),
+            self.credentials.get("client_secret"),
+            self.credentials.get("token_url"),
+            self.credentials.get("scope"),
+        )
+        client = _CLIENT_POOL.get(key)
+        if client is None or client.is_closed:
+            client = self._new_client()
+            _CLIENT_POOL.set(key, client)
+        return client
 
-    @classmethod
-    def get_actions(cls) -> dict[str, dict[str, Any]]:
-        return {
-            "upload": {
-                "description": "Upload a file",
-                "parameters": {
-                    "path": {"type": "string", "description": "File path in OneDrive", "required": True},
-                    "content": {"type": "string", "description": "Base64-encoded content", "required": True},
-                },
+    def _new_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            auth=self._create_auth(),
+            transport=RetryTransport(
+                httpx.AsyncHTTPTransport(
+                    limits=httpx.Limits(max_connections=64, max_keepalive_connections=32, keepalive_expiry=30.0),
+                    # Concurrent calls multiplex as streams over one TLS connection
+                    http2=HTTP2_AVAILABLE,
+                )
+            ),
+            timeout=30.0,
+        )
+
+    def _create_auth(self) -> _GraphAuth:
+        """Bearer auth for the access token, refreshable when a refresh token and client ID are given."""
+        access_token = self.credentials.get("access_token")
+        refresh_token = self.credentials.get("refresh_token")
+        if not (refresh_token and self.credentials.get("client_id")):
+            return _GraphAuth(access_token)
+
+        token_url = self.credentials.get("token_url", _GRAPH_TOKEN_URL)
+        # Keyed per refresh token so user tokens never share a cache entry
+        # with client-credential tokens for the same app
+        cache_key = TokenStore.generate_key(token_url, self.credentials["client_id"], refresh_token)
+        provider = OAuth2Provider(
+            OAuth2Config(
+                token_url=token_url,
+                client_id=self.credentials["client_id"],
+                client_secret=self.credentials.get("client_secret"),
+                scope=self.credentials.get("scope"),
+            ),
+            cache_key=cache_key,
+        )
+        return _GraphAuth(access_token, provider, cache_key, refresh_token)
+
+    # Built once at import; get_actions() returns this shared dict, so treat it as read-only
+    _ACTIONS: dict[str, dict[str, Any]] = {
+        "upload": {
+            "description": "Upload a file",
+            "parameters": {
+                "path": {"type": "string", "description": "File path in OneDrive", "required": True},
+                "content": {"type": "string", "description": "Base64-encoded content (or raw bytes)", "required": True},
             },
-            "download": {
-                "description": "Download a file",
-                "parameters": {
-                    "path": {"type": "string", "description": "File path", "required": True},
-                },
+        },
+        "download": {
+            "description": "Download a file",
+            "parameters": {
+                "path": {"type": "string", "description": "File path", "required": True},
+                "encoding": {"type": "string", "description": "base64 (default) or raw (return bytes unencoded)", "required": False},
             },
-            "delete": {
-                "description": "Delete a file or folder",
-                "parameters": {
-                    "path": {"type": "string", "description": "Path to delete", "required": True},
-                },
+        },
+        "delete": {
+            "description": "Delete a file or folder",
+            "parameters": {
+                "path": {"type": "string", "description": "Path to delete", "required": True},
             },
-            "list_folder": {
-                "description": "List items in a folder",
-                "parameters": {
-                    "path": {"type": "string", "description": "Folder path (empty for root)", "required": False},
-                },
+        },
+        "list_folder": {
+            "description": "List items in a folder",
+            "parameters": {
+                "path": {"type": "string", "description": "Folder path (empty for root)", "required": False},
+                "max_items": {"type": "integer", "description": "Max items to return (default 1000)", "required": False},
+                "raw": {"type": "boolean", "description": "Return the API's entries unchanged", "required": False},
             },
-            "create_folder": {
-                "description": "Create a folder",
-                "parameters": {
-                    "path": {"type": "string", "description": "Parent folder path", "required": True},
-                    "name": {"type": "string", "description": "Folder name", "required": True},
-                },
+        },
+        "create_folder": {
+            "description": "Create a folder",
+            "parameters": {
+                "path": {"type": "string", "description": "Parent folder path", "required": True},
+                "name": {"type": "string", "description": "Folder name", "required": True},
             },
-            "copy": {
-                "description": "Copy a file or folder",
-                "parameters": {
-                    "path": {"type": "string", "description": "Source path", "required": True},
-                    "dest_path": {"type": "string", "description": "Destination folder path", "required": True},
-                    "new_name": {"type": "string", "description": "New name (optional)", "required": False},
-                },
+        },
+        "copy": {
+            "description": "Copy a file or folder",
+            "parameters": {
+                "path": {"type": "string", "description": "Source path", "required": True},
+                "dest_path": {"type": "string", "description": "Destination folder path", "required": True},
+                "new_name": {"type": "string", "description": "New name (optional)", "required": False},
             },
-            "move": {
-                "description": "Move a file or folder",
-                "parameters": {
-                    "path": {"type": "string", "description": "Source path", "required": True},
-                    "dest_path": {"type": "string", "description": "Destination folder path", "required": True},
-                },
+        },
+        "move": {
+            "description": "Move a file or folder",
+            "parameters": {
+                "path": {"type": "string", "description": "Source path", "required": True},
+                "dest_path": {"type": "string", "description": "Destination folder path", "required": True},
             },
-            "get_item": {
-                "description": "Get item metadata",
-                "parameters": {
-                    "path": {"type": "string", "description": "Path", "required": True},
-                },
+        },
+        "get_item": {
+            "description": "Get item metadata",
+            "parameters": {
+                "path": {"type": "string", "description": "Path", "required": True},
             },
-            "search": {
-                "description": "Search for files",
-                "parameters": {
-                    "query": {"type": "string", "description": "Search query", "required": True},
-                },
+        },
+        "search": {
+            "description": "Search for files",
+            "parameters": {
+                "query": {"type": "string", "description": "Search query", "required": True},
+                "max_items": {"type": "integer", "description": "Max results to return (default 1000)", "required": False},
+                "raw": {"type": "boolean", "description": "Return the API's entries unchanged", "required": False},
             },
-            "create_sharing_link": {
-                "description": "Create a sharing link",
-                "parameters": {
-                    "path": {"type": "string", "description": "File path", "required": True},
-                    "type": {"type": "string", "description": "view or edit", "required": False},
-                    "scope": {"type": "string", "description": "anonymous or organization", "required": False},
-                },
+        },
+        "create_sharing_link": {
+            "description": "Create a sharing link",
+            "parameters": {
+                "path": {"type": "string", "description": "File path", "required": True},
+                "type": {"type": "string", "description": "view or edit", "required": False},
+                "scope": {"type": "string", "description": "anonymous or organization", "required": False},
             },
-        }
+        },
+    }
+
+    @classmethod
+    def get_actions(cls) -> dict[str, dict[str, Any]]:
+        return cls._ACTIONS
+
+    # action -> handler method; every handler takes (params)
+    _DISPATCH: dict[str, str] = {
+        "upload": "_upload",
+        "download": "_download",
+        "delete": "_delete",
+        "list_folder": "_list_folder",
+        "create_folder": "_create_folder",
+        "copy": "_copy",
+        "move": "_move",
+        "get_item": "_get_item",
+        "search": "_search",
+        "create_sharing_link": "_create_sharing_link",
+    }
 
     async def execute(self, action: str, params: dict[str, Any]) -> ConnectorResult:
+        handler_name = self._DISPATCH.get(action)
+        if handler_name is None:
+            return ConnectorResult(success=False, error=f"Unknown action: {action}")
         try:
-            if action == "upload":
-                return await self._upload(params["path"], params["content"])
-            elif action == "download":
-                return await self._download(params["path"])
-            elif action == "delete":
-                return await self._delete(params["path"])
-            elif action == "list_folder":
-                return await self._list_folder(params.get("path", ""))
-            elif action == "create_folder":
-                return await self._create_folder(params["path"], params["name"])
-            elif action == "copy":
-                return await self._copy(params["path"], params["dest_path"], params.get("new_name"))
-            elif action == "move":
-                return await self._move(params["path"], params["dest_path"])
-            elif action == "get_item":
-                return await self._get_item(params["path"])
-            elif action == "search":
-                return await self._search(params["query"])
-            elif action == "create_sharing_link":
-                return await self._create_sharing_link(
-                    params["path"],
-                    params.get("type", "view"),
-                    params.get("scope", "anonymous")
-                )
-            else:
-                return ConnectorResult(success=False, error=f"Unknown action: {action}")
+            return await getattr(self, handler_name)(params)
         except Exception as e:
             return ConnectorResult(success=False, error=str(e))
 
@@ -131,168 +328,228 @@ class OneDriveConnector(BaseConnector):
         """Build URL for path."""
         if not path or path == "/":
             return f"{self.base_url}/me/drive/root"
-        return f"{self.base_url}/me/drive/root:/{path.lstrip('/')}"
+        # Percent-encode names so spaces, #, ? and % stay part of the path
+        return f"{self.base_url}/me/drive/root:/{quote(path.lstrip('/'), safe='/')}"
 
-    async def _upload(self, path: str, content: str) -> ConnectorResult:
-        file_content = base64.b64decode(content)
+    async def _upload(self, params: dict) -> ConnectorResult:
+        path = params["path"]
+        file_content = decode_content(params["content"])
 
-        async with httpx.AsyncClient() as client:
-            response = await client.put(
+        if len(file_content) > _SIMPLE_UPLOAD_LIMIT:
+            data = await self._session_upload(path, file_content)
+        else:
+            response = await self.client.put(
                 f"{self._path_url(path)}:/content",
-                headers={
-                    "Authorization": f"Bearer {self.access_token}",
-                    "Content-Type": "application/octet-stream",
-                },
+                headers=self._UPLOAD_HEADERS,
                 content=file_content,
             )
             response.raise_for_status()
-            data = response.json()
-            return ConnectorResult(success=True, data={"id": data["id"], "name": data["name"]})
+            data = json_loads(response.content)
+        return ConnectorResult(success=True, data={"id": data["id"], "name": data["name"]})
 
-    async def _download(self, path: str) -> ConnectorResult:
-        async with httpx.AsyncClient() as client:
-            # Get download URL
-            response = await client.get(
-                f"{self._path_url(path)}:/content",
-                headers=self._headers(),
-                follow_redirects=True,
-            )
-            response.raise_for_status()
-            content = response.content
+    async def _session_upload(self, path: str, content: bytes) -> dict:
+        """Upload a large file through an upload session; returns the created item."""
+        response = await self.client.post(
+            f"{self._path_url(path)}:/createUploadSession",
+            json={"item": {"@microsoft.graph.conflictBehavior": "replace"}},
+        )
+        response.raise_for_status()
+        upload_url = json_loads(response.content)["uploadUrl"]
 
-            return ConnectorResult(
-                success=True,
-                data={"content": base64.b64encode(content).decode()}
-            )
+        # Graph requires fragments in order, so they go out sequentially over
+        # the pooled connection rather than in parallel
+        total = len(content)
+        try:
+            for offset in range(0, total, _UPLOAD_FRAGMENT_SIZE):
+                fragment = content[offset:offset + _UPLOAD_FRAGMENT_SIZE]
+                response = await self._send_to_upload_url(
+                    "PUT",
+                    upload_url,
+                    headers={"Content-Range": f"bytes {offset}-{offset + len(fragment) - 1}/{total}"},
+                    content=fragment,
+                )
+                response.raise_for_status()
+        except BaseException:
+            await self._send_to_upload_url("DELETE", upload_url)
+            raise
+        return json_loads(response.content)
 
-    async def _delete(self, path: str) -> ConnectorResult:
-        async with httpx.AsyncClient() as client:
-            response = await client.delete(
-                self._path_url(path),
-                headers=self._headers(),
-            )
+    async def _send_to_upload_url(self, method: str, url: str, **kwargs) -> httpx.Response:
+        # Upload session URLs are pre-authenticated and reject a bearer token
+        request = self.client.build_request(method, url, **kwargs)
+        return await self.client.send(request, auth=None)
+
+    async def _download(self, params: dict) -> ConnectorResult:
+        url = f"{self._path_url(params['path'])}:/content"
+        if params.get("encoding") == "raw":
+            response = await self.client.get(url, follow_redirects=True)
+            response.raise_for_status()
+            return ConnectorResult(success=True, data={"content": response.content})
+
+        # Encode as the body streams in rather than buffering the raw bytes
+        async with self.client.stream("GET", url, follow_redirects=True) as response:
             response.raise_for_status()
-            return ConnectorResult(success=True, data={"deleted": path})
+            content = await encode_response_content(response)
+        return ConnectorResult(success=True, data={"content": content})
+
+    async def _delete(self, params: dict) -> ConnectorResult:
+        path = params["path"]
+        response = await self.client.delete(self._path_url(path))
+        response.raise_for_status()
+        self._id_cache.clear()
+        return ConnectorResult(success=True, data={"deleted": path})
 
-    async def _list_folder(self, path: str) -> ConnectorResult:
+    async def _list_folder(self, params: dict) -> ConnectorResult:
+        path = params.get("path", "")
         url = f"{self._path_url(path)}/children" if path else f"{self.base_url}/me/drive/root/children"
+        raw = params.get("raw")
+        max_items = int(params.get("max_items") or _MAX_ITEMS)
+        top = min(_PAGE_SIZE, max_items)
+        url += f"?$top={top}" if raw else f"?$select={_LIST_FIELDS}&$top={top}"
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=self._headers())
-            response.raise_for_status()
-            data = response.json()
-
-            items = [
-                {
-                    "id": item["id"],
-                    "name": item["name"],
-                    "type": "folder" if "folder" in item else "file",
-                    "size": item.get("size"),
-                    "modified": item.get("lastModifiedDateTime"),
-                }
-                for item in data.get("value", [])
-            ]
-            return ConnectorResult(success=True, data={"items": items, "count": len(items)})
-
-    async def _create_folder(self, path: str, name: str) -> ConnectorResult:
+        items = []
+        pages = self._pages(await self._get_json(url), max_items)
+        async for entries in pages:
+            if raw:
+                items.extend(entries)
+            else:
+                items.extend(
+                    {
+                        "id": item["id"],
+                        "name": item["name"],
+                        "type": "folder" if "folder" in item else "file",
+                        "size": item.get("size"),
+                        "modified": item.get("lastModifiedDateTime"),
+                    }
+                    for item in entries
+                )
+        return ConnectorResult(
+            success=True, data={"items": items, "count": len(items), "has_more": pages.has_more}
+        )
+
+    async def _create_folder(self, params: dict) -> ConnectorResult:
+        path = params["path"]
         url = f"{self._path_url(path)}/children" if path else f"{self.base_url}/me/drive/root/children"
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                url,
-                headers=self._headers(),
-                json={
-                    "name": name,
-                    "folder": {},
-                    "@microsoft.graph.conflictBehavior": "rename",
-                },
-            )
-            response.raise_for_status()
-            data = response.json()
-            return ConnectorResult(success=True, data={"id": data["id"], "name": data["name"]})
-
-    async def _copy(self, path: str, dest_path: str, new_name: str | None) -> ConnectorResult:
-        # First get the destination folder ID
-        dest_info = await self._get_item(dest_path)
-        if not dest_info.success:
-            return dest_info
-
-        body = {"parentReference": {"id": dest_info.data["id"]}}
-        if new_name:
-            body["name"] = new_name
-
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self._path_url(path)}:/copy",
-                headers=self._headers(),
-                json=body,
-            )
-            response.raise_for_status()
-            return ConnectorResult(success=True, data={"copied": True})
-
-    async def _move(self, path: str, dest_path: str) -> ConnectorResult:
-        # Get destination folder ID
-        dest_info = await self._get_item(dest_path)
-        if not dest_info.success:
-            return dest_info
-
-        async with httpx.AsyncClient() as client:
-            response = await client.patch(
-                self._path_url(path),
-                headers=self._headers(),
-                json={"parentReference": {"id": dest_info.data["id"]}},
-            )
-            response.raise_for_status()
-            data = response.json()
-            return ConnectorResult(success=True, data={"id": data["id"], "name": data["name"]})
-
-    async def _get_item(self, path: str) -> ConnectorResult:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                self._path_url(path),
-                headers=self._headers(),
-            )
-            response.raise_for_status()
-            data = response.json()
-            return ConnectorResult(
-                success=True,
-                data={
-                    "id": data["id"],
-                    "name": data["name"],
-                    "type": "folder" if "folder" in data else "file",
-                    "size": data.get("size"),
-                    "modified": data.get("lastModifiedDateTime"),
-                    "web_url": data.get("webUrl"),
-                }
-            )
+        response = await self.client.post(
+            url,
+            json={
+                "name": params["name"],
+                "folder": {},
+                "@microsoft.graph.conflictBehavior": "rename",
+            },
+        )
+        response.raise_for_status()
+        data = json_loads(response.content)
+        return ConnectorResult(success=True, data={"id": data["id"], "name": data["name"]})
 
-    async def _search(self, query: str) -> ConnectorResult:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/me/drive/root/search(q='{query}')",
-                headers=self._headers(),
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            results = [
-                {
-                    "id": item["id"],
-                    "name": item["name"],
-                    "type": "folder" if "folder" in item else "file",
-                    "path": item.get("parentReference", {}).get("path", ""),
-                }
-                for item in data.get("value", [])
-            ]
-            return ConnectorResult(success=True, data={"results": results, "count": len(results)})
-
-    async def _create_sharing_link(self, path: str, link_type: str, scope: str) -> ConnectorResult:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self._path_url(path)}:/createLink",
-                headers=self._headers(),
-                json={"type": link_type, "scope": scope},
-            )
+    async def _copy(self, params: dict) -> ConnectorResult:
+        path = params["path"]
+        body = {"parentReference": {"id": await self._resolve_id(params["dest_path"])}}
+        if params.get("new_name"):
+            body["name"] = params["new_name"]
+
+        response = await self.client.post(
+            f"{self._path_url(path)}:/copy",
+            json=body,
+        )
+        response.raise_for_status()
+        return ConnectorResult(success=True, data={"copied": True})
+
+    async def _move(self, params: dict) -> ConnectorResult:
+        response = await self.client.patch(
+            self._path_url(params["path"]),
+            json={"parentReference": {"id": await self._resolve_id(params["dest_path"])}},
+        )
+        response.raise_for_status()
+        # Moving a folder changes the paths of everything under it
+        self._id_cache.clear()
+        data = json_loads(response.content)
+        return ConnectorResult(success=True, data={"id": data["id"], "name": data["name"]})
+
+    async def _resolve_id(self, path: str) -> str:
+        """Get the item ID for a path, fetching only the id field on a cache miss."""
+        key = path.lower()
+        item_id = self._id_cache.get(key)
+        if item_id is None:
+            response = await self.client.get(self._path_url(path), params={"$select": "id"})
             response.raise_for_status()
-            data = response.json()
-            return ConnectorResult(success=True, data={"url": data["link"]["webUrl"]})
+            item_id = json_loads(response.content)["id"]
+            self._id_cache.set(key, item_id)
+        return item_id
+
+    async def _get_json(self, url: str) -> Any:
+        """GET a Graph resource; an unchanged one answers 304 and reuses the last body."""
+        validated = self._etags.get(url)
+        headers = {"If-None-Match": validated[0]} if validated is not None else None
+        response = await self.client.get(url, headers=headers)
+        if response.status_code == 304:
+            return validated[1]
+        response.raise_for_status()
+        data = json_loads(response.content)
+        if etag := response.headers.get("ETag"):
+            self._etags.set(url, (etag, data))
+        return data
+
+    async def _get_page(self, url: str) -> Any:
+        response = await self.client.get(url)
+        response.raise_for_status()
+        return json_loads(response.content)
+
+    def _pages(self, page: dict, max_items: int) -> "_GraphPages":
+        return _GraphPages(self._get_page, page, max_items)
+
+    async def _get_item(self, params: dict) -> ConnectorResult:
+        data = await self._get_json(self._path_url(params["path"]))
+        return ConnectorResult(
+            success=True,
+            data={
+                "id": data["id"],
+                "name": data["name"],
+                "type": "folder" if "folder" in data else "file",
+                "size": data.get("size"),
+                "modified": data.get("lastModifiedDateTime"),
+                "web_url": data.get("webUrl"),
+            }
+        )
+
+    async def _search(self, params: dict) -> ConnectorResult:
+        # OData string literals escape ' by doubling it
+        query = quote(params["query"].replace("'", "''"), safe="")
+        raw = params.get("raw")
+        max_items = int(params.get("max_items") or _MAX_ITEMS)
+        top = min(_PAGE_SIZE, max_items)
+        url = f"{self.base_url}/me/drive/root/search(q='{query}')"
+        url += f"?$top={top}" if raw else f"?$select={_SEARCH_FIELDS}&$top={top}"
+
+        results = []
+        pages = self._pages(await self._get_page(url), max_items)
+        async for entries in pages:
+            if raw:
+                results.extend(entries)
+            else:
+                results.extend(
+                    {
+                        "id": item["id"],
+                        "name": item["name"],
+                        "type": "folder" if "folder" in item else "file",
+                        "path": item.get("parentReference", {}).get("path", ""),
+                    }
+                    for item in entries
+                )
+        return ConnectorResult(
+            success=True, data={"results": results, "count": len(results), "has_more": pages.has_more}
+        )
+
+    async def _create_sharing_link(self, params: dict) -> ConnectorResult:
+        response = await self.client.post(
+            f"{self._path_url(params['path'])}:/createLink",
+            json={"type": params.get("type", "view"), "scope": params.get("scope", "anonymous")},
+        )
+        response.raise_for_status()
+        data = json_loads(response.content)
+        return ConnectorResult(success=True, data={"url": data["link"]["webUrl"]})
+
+    async def close(self):
+        # The pooled client stays open for other instances; see close_client_pool()
+        pass
@@ -0,0 +1,195 @@
+"""
+Payload Codec
+
+Helpers for connectors that move binary payloads and timestamps through
+JSON. Base64 uses the SIMD-accelerated pybase64 when installed, else the
+binascii C primitives directly (skipping the base64 module's wrappers);
+gzip likewise prefers python-isal's igzip when installed, and JSON uses
+orjson when installed. Large files can instead be streamed to and from
+local paths in fixed-size chunks; those paths come from workflow inputs, so
+they must resolve inside LOCAL_TRANSFER_DIR.
+"""
+
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable
+import json
+import os
+import aiofiles
+import httpx
+
+try:
+    from pybase64 import b64decode as _b64decode, b64encode as _b64encode
+except ImportError:  # optional speedup
+    from binascii import a2b_base64 as _b64decode, b2a_base64
+
+    def _b64encode(data: bytes | bytearray) -> bytes:
+        return b2a_base64(data, newline=False)
+
+
+try:
+    from isal import igzip as _gzip
+except ImportError:  # optional speedup
+    import gzip as _gzip
+
+
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
+
+# Read/write granularity when streaming files to or from disk
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Streamed base64 encodes whole 3-byte groups per chunk, so no padding lands mid-output
+_STREAM_ENCODE_CHUNK_SIZE = STREAM_CHUNK_SIZE - STREAM_CHUNK_SIZE % 3
+
+# Encode very large buffers in slices (a multiple of 3 bytes, so no padding
+# lands mid-stream) to keep each intermediate below the 2 GiB mark
+_ENCODE_CHUNK_SIZE = 3 * 256 * 1024 * 1024
+
+
+def decode_content(content: Any) -> bytes | bytearray:
+    """Return raw bytes for a payload given as bytes or a base64 string."""
+    if isinstance(content, (bytes, bytearray)):
+        return content
+    if isinstance(content, memoryview):
+        return content.tobytes()
+    return _b64decode(content)
+
+
+def encode_content(content: bytes | bytearray) -> str:
+    """Base64-encode a binary payload for a JSON response."""
+    if len(content) <= _ENCODE_CHUNK_SIZE:
+        return _b64encode(content).decode("ascii")
+    view = memoryview(content)
+    return "".join(
+        _b64encode(view[start:start + _ENCODE_CHUNK_SIZE]).decode("ascii")
+        for start in range(0, len(content), _ENCODE_CHUNK_SIZE)
+    )
+
+
+# Directory that content_path/output_path resolve against; unset, local file
+# transfers are disabled
+LOCAL_TRANSFER_DIR = os.getenv("LOCAL_TRANSFER_DIR")
+
+
+def resolve_transfer_path(path: str) -> str:
+    """Resolve a local transfer path inside LOCAL_TRANSFER_DIR, rejecting anything outside it."""
+    if not LOCAL_TRANSFER_DIR:
+        raise PermissionError("Local file transfers are disabled; set LOCAL_TRANSFER_DIR")
+    base = os.path.realpath(LOCAL_TRANSFER_DIR)
+    # realpath follows symlinks, so a link inside the directory can't escape it
+    resolved = os.path.realpath(os.path.join(base, path))
+    if os.path.commonpath((base, resolved)) != base:
+        raise PermissionError(f"Path is outside the transfer directory: {path}")
+    return resolved
+
+
+async def read_file_chunks(path: str, chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """Yield a local file in chunks, for use as a streaming request body."""
+    async with aiofiles.open(path, "rb") as f:
+        while chunk := await f.read(chunk_size):
+            yield chunk
+
+
+async def write_response_to_file(response: httpx.Response, path: str) -> int:
+    """Write a streamed response body to a local file; returns the byte count."""
+    size = 0
+    async with aiofiles.open(path, "wb") as f:
+        async for chunk in response.aiter_bytes(STREAM_CHUNK_SIZE):
+            await f.write(chunk)
+            size += len(chunk)
+    return size
+
+
+async def encode_response_content(response: httpx.Response) -> str:
+    """Base64-encode a streamed response body chunk by chunk, never holding the raw body."""
+    encoded = bytearray()
+    async for chunk in response.aiter_bytes(_STREAM_ENCODE_CHUNK_SIZE):
+        encoded += _b64encode(chunk)
+    return encoded.decode("ascii")
+
+
+class Base64Writer:
+    """
+    Write-only file object that base64-encodes whatever is written to it.
+
+    For SDKs that download into a file object: bytes are encoded as they
+    arrive, holding back at most two so no padding lands mid-output.
+    """
+
+    def __init__(self):
+        self.size = 0
+        self._encoded = bytearray()
+        self._pending = b""
+
+    def write(self, data: bytes) -> int:
+        written = len(data)
+        self.size += written
+        if self._pending:
+            data = self._pending + data
+        cut = len(data) - len(data) % 3
+        self._encoded += _b64encode(memoryview(data)[:cut])
+        self._pending = bytes(data[cut:])
+        return written
+
+    def getvalue(self) -> str:
+        """Return the base64 text of everything written so far."""
+        return (self._encoded + _b64encode(self._pending)).decode("ascii")
+
+
+if orjson is not None:
+    json_loads = orjson.loads
+
+    def json_dumps(value: Any) -> str:
+        """Serialize to compact JSON (UTF-8, so not for HTTP header values)."""
+        return orjson.dumps(value).decode()
+else:
+    json_loads = json.loads
+
+    def json_dumps(value: Any) -> str:
+        """Serialize to compact JSON (UTF-8, so not for HTTP header values)."""
+        return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+def gzip_content(content: bytes | bytearray) -> bytes:
+    """Gzip a payload at a fast compression level for transfer and storage."""
+    return _gzip.compress(content, compresslevel=1)
+
+
+def gunzip_content(content: bytes | bytearray) -> bytes:
+    """Reverse gzip_content."""
+    return _gzip.decompress(content)
+
+
+def _iso_timestamp(value: datetime | None) -> str | None:
+    return value.isoformat() if value is not None else None
+
+
+def _epoch_timestamp(value: datetime | None) -> int | None:
+    return int(value.timestamp()) if value is not None else None
+
+
+def _raw_timestamp(value: datetime | None) -> datetime | None:
+    return value
+
+
+_TIMESTAMP_FORMATTERS: dict[str, Callable[[datetime | None], Any]] = {
+    "iso": _iso_timestamp,
+    "epoch": _epoch_timestamp,
+    "none": _raw_timestamp,
+}
+
+
+def timestamp_formatter(timestamp_format: str | None) -> Callable[[datetime | None], Any]:
+    """
+    Get the formatter for a ``timestamp_format`` action parameter.
+
+    "iso" (default) renders ISO-8601 strings, "epoch" integer seconds and
+    "none" passes datetimes through for serializers that handle them natively.
+    """
+    formatter = _TIMESTAMP_FORMATTERS.get(timestamp_format or "iso")
+    if formatter is None:
+        raise ValueError(f"Unknown timestamp_format: {timestamp_format}")
+    return formatter
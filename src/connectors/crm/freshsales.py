@@ -4,9 +4,51 @@ Freshsales Connector
 Connect to Freshsales CRM for leads, contacts, and deals.
 """
 
-from typing import Any
+from typing import Any, AsyncGenerator
+import asyncio
+import copy
 import httpx
-from ..base import BaseConnector, ConnectorResult
+from ..base import HTTP2_AVAILABLE, BaseConnector, ConnectorResult, RateLimitTransport, RetryTransport, TokenBucket
+from ..cache import ClientPool, TTLCache, shared_cache
+from ..codec import json_dumps, json_loads
+
+
+# Optional action parameters copied into request bodies when set
+_LEAD_FIELDS = ("first_name", "email", "mobile_number", "company_name")
+_CONTACT_FIELDS = ("first_name", "email", "mobile_number")
+_DEAL_FIELDS = ("amount", "contacts_id")
+_ACCOUNT_FIELDS = ("website", "phone")
+_TASK_FIELDS = ("targetable_type", "targetable_id")
+
+# Pages requested together when listing every page
+_PAGE_WINDOW = 5
+
+
+# Client-side pacing under Freshsales' 400 requests per minute: bursts of 40
+# plus 6/s never exceed it over any minute
+_RATE_LIMIT_RPS = 6.0
+_RATE_LIMIT_BURST = 40
+
+# One token bucket per account, shared by every connector instance for it
+_RATE_LIMITERS = TTLCache(maxsize=1024, ttl=24 * 3600)
+
+
+def _rate_limiter(account: str | None, rps: float | None) -> TokenBucket:
+    bucket = _RATE_LIMITERS.get(account)
+    if bucket is None:
+        bucket = TokenBucket(float(rps or _RATE_LIMIT_RPS), burst=_RATE_LIMIT_BURST)
+        _RATE_LIMITERS.set(account, bucket)
+    return bucket
+
+
+# One pooled client per account, shared by every connector instance for it.
+# Tokens rotate, so the pool is bounded and closes the clients it evicts
+_CLIENT_POOL = ClientPool(lambda client: client.aclose())
+
+
+async def close_client_pool():
+    """Close all pooled Freshsales HTTP clients. Call on application shutdown."""
+    await _CLIENT_POOL.aclose()
 
 
 class FreshsalesConnector(BaseConnector):
@@ -16,274 +58,318 @@ class FreshsalesConnector(BaseConnector):
         super().__init__(credentials)
         self.domain = credentials.get("domain")  # yourcompany.freshsales.io
         self.api_key = credentials.get("api_key")
-        self.base_url = f"https://{self.domain}/api"
+        # Leads, contacts and deals by (resource, ID); dropped on update.
+        # Shared per account, since instances are built per call
+        self._record_cache = shared_cache(
+            ("freshsales", "records", self.domain, self.api_key), maxsize=1024, ttl=30
+        )
 
-    def _headers(self):
-        return {
-            "Authorization": f"Token token={self.api_key}",
-            "Content-Type": "application/json",
-        }
+    def _create_client(self) -> httpx.AsyncClient:
+        # Instances are built per call, so the keep-alive pool is shared per
+        # domain and API key; bodies are pre-encoded JSON, so the Content-Type
+        # is a default too
+        key = (self.credentials.get('domain'), self.credentials.get('api_key'))
+        client = _CLIENT_POOL.get(key)
+        if client is None or client.is_closed:
+            client = self._new_client()
+            _CLIENT_POOL.set(key, client)
+        return client
 
-    @classmethod
-    def get_actions(cls) -> dict[str, dict[str, Any]]:
-        return {
-            "create_lead": {
-                "description": "Create a new lead",
-                "parameters": {
-                    "first_name": {"type": "string", "description": "First name", "required": False},
-                    "last_name": {"type": "string", "description": "Last name", "required": True},
-                    "email": {"type": "string", "description": "Email", "required": False},
-                    "mobile_number": {"type": "string", "description": "Mobile number", "required": False},
-                    "company_name": {"type": "string", "description": "Company name", "required": False},
-                },
+    def _new_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            base_url=f"https://{self.credentials.get('domain')}/api",
+            headers={
+                "Authorization": f"Token token={self.credentials.get('api_key')}",
+                "Content-Type": "application/json",
             },
-            "get_lead": {
-                "description": "Get a lead by ID",
-                "parameters": {
-                    "lead_id": {"type": "integer", "description": "Lead ID", "required": True},
-                },
+            # Requests (retries included) are paced under the account's rate
+            # limit; any 429 that still gets through is retried with backoff,
+            # honouring Retry-After
+            transport=RetryTransport(
+                RateLimitTransport(
+                    httpx.AsyncHTTPTransport(
+                        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+                        # Concurrent calls multiplex as streams over one TLS connection
+                        http2=HTTP2_AVAILABLE,
+                    ),
+                    _rate_limiter(self.credentials.get('domain'), self.credentials.get("rate_limit_rps")),
+                )
+            ),
+            timeout=httpx.Timeout(10.0, connect=5.0),
+        )
+
+    # Built once at import; get_actions() returns this shared dict, so treat it as read-only
+    _ACTIONS: dict[str, dict[str, Any]] = {
+        "create_lead": {
+            "description": "Create a new lead",
+            "parameters": {
+                "first_name": {"type": "string", "description": "First name", "required": False},
+                "last_name": {"type": "string", "description": "Last name", "required": True},
+                "email": {"type": "string", "description": "Email", "required": False},
+                "mobile_number": {"type": "string", "description": "Mobile number", "required": False},
+                "company_name": {"type": "string", "description": "Company name", "required": False},
             },
-            "update_lead": {
-                "description": "Update a lead",
-                "parameters": {
-                    "lead_id": {"type": "integer", "description": "Lead ID", "required": True},
-                    "data": {"type": "object", "description": "Fields to update", "required": True},
-                },
+        },
+        "get_lead": {
+            "description": "Get a lead by ID",
+            "parameters": {
+                "lead_id": {"type": "integer", "description": "Lead ID", "required": True},
             },
-            "list_leads": {
-                "description": "List all leads",
-                "parameters": {
-                    "page": {"type": "integer", "description": "Page number", "required": False},
-                },
+        },
+        "update_lead": {
+            "description": "Update a lead",
+            "parameters": {
+                "lead_id": {"type": "integer", "description": "Lead ID", "required": True},
+                "data": {"type": "object", "description": "Fields to update", "required": True},
             },
-            "create_contact": {
-                "description": "Create a new contact",
-                "parameters": {
-                    "first_name": {"type": "string", "description": "First name", "required": False},
-                    "last_name": {"type": "string", "description": "Last name", "required": True},
-                    "email": {"type": "string", "description": "Email", "required": False},
-                    "mobile_number": {"type": "string", "description": "Mobile number", "required": False},
-                },
+        },
+        "list_leads": {
+            "description": "List all leads",
+            "parameters": {
+                "page": {"type": "integer", "description": "Page number", "required": False},
+                "all_pages": {"type": "boolean", "description": "Fetch every page from page on", "required": False},
+                "raw": {"type": "boolean", "description": "Return the API's entries unchanged", "required": False},
             },
-            "get_contact": {
-                "description": "Get a contact by ID",
-                "parameters": {
-                    "contact_id": {"type": "integer", "description": "Contact ID", "required": True},
-                },
+        },
+        "create_contact": {
+            "description": "Create a new contact",
+            "parameters": {
+                "first_name": {"type": "string", "description": "First name", "required": False},
+                "last_name": {"type": "string", "description": "Last name", "required": True},
+                "email": {"type": "string", "description": "Email", "required": False},
+                "mobile_number": {"type": "string", "description": "Mobile number", "required": False},
             },
-            "create_deal": {
-                "description": "Create a new deal",
-                "parameters": {
-                    "name": {"type": "string", "description": "Deal name", "required": True},
-                    "amount": {"type": "number", "description": "Deal amount", "required": False},
-                    "contacts_id": {"type": "integer", "description": "Contact ID", "required": False},
-                },
+        },
+        "get_contact": {
+            "description": "Get a contact by ID",
+            "parameters": {
+                "contact_id": {"type": "integer", "description": "Contact ID", "required": True},
             },
-            "get_deal": {
-                "description": "Get a deal by ID",
-                "parameters": {
-                    "deal_id": {"type": "integer", "description": "Deal ID", "required": True},
-                },
+        },
+        "create_deal": {
+            "description": "Create a new deal",
+            "parameters": {
+                "name": {"type": "string", "description": "Deal name", "required": True},
+                "amount": {"type": "number", "description": "Deal amount", "required": False},
+                "contacts_id": {"type": "integer", "description": "Contact ID", "required": False},
             },
-            "update_deal": {
-                "description": "Update a deal",
-                "parameters": {
-                    "deal_id": {"type": "integer", "description": "Deal ID", "required": True},
-                    "data": {"type": "object", "description": "Fields to update", "required": True},
-                },
+        },
+        "get_deal": {
+            "description": "Get a deal by ID",
+            "parameters": {
+                "deal_id": {"type": "integer", "description": "Deal ID", "required": True},
             },
-            "create_account": {
-                "description": "Create a new account (company)",
-                "parameters": {
-                    "name": {"type": "string", "description": "Company name", "required": True},
-                    "website": {"type": "string", "description": "Website", "required": False},
-                    "phone": {"type": "string", "description": "Phone", "required": False},
-                },
+        },
+        "update_deal": {
+            "description": "Update a deal",
+            "parameters": {
+                "deal_id": {"type": "integer", "description": "Deal ID", "required": True},
+                "data": {"type": "object", "description": "Fields to update", "required": True},
             },
-            "create_task": {
-                "description": "Create a task",
-                "parameters": {
-                    "title": {"type": "string", "description": "Task title", "required": True},
-                    "due_date": {"type": "string", "description": "Due date", "required": True},
-                    "targetable_type": {"type": "string", "description": "Lead, Contact, or Deal", "required": False},
-                    "targetable_id": {"type": "integer", "description": "Associated record ID", "required": False},
-                },
+        },
+        "create_account": {
+            "description": "Create a new account (company)",
+            "parameters": {
+                "name": {"type": "string", "description": "Company name", "required": True},
+                "website": {"type": "string", "description": "Website", "required": False},
+                "phone": {"type": "string", "description": "Phone", "required": False},
             },
-        }
+        },
+        "create_task": {
+            "description": "Create a task",
+            "parameters": {
+                "title": {"type": "string", "description": "Task title", "required": True},
+                "due_date": {"type": "string", "description": "Due date", "required": True},
+                "targetable_type": {"type": "string", "description": "Lead, Contact, or Deal", "required": False},
+                "targetable_id": {"type": "integer", "description": "Associated record ID", "required": False},
+            },
+        },
+    }
+
+    @classmethod
+    def get_actions(cls) -> dict[str, dict[str, Any]]:
+        return cls._ACTIONS
+
+    # action -> handler method; every handler takes (params)
+    _DISPATCH: dict[str, str] = {
+        "create_lead": "_create_lead",
+        "get_lead": "_get_lead",
+        "update_lead": "_update_lead",
+        "list_leads": "_list_leads",
+        "create_contact": "_create_contact",
+        "get_contact": "_get_contact",
+        "create_deal": "_create_deal",
+        "get_deal": "_get_deal",
+        "update_deal": "_update_deal",
+        "create_account": "_create_account",
+        "create_task": "_create_task",
+    }
 
     async def execute(self, action: str, params: dict[str, Any]) -> ConnectorResult:
+        handler_name = self._DISPATCH.get(action)
+        if handler_name is None:
+            return ConnectorResult(success=False, error=f"Unknown action: {action}")
         try:
-            if action == "create_lead":
-                return await self._create_lead(params)
-            elif action == "get_lead":
-                return await self._get_lead(params["lead_id"])
-            elif action == "update_lead":
-                return await self._update_lead(params["lead_id"], params["data"])
-            elif action == "list_leads":
-                return await self._list_leads(params.get("page", 1))
-            elif action == "create_contact":
-                return await self._create_contact(params)
-            elif action == "get_contact":
-                return await self._get_contact(params["contact_id"])
-            elif action == "create_deal":
-                return await self._create_deal(params)
-            elif action == "get_deal":
-                return await self._get_deal(params["deal_id"])
-            elif action == "update_deal":
-                return await self._update_deal(params["deal_id"], params["data"])
-            elif action == "create_account":
-                return await self._create_account(params)
-            elif action == "create_task":
-                return await self._create_task(params)
-            else:
-                return ConnectorResult(success=False, error=f"Unknown action: {action}")
+            return await getattr(self, handler_name)(params)
         except Exception as e:
             return ConnectorResult(success=False, error=str(e))
 
-    async def _create_lead(self, params: dict) -> ConnectorResult:
-        data = {"last_name": params["last_name"]}
-        for field in ["first_name", "email", "mobile_number", "company_name"]:
-            if params.get(field):
-                data[field] = params[field]
-
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/leads",
-                headers=self._headers(),
-                json={"lead": data},
-            )
-            response.raise_for_status()
-            result = response.json()
-            return ConnectorResult(success=True, data={"id": result["lead"]["id"]})
-
-    async def _get_lead(self, lead_id: int) -> ConnectorResult:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/leads/{lead_id}",
-                headers=self._headers(),
-            )
-            response.raise_for_status()
-            result = response.json()
-            return ConnectorResult(success=True, data=result["lead"])
-
-    async def _update_lead(self, lead_id: int, data: dict) -> ConnectorResult:
-        async with httpx.AsyncClient() as client:
-            response = await client.put(
-                f"{self.base_url}/leads/{lead_id}",
-                headers=self._headers(),
-                json={"lead": data},
-            )
-            response.raise_for_status()
-            return ConnectorResult(success=True, data={"id": lead_id, "updated": True})
-
-    async def _list_leads(self, page: int) -> ConnectorResult:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/leads",
-                headers=self._headers(),
-                params={"page": page},
-            )
+    async def _get_record(self, resource: str, key: str, record_id: int) -> ConnectorResult:
+        cache_key = (resource, str(record_id))
+        record = self._record_cache.get(cache_key)
+        if record is None:
+            response = await self.client.get(f"/{resource}/{record_id}")
             response.raise_for_status()
-            result = response.json()
-            leads = [{"id": l["id"], "name": f"{l.get('first_name', '')} {l['last_name']}"} for l in result.get("leads", [])]
-            return ConnectorResult(success=True, data={"leads": leads})
+            record = json_loads(response.content)[key]
+            self._record_cache.set(cache_key, record)
+        # The cached dict is shared with every instance for this account
+        return ConnectorResult(success=True, data=copy.deepcopy(record))
+
+    async def _create_lead(self, params: dict) -> ConnectorResult:
+        data = {
+            "last_name": params["last_name"],
+            **{field: params[field] for field in _LEAD_FIELDS if params.get(field)},
+        }
+
+        response = await self.client.post(
+            "/leads",
+            content=json_dumps({"lead": data}),
+        )
+        response.raise_for_status()
+        result = json_loads(response.content)
+        return ConnectorResult(success=True, data={"id": result["lead"]["id"]})
+
+    async def _get_lead(self, params: dict) -> ConnectorResult:
+        return await self._get_record("leads", "lead", params["lead_id"])
+
+    async def _update_lead(self, params: dict) -> ConnectorResult:
+        lead_id = params["lead_id"]
+        response = await self.client.put(
+            f"/leads/{lead_id}",
+            content=json_dumps({"lead": params["data"]}),
+        )
+        response.raise_for_status()
+        self._record_cache.pop(("leads", str(lead_id)))
+        return ConnectorResult(success=True, data={"id": lead_id, "updated": True})
+
+    async def _list_leads(self, params: dict) -> ConnectorResult:
+        page = params.get("page", 1)
+        if params.get("all_pages"):
+            pages = [page_leads async for page_leads in self._lead_pages(page)]
+        else:
+            pages = [(await self._fetch_leads(page))[0]]
+        if params.get("raw"):
+            leads = pages[0] if len(pages) == 1 else [l for page_leads in pages for l in page_leads]
+        else:
+            leads = [
+                {"id": l["id"], "name": f"{l.get('first_name', '')} {l['last_name']}"}
+                for page_leads in pages
+                for l in page_leads
+            ]
+        return ConnectorResult(success=True, data={"leads": leads})
+
+    async def _fetch_leads(self, page: int) -> tuple[list, int | None]:
+        """Fetch one page of leads and the total page count, when reported."""
+        response = await self.client.get(
+            "/leads",
+            params={"page": page},
+        )
+        response.raise_for_status()
+        result = json_loads(response.content)
+        return result.get("leads", []), result.get("meta", {}).get("total_pages")
+
+    async def _lead_pages(self, start_page: int) -> AsyncGenerator[list, None]:
+        """Yield pages of leads from start_page on, fetching _PAGE_WINDOW pages at a time."""
+        leads, total_pages = await self._fetch_leads(start_page)
+        next_page = start_page + 1
+        while leads:
+            yield leads
+            if total_pages is not None and next_page > total_pages:
+                return
+            stop = next_page + _PAGE_WINDOW
+            if total_pages is not None:
+                stop = min(stop, total_pages + 1)
+            fetched = await asyncio.gather(*(self._fetch_leads(p) for p in range(next_page, stop)))
+            for leads, _ in fetched[:-1]:
+                if not leads:
+                    return
+                yield leads
+            leads = fetched[-1][0]
+            next_page = stop
 
     async def _create_contact(self, params: dict) -> ConnectorResult:
-        data = {"last_name": params["last_name"]}
-        for field in ["first_name", "email", "mobile_number"]:
-            if params.get(field):
-                data[field] = params[field]
-
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/contacts",
-                headers=self._headers(),
-                json={"contact": data},
-            )
-            response.raise_for_status()
-            result = response.json()
-            return ConnectorResult(success=True, data={"id": result["contact"]["id"]})
-
-    async def _get_contact(self, contact_id: int) -> ConnectorResult:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/contacts/{contact_id}",
-                headers=self._headers(),
-            )
-            response.raise_for_status()
-            result = response.json()
-            return ConnectorResult(success=True, data=result["contact"])
+        data = {
+            "last_name": params["last_name"],
+            **{field: params[field] for field in _CONTACT_FIELDS if params.get(field)},
+        }
+
+        response = await self.client.post(
+            "/contacts",
+            content=json_dumps({"contact": data}),
+        )
+        response.raise_for_status()
+        result = json_loads(response.content)
+        return ConnectorResult(success=True, data={"id": result["contact"]["id"]})
+
+    async def _get_contact(self, params: dict) -> ConnectorResult:
+        return await self._get_record("contacts", "contact", params["contact_id"])
 
     async def _create_deal(self, params: dict) -> ConnectorResult:
-        data = {"name": params["name"]}
-        if params.get("amount"):
-            data["amount"] = params["amount"]
-        if params.get("contacts_id"):
-            data["contacts_id"] = params["contacts_id"]
-
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/deals",
-                headers=self._headers(),
-                json={"deal": data},
-            )
-            response.raise_for_status()
-            result = response.json()
-            return ConnectorResult(success=True, data={"id": result["deal"]["id"]})
-
-    async def _get_deal(self, deal_id: int) -> ConnectorResult:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/deals/{deal_id}",
-                headers=self._headers(),
-            )
-            response.raise_for_status()
-            result = response.json()
-            return ConnectorResult(success=True, data=result["deal"])
-
-    async def _update_deal(self, deal_id: int, data: dict) -> ConnectorResult:
-        async with httpx.AsyncClient() as client:
-            response = await client.put(
-                f"{self.base_url}/deals/{deal_id}",
-                headers=self._headers(),
-                json={"deal": data},
-            )
-            response.raise_for_status()
-            return ConnectorResult(success=True, data={"id": deal_id, "updated": True})
+        data = {
+            "name": params["name"],
+            **{field: params[field] for field in _DEAL_FIELDS if params.get(field)},
+        }
+
+        response = await self.client.post(
+            "/deals",
+            content=json_dumps({"deal": data}),
+        )
+        response.raise_for_status()
+        result = json_loads(response.content)
+        return ConnectorResult(success=True, data={"id": result["deal"]["id"]})
+
+    async def _get_deal(self, params: dict) -> ConnectorResult:
+        return await self._get_record("deals", "deal", params["deal_id"])
+
+    async def _update_deal(self, params: dict) -> ConnectorResult:
+        deal_id = params["deal_id"]
+        response = await self.client.put(
+            f"/deals/{deal_id}",
+            content=json_dumps({"deal": params["data"]}),
+        )
+        response.raise_for_status()
+        self._record_cache.pop(("deals", str(deal_id)))
+        return ConnectorResult(success=True, data={"id": deal_id, "updated": True})
 
     async def _create_account(self, params: dict) -> ConnectorResult:
-        data = {"name": params["name"]}
-        if params.get("website"):
-            data["website"] = params["website"]
-        if params.get("phone"):
-            data["phone"] = params["phone"]
-
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/sales_accounts",
-                headers=self._headers(),
-                json={"sales_account": data},
-            )
-            response.raise_for_status()
-            result = response.json()
-            return ConnectorResult(success=True, data={"id": result["sales_account"]["id"]})
+        data = {
+            "name": params["name"],
+            **{field: params[field] for field in _ACCOUNT_FIELDS if params.get(field)},
+        }
+
+        response = await self.client.post(
+            "/sales_accounts",
+            content=json_dumps({"sales_account": data}),
+        )
+        response.raise_for_status()
+        result = json_loads(response.content)
+        return ConnectorResult(success=True, data={"id": result["sales_account"]["id"]})
 
     async def _create_task(self, params: dict) -> ConnectorResult:
         data = {
             "title": params["title"],
             "due_date": params["due_date"],
+            **{field: params[field] for field in _TASK_FIELDS if params.get(field)},
         }
-        if params.get("targetable_type"):
-            data["targetable_type"] = params["targetable_type"]
-        if params.get("targetable_id"):
-            data["targetable_id"] = params["targetable_id"]
-
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/tasks",
-                headers=self._headers(),
-                json={"task": data},
-            )
-            response.raise_for_status()
-            result = response.json()
-            return ConnectorResult(success=True, data={"id": result["task"]["id"]})
+
+        response = await self.client.post(
+            "/tasks",
+            content=json_dumps({"task": data}),
+        )
+        response.raise_for_status()
+        result = json_loads(response.content)
+        return ConnectorResult(success=True, data={"id": result["task"]["id"]})
+
+    async def close(self):
+        # The pooled client stays open for other instances; see close_client_pool()
+        pass
@@ -5,205 +5,318 @@ Connect to HubSpot CRM for contacts, deals, and marketing operations.
 """
 
 from typing import Any
+import asyncio
+import copy
 import httpx
-from ..base import BaseConnector, ConnectorResult
+from ..base import HTTP2_AVAILABLE, BaseConnector, ConnectorResult, RateLimitTransport, RetryTransport, TokenBucket
+from ..cache import ClientPool, TTLCache, shared_cache
+from ..codec import json_dumps, json_loads
+
+
+# HubSpot's batch endpoints accept at most 100 inputs per request
+_BATCH_LIMIT = 100
+
+# Optional action parameters copied into record properties when set; tasks
+# map them to HubSpot's property names
+_CONTACT_FIELDS = ("firstname", "lastname", "phone", "company")
+_COMPANY_FIELDS = ("domain",)
+_DEAL_FIELDS = ("pipeline",)
+_TASK_FIELDS = {"body": "hs_task_body", "due_date": "hs_timestamp"}
+
+# HubSpot-defined association type IDs, by source then target object type
+_ASSOCIATION_TYPE_IDS = {
+    "notes": {"contacts": 202, "companies": 190, "deals": 214},
+    "deals": {"contacts": 3, "companies": 341},
+}
+
+
+def _associations(object_type: str, targets: dict[str, list]) -> list[dict]:
+    """Build the inline ``associations`` of a v3 create, so it takes one request."""
+    type_ids = _ASSOCIATION_TYPE_IDS[object_type]
+    return [
+        {
+            "to": {"id": target_id},
+            "types": [{"associationCategory": "HUBSPOT_DEFINED", "associationTypeId": type_ids[target_type]}],
+        }
+        for target_type, target_ids in targets.items()
+        for target_id in target_ids
+    ]
+
+
+# Client-side pacing under HubSpot's burst limit of 100 requests per 10s:
+# bursts of 10 plus 9/s never exceed it over any 10s window
+_RATE_LIMIT_RPS = 9.0
+_RATE_LIMIT_BURST = 10
+
+# One token bucket per account, shared by every connector instance for it
+_RATE_LIMITERS = TTLCache(maxsize=1024, ttl=24 * 3600)
+
+
+def _rate_limiter(account: str | None, rps: float | None) -> TokenBucket:
+    bucket = _RATE_LIMITERS.get(account)
+    if bucket is None:
+        bucket = TokenBucket(float(rps or _RATE_LIMIT_RPS), burst=_RATE_LIMIT_BURST)
+        _RATE_LIMITERS.set(account, bucket)
+    return bucket
+
+
+# One pooled client per account, shared by every connector instance for it.
+# Tokens rotate, so the pool is bounded and closes the clients it evicts
+_CLIENT_POOL = ClientPool(lambda client: client.aclose())
+
+
+async def close_client_pool():
+    """Close all pooled HubSpot HTTP clients. Call on application shutdown."""
+    await _CLIENT_POOL.aclose()
 
 
 class HubSpotConnector(BaseConnector):
     """Connector for HubSpot CRM."""
 
+    base_url = "https://api.hubapi.com"
+
     def __init__(self, credentials: dict[str, Any]):
         super().__init__(credentials)
         self.access_token = credentials.get("access_token")
-        self.base_url = "https://api.hubapi.com"
+        # Contacts by ID (and email -> ID), dropped on update/delete; pipelines
+        # rarely change, so they are kept longer. Shared per token, since
+        # instances are built per call
+        self._contact_cache = shared_cache(("hubspot", "contacts", self.access_token), maxsize=1024, ttl=30)
+        self._pipeline_cache = shared_cache(("hubspot", "pipelines", self.access_token), maxsize=1, ttl=600)
+        # Search responses by exact request body; any contact write drops them all
+        self._search_cache = shared_cache(("hubspot", "searches", self.access_token), maxsize=256, ttl=60)
 
-    def _headers(self):
-        return {
-            "Authorization": f"Bearer {self.access_token}",
-            "Content-Type": "application/json",
-        }
+    def _create_client(self) -> httpx.AsyncClient:
+        # Instances are built per call, so the keep-alive pool is shared per
+        # access token; bodies are pre-encoded JSON, so the Content-Type is a
+        # default too
+        key = self.credentials.get('access_token')
+        client = _CLIENT_POOL.get(key)
+        if client is None or client.is_closed:
+            client = self._new_client()
+            _CLIENT_POOL.set(key, client)
+        return client
 
-    @classmethod
-    def get_actions(cls) -> dict[str, dict[str, Any]]:
-        return {
-            "create_contact": {
-                "description": "Create a new contact",
-                "parameters": {
-                    "email": {"type": "string", "description": "Email address", "required": True},
-                    "firstname": {"type": "string", "description": "First name", "required": False},
-                    "lastname": {"type": "string", "description": "Last name", "required": False},
-                    "phone": {"type": "string", "description": "Phone number", "required": False},
-                    "company": {"type": "string", "description": "Company name", "required": False},
-                    "properties": {"type": "object", "description": "Additional properties", "required": False},
-                },
+    def _new_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            base_url=self.base_url,
+            headers={
+                "Authorization": f"Bearer {self.credentials.get('access_token')}",
+                "Content-Type": "application/json",
             },
-            "get_contact": {
-                "description": "Get a contact by ID or email",
-                "parameters": {
-                    "contact_id": {"type": "string", "description": "Contact ID", "required": False},
-                    "email": {"type": "string", "description": "Email address", "required": False},
-                },
+            # Requests (retries included) are paced under the account's rate
+            # limit; any 429 that still gets through is retried with backoff,
+            # honouring Retry-After
+            transport=RetryTransport(
+                RateLimitTransport(
+                    httpx.AsyncHTTPTransport(
+                        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+                        # Concurrent calls multiplex as streams over one TLS connection
+                        http2=HTTP2_AVAILABLE,
+                    ),
+                    _rate_limiter(self.credentials.get('access_token'), self.credentials.get("rate_limit_rps")),
+                )
+            ),
+            timeout=httpx.Timeout(10.0, connect=5.0),
+        )
+
+    # Built once at import; get_actions() returns this shared dict, so treat it as read-only
+    _ACTIONS: dict[str, dict[str, Any]] = {
+        "create_contact": {
+            "description": "Create a new contact",
+            "parameters": {
+                "email": {"type": "string", "description": "Email address", "required": True},
+                "firstname": {"type": "string", "description": "First name", "required": False},
+                "lastname": {"type": "string", "description": "Last name", "required": False},
+                "phone": {"type": "string", "description": "Phone number", "required": False},
+                "company": {"type": "string", "description": "Company name", "required": False},
+                "properties": {"type": "object", "description": "Additional properties", "required": False},
             },
-            "update_contact": {
-                "description": "Update a contact",
-                "parameters": {
-                    "contact_id": {"type": "string", "description": "Contact ID", "required": True},
-                    "properties": {"type": "object", "description": "Properties to update", "required": True},
-                },
+        },
+        "get_contact": {
+            "description": "Get a contact by ID or email",
+            "parameters": {
+                "contact_id": {"type": "string", "description": "Contact ID", "required": False},
+                "email": {"type": "string", "description": "Email address", "required": False},
             },
-            "delete_contact": {
-                "description": "Delete a contact",
-                "parameters": {
-                    "contact_id": {"type": "string", "description": "Contact ID", "required": True},
-                },
+        },
+        "update_contact": {
+            "description": "Update a contact",
+            "parameters": {
+                "contact_id": {"type": "string", "description": "Contact ID", "required": True},
+                "properties": {"type": "object", "description": "Properties to update", "required": True},
             },
-            "search_contacts": {
-                "description": "Search for contacts",
-                "parameters": {
-                    "query": {"type": "string", "description": "Search query", "required": False},
-                    "filters": {"type": "array", "description": "Filter groups", "required": False},
-                    "limit": {"type": "integer", "description": "Max results", "required": False},
-                },
+        },
+        "delete_contact": {
+            "description": "Delete a contact",
+            "parameters": {
+                "contact_id": {"type": "string", "description": "Contact ID", "required": True},
             },
-            "create_company": {
-                "description": "Create a new company",
-                "parameters": {
-                    "name": {"type": "string", "description": "Company name", "required": True},
-                    "domain": {"type": "string", "description": "Company domain", "required": False},
-                    "properties": {"type": "object", "description": "Additional properties", "required": False},
-                },
+        },
+        "search_contacts": {
+            "description": "Search for contacts",
+            "parameters": {
+                "query": {"type": "string", "description": "Search query", "required": False},
+                "filters": {"type": "array", "description": "Filter groups", "required": False},
+                "limit": {"type": "integer", "description": "Max results", "required": False},
+                "raw": {"type": "boolean", "description": "Return the API's entries unchanged", "required": False},
             },
-            "create_deal": {
-                "description": "Create a new deal",
-                "parameters": {
-                    "dealname": {"type": "string", "description": "Deal name", "required": True},
-                    "pipeline": {"type": "string", "description": "Pipeline ID", "required": False},
-                    "dealstage": {"type": "string", "description": "Deal stage", "required": True},
-                    "amount": {"type": "number", "description": "Deal amount", "required": False},
-                    "properties": {"type": "object", "description": "Additional properties", "required": False},
-                },
+        },
+        "batch_create_contacts": {
+            "description": "Create many contacts in batched requests",
+            "parameters": {
+                "contacts": {"type": "array", "description": "Property objects, one per contact", "required": True},
             },
-            "update_deal": {
-                "description": "Update a deal",
-                "parameters": {
-                    "deal_id": {"type": "string", "description": "Deal ID", "required": True},
-                    "properties": {"type": "object", "description": "Properties to update", "required": True},
-                },
+        },
+        "create_company": {
+            "description": "Create a new company",
+            "parameters": {
+                "name": {"type": "string", "description": "Company name", "required": True},
+                "domain": {"type": "string", "description": "Company domain", "required": False},
+                "properties": {"type": "object", "description": "Additional properties", "required": False},
             },
-            "create_note": {
-                "description": "Create a note on a record",
-                "parameters": {
-                    "body": {"type": "string", "description": "Note content", "required": True},
-                    "contact_id": {"type": "string", "description": "Associated contact ID", "required": False},
-                    "company_id": {"type": "string", "description": "Associated company ID", "required": False},
-                    "deal_id": {"type": "string", "description": "Associated deal ID", "required": False},
-                },
+        },
+        "create_deal": {
+            "description": "Create a new deal",
+            "parameters": {
+                "dealname": {"type": "string", "description": "Deal name", "required": True},
+                "pipeline": {"type": "string", "description": "Pipeline ID", "required": False},
+                "dealstage": {"type": "string", "description": "Deal stage", "required": True},
+                "amount": {"type": "number", "description": "Deal amount", "required": False},
+                "properties": {"type": "object", "description": "Additional properties", "required": False},
+                "contact_ids": {"type": "array", "description": "Contact IDs to associate", "required": False},
+                "company_ids": {"type": "array", "description": "Company IDs to associate", "required": False},
             },
-            "create_task": {
-                "description": "Create a task",
-                "parameters": {
-                    "subject": {"type": "string", "description": "Task subject", "required": True},
-                    "body": {"type": "string", "description": "Task body", "required": False},
-                    "due_date": {"type": "string", "description": "Due date (ISO format)", "required": False},
-                    "contact_id": {"type": "string", "description": "Associated contact ID", "required": False},
-                },
+        },
+        "batch_create_deals": {
+            "description": "Create many deals in batched requests",
+            "parameters": {
+                "deals": {"type": "array", "description": "Property objects, one per deal", "required": True},
             },
-            "list_pipelines": {
-                "description": "List deal pipelines",
-                "parameters": {},
+        },
+        "update_deal": {
+            "description": "Update a deal",
+            "parameters": {
+                "deal_id": {"type": "string", "description": "Deal ID", "required": True},
+                "properties": {"type": "object", "description": "Properties to update", "required": True},
             },
-        }
+        },
+        "create_note": {
+            "description": "Create a note on a record",
+            "parameters": {
+                "body": {"type": "string", "description": "Note content", "required": True},
+                "contact_id": {"type": "string", "description": "Associated contact ID", "required": False},
+                "company_id": {"type": "string", "description": "Associated company ID", "required": False},
+                "deal_id": {"type": "string", "description": "Associated deal ID", "required": False},
+            },
+        },
+        "create_task": {
+            "description": "Create a task",
+            "parameters": {
+                "subject": {"type": "string", "description": "Task subject", "required": True},
+                "body": {"type": "string", "description": "Task body", "required": False},
+                "due_date": {"type": "string", "description": "Due date (ISO format)", "required": False},
+                "contact_id": {"type": "string", "description": "Associated contact ID", "required": False},
+            },
+        },
+        "list_pipelines": {
+            "description": "List deal pipelines",
+            "parameters": {},
+        },
+    }
+
+    @classmethod
+    def get_actions(cls) -> dict[str, dict[str, Any]]:
+        return cls._ACTIONS
+
+    # action -> handler method; every handler takes (params)
+    _DISPATCH: dict[str, str] = {
+        "create_contact": "_create_contact",
+        "get_contact": "_get_contact",
+        "update_contact": "_update_contact",
+        "delete_contact": "_delete_contact",
+        "search_contacts": "_search_contacts",
+        "batch_create_contacts": "_batch_create_contacts",
+        "create_company": "_create_company",
+        "create_deal": "_create_deal",
+        "batch_create_deals": "_batch_create_deals",
+        "update_deal": "_update_deal",
+        "create_note": "_create_note",
+        "create_task": "_create_task",
+        "list_pipelines": "_list_pipelines",
+    }
 
     async def execute(self, action: str, params: dict[str, Any]) -> ConnectorResult:
+        handler_name = self._DISPATCH.get(action)
+        if handler_name is None:
+            return ConnectorResult(success=False, error=f"Unknown action: {action}")
         try:
-            if action == "create_contact":
-                return await self._create_contact(params)
-            elif action == "get_contact":
-                return await self._get_contact(params.get("contact_id"), params.get("email"))
-            elif action == "update_contact":
-                return await self._update_contact(params["contact_id"], params["properties"])
-            elif action == "delete_contact":
-                return await self._delete_contact(params["contact_id"])
-            elif action == "search_contacts":
-                return await self._search_contacts(params)
-            elif action == "create_company":
-                return await self._create_company(params)
-            elif action == "create_deal":
-                return await self._create_deal(params)
-            elif action == "update_deal":
-                return await self._update_deal(params["deal_id"], params["properties"])
-            elif action == "create_note":
-                return await self._create_note(params)
-            elif action == "create_task":
-                return await self._create_task(params)
-            elif action == "list_pipelines":
-                return await self._list_pipelines()
-            else:
-                return ConnectorResult(success=False, error=f"Unknown action: {action}")
+            return await getattr(self, handler_name)(params)
         except Exception as e:
             return ConnectorResult(success=False, error=str(e))
 
     async def _create_contact(self, params: dict) -> ConnectorResult:
-        properties = params.get("properties", {})
-        properties["email"] = params["email"]
-        if params.get("firstname"):
-            properties["firstname"] = params["firstname"]
-        if params.get("lastname"):
-            properties["lastname"] = params["lastname"]
-        if params.get("phone"):
-            properties["phone"] = params["phone"]
-        if params.get("company"):
-            properties["company"] = params["company"]
-
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/crm/v3/objects/contacts",
-                headers=self._headers(),
-                json={"properties": properties},
-            )
-            response.raise_for_status()
-            data = response.json()
-            return ConnectorResult(success=True, data={"id": data["id"], "properties": data["properties"]})
+        properties = {
+            **params.get("properties", {}),
+            "email": params["email"],
+            **{field: params[field] for field in _CONTACT_FIELDS if params.get(field)},
+        }
+
+        response = await self.client.post(
+            "/crm/v3/objects/contacts",
+            content=json_dumps({"properties": properties}),
+        )
+        response.raise_for_status()
+        self._search_cache.clear()
+        data = json_loads(response.content)
+        return ConnectorResult(success=True, data={"id": data["id"], "properties": data["properties"]})
 
-    async def _get_contact(self, contact_id: str | None, email: str | None) -> ConnectorResult:
-        async with httpx.AsyncClient() as client:
+    async def _get_contact(self, params: dict) -> ConnectorResult:
+        contact_id = params.get("contact_id")
+        email = params.get("email")
+        if not contact_id and not email:
+            return ConnectorResult(success=False, error="Must provide contact_id or email")
+
+        # Email lookups go through the ID, so invalidating the ID covers both
+        cached_id = str(contact_id) if contact_id else self._contact_cache.get(("email", email))
+        contact = self._contact_cache.get(cached_id) if cached_id is not None else None
+        if contact is None:
             if contact_id:
-                response = await client.get(
-                    f"{self.base_url}/crm/v3/objects/contacts/{contact_id}",
-                    headers=self._headers(),
-                )
-            elif email:
-                response = await client.get(
-                    f"{self.base_url}/crm/v3/objects/contacts/{email}",
-                    headers=self._headers(),
+                response = await self.client.get(f"/crm/v3/objects/contacts/{contact_id}")
+            else:
+                response = await self.client.get(
+                    f"/crm/v3/objects/contacts/{email}",
                     params={"idProperty": "email"},
                 )
-            else:
-                return ConnectorResult(success=False, error="Must provide contact_id or email")
-
-            response.raise_for_status()
-            data = response.json()
-            return ConnectorResult(success=True, data={"id": data["id"], "properties": data["properties"]})
-
-    async def _update_contact(self, contact_id: str, properties: dict) -> ConnectorResult:
-        async with httpx.AsyncClient() as client:
-            response = await client.patch(
-                f"{self.base_url}/crm/v3/objects/contacts/{contact_id}",
-                headers=self._headers(),
-                json={"properties": properties},
-            )
-            response.raise_for_status()
-            data = response.json()
-            return ConnectorResult(success=True, data={"id": data["id"], "updated": True})
-
-    async def _delete_contact(self, contact_id: str) -> ConnectorResult:
-        async with httpx.AsyncClient() as client:
-            response = await client.delete(
-                f"{self.base_url}/crm/v3/objects/contacts/{contact_id}",
-                headers=self._headers(),
-            )
             response.raise_for_status()
-            return ConnectorResult(success=True, data={"id": contact_id, "deleted": True})
+            data = json_loads(response.content)
+            contact = {"id": data["id"], "properties": data["properties"]}
+            self._contact_cache.set(contact["id"], contact)
+            if not contact_id:
+                self._contact_cache.set(("email", email), contact["id"])
+
+        # The cached dict is shared with every instance for this account
+        return ConnectorResult(success=True, data=copy.deepcopy(contact))
+
+    async def _update_contact(self, params: dict) -> ConnectorResult:
+        contact_id = params["contact_id"]
+        response = await self.client.patch(
+            f"/crm/v3/objects/contacts/{contact_id}",
+            content=json_dumps({"properties": params["properties"]}),
+        )
+        response.raise_for_status()
+        self._contact_cache.pop(str(contact_id))
+        self._search_cache.clear()
+        data = json_loads(response.content)
+        return ConnectorResult(success=True, data={"id": data["id"], "updated": True})
+
+    async def _delete_contact(self, params: dict) -> ConnectorResult:
+        contact_id = params["contact_id"]
+        response = await self.client.delete(f"/crm/v3/objects/contacts/{contact_id}")
+        response.raise_for_status()
+        self._contact_cache.pop(str(contact_id))
+        self._search_cache.clear()
+        return ConnectorResult(success=True, data={"id": contact_id, "deleted": True})
 
     async def _search_contacts(self, params: dict) -> ConnectorResult:
         body = {"limit": params.get("limit", 10)}
@@ -212,121 +325,148 @@ class HubSpotConnector(BaseConnector):
         if params.get("filters"):
             body["filterGroups"] = [{"filters": params["filters"]}]
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/crm/v3/objects/contacts/search",
-                headers=self._headers(),
-                json=body,
+        content = json_dumps(body)
+        data = self._search_cache.get(content)
+        if data is None:
+            response = await self.client.post(
+                "/crm/v3/objects/contacts/search",
+                content=content,
             )
             response.raise_for_status()
-            data = response.json()
-            contacts = [{"id": c["id"], "properties": c["properties"]} for c in data.get("results", [])]
-            return ConnectorResult(success=True, data={"contacts": contacts, "total": data.get("total", 0)})
+            data = json_loads(response.content)
+            self._search_cache.set(content, data)
+        results = copy.deepcopy(data.get("results", []))
+        if params.get("raw"):
+            contacts = results
+        else:
+            contacts = [{"id": c["id"], "properties": c["properties"]} for c in results]
+        return ConnectorResult(success=True, data={"contacts": contacts, "total": data.get("total", 0)})
 
     async def _create_company(self, params: dict) -> ConnectorResult:
-        properties = params.get("properties", {})
-        properties["name"] = params["name"]
-        if params.get("domain"):
-            properties["domain"] = params["domain"]
-
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/crm/v3/objects/companies",
-                headers=self._headers(),
-                json={"properties": properties},
-            )
-            response.raise_for_status()
-            data = response.json()
-            return ConnectorResult(success=True, data={"id": data["id"], "properties": data["properties"]})
+        properties = {
+            **params.get("properties", {}),
+            "name": params["name"],
+            **{field: params[field] for field in _COMPANY_FIELDS if params.get(field)},
+        }
+
+        response = await self.client.post(
+            "/crm/v3/objects/companies",
+            content=json_dumps({"properties": properties}),
+        )
+        response.raise_for_status()
+        data = json_loads(response.content)
+        return ConnectorResult(success=True, data={"id": data["id"], "properties": data["properties"]})
 
     async def _create_deal(self, params: dict) -> ConnectorResult:
-        properties = params.get("properties", {})
-        properties["dealname"] = params["dealname"]
-        properties["dealstage"] = params["dealstage"]
-        if params.get("pipeline"):
-            properties["pipeline"] = params["pipeline"]
+        properties = {
+            **params.get("properties", {}),
+            "dealname": params["dealname"],
+            "dealstage": params["dealstage"],
+            **{field: params[field] for field in _DEAL_FIELDS if params.get(field)},
+        }
         if params.get("amount"):
             properties["amount"] = str(params["amount"])
+        associations = _associations("deals", {
+            "contacts": params.get("contact_ids") or [],
+            "companies": params.get("company_ids") or [],
+        })
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/crm/v3/objects/deals",
-                headers=self._headers(),
-                json={"properties": properties},
-            )
-            response.raise_for_status()
-            data = response.json()
-            return ConnectorResult(success=True, data={"id": data["id"], "properties": data["properties"]})
-
-    async def _update_deal(self, deal_id: str, properties: dict) -> ConnectorResult:
-        async with httpx.AsyncClient() as client:
-            response = await client.patch(
-                f"{self.base_url}/crm/v3/objects/deals/{deal_id}",
-                headers=self._headers(),
-                json={"properties": properties},
-            )
-            response.raise_for_status()
-            data = response.json()
-            return ConnectorResult(success=True, data={"id": data["id"], "updated": True})
+        response = await self.client.post(
+            "/crm/v3/objects/deals",
+            content=json_dumps({"properties": properties, "associations": associations}),
+        )
+        response.raise_for_status()
+        data = json_loads(response.content)
+        return ConnectorResult(success=True, data={"id": data["id"], "properties": data["properties"]})
 
-    async def _create_note(self, params: dict) -> ConnectorResult:
-        properties = {"hs_note_body": params["body"]}
+    async def _batch_create_contacts(self, params: dict) -> ConnectorResult:
+        try:
+            return await self._batch_create("contacts", params["contacts"])
+        finally:
+            # Even a failed batch may have created some of its chunks
+            self._search_cache.clear()
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/crm/v3/objects/notes",
-                headers=self._headers(),
-                json={"properties": properties},
-            )
-            response.raise_for_status()
-            data = response.json()
-            note_id = data["id"]
-
-            # Associate with records
-            associations = []
-            if params.get("contact_id"):
-                associations.append(("contacts", params["contact_id"]))
-            if params.get("company_id"):
-                associations.append(("companies", params["company_id"]))
-            if params.get("deal_id"):
-                associations.append(("deals", params["deal_id"]))
-
-            for obj_type, obj_id in associations:
-                await client.put(
-                    f"{self.base_url}/crm/v3/objects/notes/{note_id}/associations/{obj_type}/{obj_id}/note_to_{obj_type[:-1]}",
-                    headers=self._headers(),
+    async def _batch_create_deals(self, params: dict) -> ConnectorResult:
+        return await self._batch_create("deals", params["deals"])
+
+    async def _batch_create(self, object_type: str, records: list[dict]) -> ConnectorResult:
+        """Create records in chunks sent together; a failed chunk maps to its error."""
+        async def create_chunk(chunk: list[dict]) -> list[dict] | Exception:
+            try:
+                response = await self.client.post(
+                    f"/crm/v3/objects/{object_type}/batch/create",
+                    content=json_dumps({"inputs": [{"properties": properties} for properties in chunk]}),
                 )
+                response.raise_for_status()
+                return json_loads(response.content).get("results", [])
+            except Exception as e:
+                return e
+
+        async with asyncio.TaskGroup() as tg:
+            tasks = [
+                tg.create_task(create_chunk(records[start:start + _BATCH_LIMIT]))
+                for start in range(0, len(records), _BATCH_LIMIT)
+            ]
+        chunks = [task.result() for task in tasks]
+        results = [
+            {"id": r["id"], "properties": r["properties"]}
+            for chunk in chunks if not isinstance(chunk, Exception)
+            for r in chunk
+        ]
+        data = {"results": results, "count": len(results)}
+        errors = [str(chunk) for chunk in chunks if isinstance(chunk, Exception)]
+        if errors:
+            # Other chunks may have gone through; report what was created
+            return ConnectorResult(success=False, data=data, error="; ".join(errors))
+        return ConnectorResult(success=True, data=data)
 
-            return ConnectorResult(success=True, data={"id": note_id})
+    async def _update_deal(self, params: dict) -> ConnectorResult:
+        deal_id = params["deal_id"]
+        response = await self.client.patch(
+            f"/crm/v3/objects/deals/{deal_id}",
+            content=json_dumps({"properties": params["properties"]}),
+        )
+        response.raise_for_status()
+        data = json_loads(response.content)
+        return ConnectorResult(success=True, data={"id": data["id"], "updated": True})
+
+    async def _create_note(self, params: dict) -> ConnectorResult:
+        properties = {"hs_note_body": params["body"]}
+        targets = {
+            "contacts": [params["contact_id"]] if params.get("contact_id") else [],
+            "companies": [params["company_id"]] if params.get("company_id") else [],
+            "deals": [params["deal_id"]] if params.get("deal_id") else [],
+        }
+
+        response = await self.client.post(
+            "/crm/v3/objects/notes",
+            content=json_dumps({"properties": properties, "associations": _associations("notes", targets)}),
+        )
+        response.raise_for_status()
+        data = json_loads(response.content)
+        return ConnectorResult(success=True, data={"id": data["id"]})
 
     async def _create_task(self, params: dict) -> ConnectorResult:
         properties = {
             "hs_task_subject": params["subject"],
             "hs_task_status": "NOT_STARTED",
+            **{prop: params[field] for field, prop in _TASK_FIELDS.items() if params.get(field)},
         }
-        if params.get("body"):
-            properties["hs_task_body"] = params["body"]
-        if params.get("due_date"):
-            properties["hs_timestamp"] = params["due_date"]
-
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/crm/v3/objects/tasks",
-                headers=self._headers(),
-                json={"properties": properties},
-            )
-            response.raise_for_status()
-            data = response.json()
-            return ConnectorResult(success=True, data={"id": data["id"]})
-
-    async def _list_pipelines(self) -> ConnectorResult:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/crm/v3/pipelines/deals",
-                headers=self._headers(),
-            )
+
+        response = await self.client.post(
+            "/crm/v3/objects/tasks",
+            content=json_dumps({"properties": properties}),
+        )
+        response.raise_for_status()
+        data = json_loads(response.content)
+        return ConnectorResult(success=True, data={"id": data["id"]})
+
+    async def _list_pipelines(self, params: dict) -> ConnectorResult:
+        pipelines = self._pipeline_cache.get("deals")
+        if pipelines is None:
+            response = await self.client.get("/crm/v3/pipelines/deals")
             response.raise_for_status()
-            data = response.json()
+            data = json_loads(response.content)
             pipelines = [
                 {
                     "id": p["id"],
@@ -335,4 +475,9 @@ class HubSpotConnector(BaseConnector):
                 }
                 for p in data.get("results", [])
             ]
-            return ConnectorResult(success=True, data={"pipelines": pipelines})
+            self._pipeline_cache.set("deals", pipelines)
+        return ConnectorResult(success=True, data={"pipelines": copy.deepcopy(pipelines)})
+
+    async def close(self):
+        # The pooled client stays open for other instances; see close_client_pool()
+        pass
@@ -6,22 +6,56 @@ Connect to Pipedrive CRM for deals, contacts, and pipeline management.
 
 from typing import Any
 import httpx
-from ..base import BaseConnector, ConnectorResult
+from ..base import HTTP2_AVAILABLE, BaseConnector, ConnectorResult
+from ..cache import ClientPool, InflightRequests, coalesced, invalidates_reads
+
+
+# Reads in flight, keyed by account, method and arguments
+_INFLIGHT = InflightRequests()
+
+# One pooled client per account, shared by every connector instance for it.
+# Tokens rotate, so the pool is bounded and closes the clients it evicts
+_CLIENT_POOL = ClientPool(lambda client: client.aclose())
+
+
+async def close_client_pool():
+    """Close all pooled Pipedrive HTTP clients. Call on application shutdown."""
+    await _CLIENT_POOL.aclose()
 
 
 class PipedriveConnector(BaseConnector):
     """Connector for Pipedrive CRM."""
 
+    base_url = "https://api.pipedrive.com/v1"
+
     def __init__(self, credentials: dict[str, Any]):
         super().__init__(credentials)
         self.api_token = credentials.get("api_token")
-        self.base_url = "https://api.pipedrive.com/v1"
+        # Concurrent identical reads share one request, across instances of
+        # the same account
+        self._account = self.api_token
+        self._inflight = _INFLIGHT
 
-    def _params(self, extra: dict = None) -> dict:
-        params = {"api_token": self.api_token}
-        if extra:
-            params.update(extra)
-        return params
+    def _create_client(self) -> httpx.AsyncClient:
+        # Instances are built per call, so the keep-alive pool is shared per
+        # API token; the token is a default query parameter, merged with each
+        # call's own params
+        key = self.credentials.get("api_token")
+        client = _CLIENT_POOL.get(key)
+        if client is None or client.is_closed:
+            client = self._new_client()
+            _CLIENT_POOL.set(key, client)
+        return client
+
+    def _new_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            base_url=self.base_url,
+            params={"api_token": self.credentials.get("api_token")},
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            # Concurrent calls multiplex as streams over one TLS connection
+            http2=HTTP2_AVAILABLE,
+            timeout=httpx.Timeout(10.0, connect=5.0),
+        )
 
     @classmethod
     def get_actions(cls) -> dict[str, dict[str, Any]]:
@@ -145,6 +179,7 @@ class PipedriveConnector(BaseConnector):
         except Exception as e:
             return ConnectorResult(success=False, error=str(e))
 
+    @invalidates_reads
     async def _create_person(self, params: dict) -> ConnectorResult:
         data = {"name": params["name"]}
         if params.get("email"):
@@ -154,63 +189,57 @@ class PipedriveConnector(BaseConnector):
         if params.get("org_id"):
             data["org_id"] = params["org_id"]
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/persons",
-                params=self._params(),
-                json=data,
-            )
-            response.raise_for_status()
-            result = response.json()
-            return ConnectorResult(success=True, data={"id": result["data"]["id"], "name": result["data"]["name"]})
+        response = await self.client.post(
+            "/persons",
+            json=data,
+        )
+        response.raise_for_status()
+        result = response.json()
+        return ConnectorResult(success=True, data={"id": result["data"]["id"], "name": result["data"]["name"]})
 
+    @coalesced
     async def _get_person(self, person_id: int) -> ConnectorResult:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/persons/{person_id}",
-                params=self._params(),
-            )
-            response.raise_for_status()
-            result = response.json()
-            return ConnectorResult(success=True, data=result["data"])
+        response = await self.client.get(f"/persons/{person_id}")
+        response.raise_for_status()
+        result = response.json()
+        return ConnectorResult(success=True, data=result["data"])
 
+    @invalidates_reads
     async def _update_person(self, person_id: int, data: dict) -> ConnectorResult:
-        async with httpx.AsyncClient() as client:
-            response = await client.put(
-                f"{self.base_url}/persons/{person_id}",
-                params=self._params(),
-                json=data,
-            )
-            response.raise_for_status()
-            result = response.json()
-            return ConnectorResult(success=True, data={"id": result["data"]["id"], "updated": True})
+        response = await self.client.put(
+            f"/persons/{person_id}",
+            json=data,
+        )
+        response.raise_for_status()
+        result = response.json()
+        return ConnectorResult(success=True, data={"id": result["data"]["id"], "updated": True})
 
+    @coalesced
     async def _search_persons(self, term: str) -> ConnectorResult:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/persons/search",
-                params=self._params({"term": term}),
-            )
-            response.raise_for_status()
-            result = response.json()
-            persons = [{"id": p["item"]["id"], "name": p["item"]["name"]} for p in result.get("data", {}).get("items", [])]
-            return ConnectorResult(success=True, data={"persons": persons})
+        response = await self.client.get(
+            "/persons/search",
+            params={"term": term},
+        )
+        response.raise_for_status()
+        result = response.json()
+        persons = [{"id": p["item"]["id"], "name": p["item"]["name"]} for p in result.get("data", {}).get("items", [])]
+        return ConnectorResult(success=True, data={"persons": persons})
 
+    @invalidates_reads
     async def _create_organization(self, params: dict) -> ConnectorResult:
         data = {"name": params["name"]}
         if params.get("address"):
             data["address"] = params["address"]
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/organizations",
-                params=self._params(),
-                json=data,
-            )
-            response.raise_for_status()
-            result = response.json()
-            return ConnectorResult(success=True, data={"id": result["data"]["id"], "name": result["data"]["name"]})
+        response = await self.client.post(
+            "/organizations",
+            json=data,
+        )
+        response.raise_for_status()
+        result = response.json()
+        return ConnectorResult(success=True, data={"id": result["data"]["id"], "name": result["data"]["name"]})
 
+    @invalidates_reads
     async def _create_deal(self, params: dict) -> ConnectorResult:
         data = {"title": params["title"]}
         if params.get("value"):
@@ -224,37 +253,32 @@ class PipedriveConnector(BaseConnector):
         if params.get("stage_id"):
             data["stage_id"] = params["stage_id"]
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/deals",
-                params=self._params(),
-                json=data,
-            )
-            response.raise_for_status()
-            result = response.json()
-            return ConnectorResult(success=True, data={"id": result["data"]["id"], "title": result["data"]["title"]})
+        response = await self.client.post(
+            "/deals",
+            json=data,
+        )
+        response.raise_for_status()
+        result = response.json()
+        return ConnectorResult(success=True, data={"id": result["data"]["id"], "title": result["data"]["title"]})
 
+    @coalesced
     async def _get_deal(self, deal_id: int) -> ConnectorResult:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/deals/{deal_id}",
-                params=self._params(),
-            )
-            response.raise_for_status()
-            result = response.json()
-            return ConnectorResult(success=True, data=result["data"])
+        response = await self.client.get(f"/deals/{deal_id}")
+        response.raise_for_status()
+        result = response.json()
+        return ConnectorResult(success=True, data=result["data"])
 
+    @invalidates_reads
     async def _update_deal(self, deal_id: int, data: dict) -> ConnectorResult:
-        async with httpx.AsyncClient() as client:
-            response = await client.put(
-                f"{self.base_url}/deals/{deal_id}",
-                params=self._params(),
-                json=data,
-            )
-            response.raise_for_status()
-            result = response.json()
-            return ConnectorResult(success=True, data={"id": result["data"]["id"], "updated": True})
+        response = await self.client.put(
+            f"/deals/{deal_id}",
+            json=data,
+        )
+        response.raise_for_status()
+        result = response.json()
+        return ConnectorResult(success=True, data={"id": result["data"]["id"], "updated": True})
 
+    @coalesced
     async def _list_deals(self, status: str | None, stage_id: int | None) -> ConnectorResult:
         extra = {}
         if status:
@@ -262,16 +286,16 @@ class PipedriveConnector(BaseConnector):
         if stage_id:
             extra["stage_id"] = stage_id
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/deals",
-                params=self._params(extra),
-            )
-            response.raise_for_status()
-            result = response.json()
-            deals = [{"id": d["id"], "title": d["title"], "value": d.get("value")} for d in result.get("data", []) or []]
-            return ConnectorResult(success=True, data={"deals": deals})
+        response = await self.client.get(
+            "/deals",
+            params=extra,
+        )
+        response.raise_for_status()
+        result = response.json()
+        deals = [{"id": d["id"], "title": d["title"], "value": d.get("value")} for d in result.get("data", []) or []]
+        return ConnectorResult(success=True, data={"deals": deals})
 
+    @invalidates_reads
     async def _create_activity(self, params: dict) -> ConnectorResult:
         data = {
             "subject": params["subject"],
@@ -284,34 +308,33 @@ class PipedriveConnector(BaseConnector):
         if params.get("person_id"):
             data["person_id"] = params["person_id"]
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.base_url}/activities",
-                params=self._params(),
-                json=data,
-            )
-            response.raise_for_status()
-            result = response.json()
-            return ConnectorResult(success=True, data={"id": result["data"]["id"]})
+        response = await self.client.post(
+            "/activities",
+            json=data,
+        )
+        response.raise_for_status()
+        result = response.json()
+        return ConnectorResult(success=True, data={"id": result["data"]["id"]})
 
+    @coalesced
     async def _list_pipelines(self) -> ConnectorResult:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/pipelines",
-                params=self._params(),
-            )
-            response.raise_for_status()
-            result = response.json()
-            pipelines = [{"id": p["id"], "name": p["name"]} for p in result.get("data", [])]
-            return ConnectorResult(success=True, data={"pipelines": pipelines})
+        response = await self.client.get("/pipelines")
+        response.raise_for_status()
+        result = response.json()
+        pipelines = [{"id": p["id"], "name": p["name"]} for p in result.get("data", [])]
+        return ConnectorResult(success=True, data={"pipelines": pipelines})
 
+    @coalesced
     async def _list_stages(self, pipeline_id: int) -> ConnectorResult:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/stages",
-                params=self._params({"pipeline_id": pipeline_id}),
-            )
-            response.raise_for_status()
-            result = response.json()
-            stages = [{"id": s["id"], "name": s["name"], "order_nr": s["order_nr"]} for s in result.get("data", [])]
-            return ConnectorResult(success=True, data={"stages": stages})
+        response = await self.client.get(
+            "/stages",
+            params={"pipeline_id": pipeline_id},
+        )
+        response.raise_for_status()
+        result = response.json()
+        stages = [{"id": s["id"], "name": s["name"], "order_nr": s["order_nr"]} for s in result.get("data", [])]
+        return ConnectorResult(success=True, data={"stages": stages})
+
+    async def close(self):
+        # The pooled client stays open for other instances; see close_client_pool()
+        pass
@@ -6,7 +6,21 @@ Connect to Salesforce CRM for customer and sales data operations.
 
 from typing import Any
 import httpx
-from ..base import BaseConnector, ConnectorResult
+from ..base import HTTP2_AVAILABLE, BaseConnector, ConnectorResult
+from ..cache import ClientPool, InflightRequests, coalesced, invalidates_reads
+
+
+# Reads in flight, keyed by account, method and arguments
+_INFLIGHT = InflightRequests()
+
+# One pooled client per account, shared by every connector instance for it.
+# Tokens rotate, so the pool is bounded and closes the clients it evicts
+_CLIENT_POOL = ClientPool(lambda client: client.aclose())
+
+
+async def close_client_pool():
+    """Close all pooled Salesforce HTTP clients. Call on application shutdown."""
+    await _CLIENT_POOL.aclose()
 
 
 class SalesforceConnector(BaseConnector):
@@ -17,16 +31,37 @@ class SalesforceConnector(BaseConnector):
         self.instance_url = credentials.get("instance_url")  # https://yourorg.salesforce.com
         self.access_token = credentials.get("access_token")
         self.api_version = credentials.get("api_version", "v58.0")
+        # Concurrent identical reads share one request, across instances of
+        # the same account
+        self._account = (self.instance_url, self.access_token)
+        self._inflight = _INFLIGHT
 
-    def _headers(self):
-        return {
-            "Authorization": f"Bearer {self.access_token}",
-            "Content-Type": "application/json",
-        }
+    def _create_client(self) -> httpx.AsyncClient:
+        # Instances are built per call, so the keep-alive pool is shared per
+        # org, token and API version; it is rooted at the versioned REST API
+        # and authorized by default, and JSON bodies set their own Content-Type
+        key = (
+            self.credentials.get("instance_url"),
+            self.credentials.get("access_token"),
+            self.credentials.get("api_version", "v58.0"),
+        )
+        client = _CLIENT_POOL.get(key)
+        if client is None or client.is_closed:
+            client = self._new_client()
+            _CLIENT_POOL.set(key, client)
+        return client
 
-    @property
-    def _base_url(self):
-        return f"{self.instance_url}/services/data/{self.api_version}"
+    def _new_client(self) -> httpx.AsyncClient:
+        instance_url = self.credentials.get("instance_url")
+        api_version = self.credentials.get("api_version", "v58.0")
+        return httpx.AsyncClient(
+            base_url=f"{instance_url}/services/data/{api_version}",
+            headers={"Authorization": f"Bearer {self.credentials.get('access_token')}"},
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            # Concurrent calls multiplex as streams over one TLS connection
+            http2=HTTP2_AVAILABLE,
+            timeout=httpx.Timeout(10.0, connect=5.0),
+        )
 
     @classmethod
     def get_actions(cls) -> dict[str, dict[str, Any]]:
@@ -147,111 +182,100 @@ class SalesforceConnector(BaseConnector):
         except Exception as e:
             return ConnectorResult(success=False, error=str(e))
 
+    @coalesced
     async def _query(self, soql: str) -> ConnectorResult:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self._base_url}/query",
-                headers=self._headers(),
-                params={"q": soql},
-            )
-            response.raise_for_status()
-            data = response.json()
-            return ConnectorResult(
-                success=True,
-                data={
-                    "records": data.get("records", []),
-                    "total_size": data.get("totalSize", 0),
-                    "done": data.get("done", True),
-                }
-            )
+        response = await self.client.get(
+            "/query",
+            params={"q": soql},
+        )
+        response.raise_for_status()
+        data = response.json()
+        return ConnectorResult(
+            success=True,
+            data={
+                "records": data.get("records", []),
+                "total_size": data.get("totalSize", 0),
+                "done": data.get("done", True),
+            }
+        )
 
+    @coalesced
     async def _get_record(self, object_type: str, record_id: str, fields: list | None) -> ConnectorResult:
-        url = f"{self._base_url}/sobjects/{object_type}/{record_id}"
+        url = f"/sobjects/{object_type}/{record_id}"
         params = {}
         if fields:
             params["fields"] = ",".join(fields)
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=self._headers(), params=params)
-            response.raise_for_status()
-            return ConnectorResult(success=True, data=response.json())
+        response = await self.client.get(url, params=params)
+        response.raise_for_status()
+        return ConnectorResult(success=True, data=response.json())
 
+    @invalidates_reads
     async def _create_record(self, object_type: str, data: dict) -> ConnectorResult:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self._base_url}/sobjects/{object_type}",
-                headers=self._headers(),
-                json=data,
-            )
-            response.raise_for_status()
-            result = response.json()
-            return ConnectorResult(success=True, data={"id": result["id"], "success": result["success"]})
+        response = await self.client.post(
+            f"/sobjects/{object_type}",
+            json=data,
+        )
+        response.raise_for_status()
+        result = response.json()
+        return ConnectorResult(success=True, data={"id": result["id"], "success": result["success"]})
 
+    @invalidates_reads
     async def _update_record(self, object_type: str, record_id: str, data: dict) -> ConnectorResult:
-        async with httpx.AsyncClient() as client:
-            response = await client.patch(
-                f"{self._base_url}/sobjects/{object_type}/{record_id}",
-                headers=self._headers(),
-                json=data,
-            )
-            response.raise_for_status()
-            return ConnectorResult(success=True, data={"id": record_id, "updated": True})
+        response = await self.client.patch(
+            f"/sobjects/{object_type}/{record_id}",
+            json=data,
+        )
+        response.raise_for_status()
+        return ConnectorResult(success=True, data={"id": record_id, "updated": True})
 
+    @invalidates_reads
     async def _delete_record(self, object_type: str, record_id: str) -> ConnectorResult:
-        async with httpx.AsyncClient() as client:
-            response = await client.delete(
-                f"{self._base_url}/sobjects/{object_type}/{record_id}",
-                headers=self._headers(),
-            )
-            response.raise_for_status()
-            return ConnectorResult(success=True, data={"id": record_id, "deleted": True})
+        response = await self.client.delete(f"/sobjects/{object_type}/{record_id}")
+        response.raise_for_status()
+        return ConnectorResult(success=True, data={"id": record_id, "deleted": True})
 
+    @invalidates_reads
     async def _upsert_record(self, object_type: str, ext_id_field: str, ext_id: str, data: dict) -> ConnectorResult:
-        async with httpx.AsyncClient() as client:
-            response = await client.patch(
-                f"{self._base_url}/sobjects/{object_type}/{ext_id_field}/{ext_id}",
-                headers=self._headers(),
-                json=data,
-            )
-            response.raise_for_status()
-            result = response.json() if response.content else {}
-            return ConnectorResult(success=True, data={"id": result.get("id"), "created": result.get("created", False)})
+        response = await self.client.patch(
+            f"/sobjects/{object_type}/{ext_id_field}/{ext_id}",
+            json=data,
+        )
+        response.raise_for_status()
+        result = response.json() if response.content else {}
+        return ConnectorResult(success=True, data={"id": result.get("id"), "created": result.get("created", False)})
 
+    @coalesced
     async def _describe_object(self, object_type: str) -> ConnectorResult:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self._base_url}/sobjects/{object_type}/describe",
-                headers=self._headers(),
-            )
-            response.raise_for_status()
-            data = response.json()
-            return ConnectorResult(
-                success=True,
-                data={
-                    "name": data["name"],
-                    "label": data["label"],
-                    "fields": [{"name": f["name"], "type": f["type"], "label": f["label"]} for f in data["fields"]],
-                }
-            )
+        response = await self.client.get(f"/sobjects/{object_type}/describe")
+        response.raise_for_status()
+        data = response.json()
+        return ConnectorResult(
+            success=True,
+            data={
+                "name": data["name"],
+                "label": data["label"],
+                "fields": [{"name": f["name"], "type": f["type"], "label": f["label"]} for f in data["fields"]],
+            }
+        )
 
+    @coalesced
     async def _list_objects(self) -> ConnectorResult:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{self._base_url}/sobjects", headers=self._headers())
-            response.raise_for_status()
-            data = response.json()
-            objects = [{"name": o["name"], "label": o["label"]} for o in data.get("sobjects", [])]
-            return ConnectorResult(success=True, data={"objects": objects})
+        response = await self.client.get("/sobjects")
+        response.raise_for_status()
+        data = response.json()
+        objects = [{"name": o["name"], "label": o["label"]} for o in data.get("sobjects", [])]
+        return ConnectorResult(success=True, data={"objects": objects})
 
+    @coalesced
     async def _search(self, sosl: str) -> ConnectorResult:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self._base_url}/search",
-                headers=self._headers(),
-                params={"q": sosl},
-            )
-            response.raise_for_status()
-            data = response.json()
-            return ConnectorResult(success=True, data={"results": data.get("searchRecords", [])})
+        response = await self.client.get(
+            "/search",
+            params={"q": sosl},
+        )
+        response.raise_for_status()
+        data = response.json()
+        return ConnectorResult(success=True, data={"results": data.get("searchRecords", [])})
 
     async def _create_lead(self, params: dict) -> ConnectorResult:
         data = {
@@ -281,3 +305,7 @@ class SalesforceConnector(BaseConnector):
             data["AccountId"] = params["account_id"]
 
         return await self._create_record("Opportunity", data)
+
+    async def close(self):
+        # The pooled client stays open for other instances; see close_client_pool()
+        pass
@@ -5,6 +5,7 @@ Central registry for all connectors. Provides discovery and instantiation.
 """
 
 from typing import Any, Type
+import importlib
 from .base import BaseConnector, ConnectorResult
 
 # Original connectors
@@ -41,14 +42,6 @@ from .databases.mariadb import MariaDBConnector
 from .databases.cassandra import CassandraConnector
 from .databases.clickhouse import ClickHouseConnector
 
-# Cloud storage connectors
-from .cloud.aws_s3 import AWSS3Connector
-from .cloud.azure_blob import AzureBlobConnector
-from .cloud.gcs import GCSConnector
-from .cloud.dropbox import DropboxConnector
-from .cloud.box import BoxConnector
-from .cloud.onedrive import OneDriveConnector
-
 # CRM connectors
 from .crm.salesforce import SalesforceConnector
 from .crm.hubspot import HubSpotConnector
@@ -73,7 +66,8 @@ from .productivity.clickup import ClickUpConnector
 class ConnectorRegistry:
     """Registry of all available connectors."""
 
-    _connectors: dict[str, Type[BaseConnector]] = {
+    # Entries given as "module:Class" paths are imported on first use
+    _connectors: dict[str, Type[BaseConnector] | str] = {
         # Communication
         "slack": SlackConnector,
         "discord": DiscordConnector,
@@ -114,13 +108,13 @@ class ConnectorRegistry:
         "cassandra": CassandraConnector,
         "clickhouse": ClickHouseConnector,
 
-        # Cloud Storage (6)
-        "aws_s3": AWSS3Connector,
-        "azure_blob": AzureBlobConnector,
-        "gcs": GCSConnector,
-        "dropbox": DropboxConnector,
-        "box": BoxConnector,
-        "onedrive": OneDriveConnector,
+        # Cloud Storage (6); their provider SDKs load only when used
+        "aws_s3": ".cloud.aws_s3:AWSS3Connector",
+        "azure_blob": ".cloud.azure_blob:AzureBlobConnector",
+        "gcs": ".cloud.gcs:GCSConnector",
+        "dropbox": ".cloud.dropbox:DropboxConnector",
+        "box": ".cloud.box:BoxConnector",
+        "onedrive": ".cloud.onedrive:OneDriveConnector",
 
         # CRM (5)
         "salesforce": SalesforceConnector,
@@ -147,8 +141,8 @@ class ConnectorRegistry:
     def list_connectors(cls) -> list[dict[str, Any]]:
         """List all available connectors with their metadata."""
         connectors = []
-        for name, connector_class in cls._connectors.items():
-            instance = connector_class({})
+        for name in list(cls._connectors):
+            instance = cls.get_connector_class(name)({})
             connectors.append({
                 "service": name,
                 "display_name": instance.display_name,
@@ -159,7 +153,13 @@ class ConnectorRegistry:
     @classmethod
     def get_connector_class(cls, service: str) -> Type[BaseConnector] | None:
         """Get a connector class by service name."""
-        return cls._connectors.get(service.lower())
+        service = service.lower()
+        connector_class = cls._connectors.get(service)
+        if isinstance(connector_class, str):
+            module_name, _, class_name = connector_class.partition(":")
+            connector_class = getattr(importlib.import_module(module_name, __package__), class_name)
+            cls._connectors[service] = connector_class
+        return connector_class
 
     @classmethod
     def get_connector(cls, service: str, credentials: dict[str, Any]) -> BaseConnector | None:
@@ -0,0 +1,226 @@
+"""Tests for the S3 connector's multipart, ranged and batched paths."""
+
+import asyncio
+import base64
+
+import pytest
+
+from src.connectors.cloud import aws_s3
+from src.connectors.cloud.aws_s3 import AWSS3Connector
+
+
+class _Body:
+    def __init__(self, data: bytes):
+        self.data = data
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return None
+
+    async def read(self) -> bytes:
+        return self.data
+
+
+class _ClientError(Exception):
+    def __init__(self, code: str):
+        super().__init__(code)
+        self.response = {"Error": {"Code": code}}
+
+
+class FakeS3:
+    """In-memory stand-in for the aiobotocore client calls the connector makes."""
+
+    def __init__(self):
+        self.objects: dict[tuple[str, str], bytes] = {}
+        self.parts: dict[int, bytes] = {}
+        self.calls: list[tuple[str, dict]] = []
+
+    async def put_object(self, **kwargs):
+        self.calls.append(("put_object", kwargs))
+        self.objects[(kwargs["Bucket"], kwargs["Key"])] = bytes(kwargs["Body"])
+        return {}
+
+    async def create_multipart_upload(self, **kwargs):
+        self.calls.append(("create_multipart_upload", kwargs))
+        return {"UploadId": "upload-1"}
+
+    async def upload_part(self, **kwargs):
+        self.calls.append(("upload_part", kwargs))
+        self.parts[kwargs["PartNumber"]] = bytes(kwargs["Body"])
+        return {"ETag": f"etag-{kwargs['PartNumber']}"}
+
+    async def complete_multipart_upload(self, **kwargs):
+        self.calls.append(("complete_multipart_upload", kwargs))
+        numbers = [part["PartNumber"] for part in kwargs["MultipartUpload"]["Parts"]]
+        self.objects[(kwargs["Bucket"], kwargs["Key"])] = b"".join(self.parts[n] for n in numbers)
+        return {}
+
+    async def abort_multipart_upload(self, **kwargs):
+        self.calls.append(("abort_multipart_upload", kwargs))
+        return {}
+
+    async def get_object(self, **kwargs):
+        self.calls.append(("get_object", kwargs))
+        data = self.objects[(kwargs["Bucket"], kwargs["Key"])]
+        response = {"ETag": '"v1"', "ContentType": "application/octet-stream"}
+        if "Range" in kwargs:
+            if not data:
+                raise _ClientError("InvalidRange")
+            start, end = map(int, kwargs["Range"].removeprefix("bytes=").split("-"))
+            response["ContentRange"] = f"bytes {start}-{min(end, len(data) - 1)}/{len(data)}"
+            data = data[start:end + 1]
+        response["Body"] = _Body(data)
+        return response
+
+    async def head_object(self, **kwargs):
+        return {"ContentLength": len(self.objects[(kwargs["Bucket"], kwargs["Key"])])}
+
+    async def copy_object(self, **kwargs):
+        source = kwargs["CopySource"]
+        self.objects[(kwargs["Bucket"], kwargs["Key"])] = self.objects[(source["Bucket"], source["Key"])]
+        return {}
+
+    async def delete_objects(self, **kwargs):
+        keys = [obj["Key"] for obj in kwargs["Delete"]["Objects"]]
+        self.calls.append(("delete_objects", {"Bucket": kwargs["Bucket"], "Keys": keys}))
+        errors = []
+        for key in keys:
+            if key.startswith("locked/"):
+                errors.append({"Key": key, "Message": "Access Denied"})
+            else:
+                self.objects.pop((kwargs["Bucket"], key), None)
+        return {"Errors": errors}
+
+    def called(self, name: str) -> list[dict]:
+        return [kwargs for call, kwargs in self.calls if call == name]
+
+
+@pytest.fixture
+def s3():
+    connector = AWSS3Connector({"access_key_id": "test", "secret_access_key": "test"})
+    connector._client = FakeS3()
+    return connector
+
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode()
+
+
+async def test_multipart_upload_sends_parts_in_order(s3, monkeypatch):
+    """Test that large bodies are uploaded as numbered parts and completed."""
+    monkeypatch.setattr(aws_s3, "_MULTIPART_THRESHOLD", 4)
+    monkeypatch.setattr(aws_s3, "_MULTIPART_PART_SIZE", 4)
+
+    result = await s3.execute("upload", {"bucket": "b", "key": "big", "content": _b64(b"0123456789")})
+
+    assert result.success
+    assert [kwargs["Body"] for kwargs in s3._client.called("upload_part")] == [b"0123", b"4567", b"89"]
+    parts = s3._client.called("complete_multipart_upload")[0]["MultipartUpload"]["Parts"]
+    assert parts == [{"PartNumber": n, "ETag": f"etag-{n}"} for n in (1, 2, 3)]
+    assert s3._client.objects[("b", "big")] == b"0123456789"
+
+
+async def test_multipart_upload_cancels_parts_before_abort(s3, monkeypatch):
+    """Test that a failed part cancels the others before the upload is aborted."""
+    monkeypatch.setattr(aws_s3, "_MULTIPART_THRESHOLD", 4)
+    monkeypatch.setattr(aws_s3, "_MULTIPART_PART_SIZE", 4)
+    client = s3._client
+    events = []
+
+    async def upload_part(**kwargs):
+        if kwargs["PartNumber"] == 1:
+            await asyncio.sleep(0)
+            raise ConnectionError("part 1 failed")
+        try:
+            await asyncio.sleep(3600)
+        except asyncio.CancelledError:
+            events.append(f"cancelled {kwargs['PartNumber']}")
+            raise
+
+    async def abort_multipart_upload(**kwargs):
+        events.append("abort")
+
+    client.upload_part = upload_part
+    client.abort_multipart_upload = abort_multipart_upload
+
+    result = await s3.execute("upload", {"bucket": "b", "key": "big", "content": _b64(b"0123456789")})
+
+    assert not result.success
+    assert "part 1 failed" in result.error
+    assert sorted(events[:-1]) == ["cancelled 2", "cancelled 3"]
+    assert events[-1] == "abort"
+    assert not client.called("complete_multipart_upload")
+
+
+async def test_ranged_download_stitches_parts(s3, monkeypatch):
+    """Test that large objects are fetched as byte ranges pinned to the first ETag."""
+    monkeypatch.setattr(aws_s3, "_RANGED_DOWNLOAD_PART_SIZE", 4)
+    s3._client.objects[("b", "k")] = b"0123456789"
+
+    result = await s3.execute("download", {"bucket": "b", "key": "k"})
+
+    assert result.success
+    assert base64.b64decode(result.data["content"]) == b"0123456789"
+    gets = s3._client.called("get_object")
+    assert [kwargs["Range"] for kwargs in gets] == ["bytes=0-3", "bytes=4-7", "bytes=8-9"]
+    assert "IfMatch" not in gets[0]
+    assert all(kwargs["IfMatch"] == '"v1"' for kwargs in gets[1:])
+
+
+async def test_ranged_download_small_and_empty_objects(s3, monkeypatch):
+    """Test that small objects take one GET and empty ones fall back to a plain GET."""
+    monkeypatch.setattr(aws_s3, "_RANGED_DOWNLOAD_PART_SIZE", 4)
+    s3._client.objects[("b", "small")] = b"abc"
+    s3._client.objects[("b", "empty")] = b""
+
+    small = await s3.execute("download", {"bucket": "b", "key": "small"})
+    empty = await s3.execute("download", {"bucket": "b", "key": "empty"})
+
+    assert base64.b64decode(small.data["content"]) == b"abc"
+    assert empty.success and empty.data["content_length"] == 0
+    assert len(s3._client.called("get_object")) == 3
+
+
+async def test_bulk_move_batches_source_deletes(s3, monkeypatch):
+    """Test that copied sources are deleted in DeleteObjects batches and failures are reported per move."""
+    monkeypatch.setattr(aws_s3, "_DELETE_BATCH_SIZE", 2)
+    sources = ["a", "b", "locked/c", "d", "e"]
+    for key in sources:
+        s3._client.objects[("src", key)] = key.encode()
+    moves = [
+        {"source_bucket": "src", "source_key": key, "dest_bucket": "dst", "dest_key": f"moved/{key}"}
+        for key in sources
+    ]
+
+    result = await s3.execute("move", {"moves": moves})
+
+    batches = [kwargs["Keys"] for kwargs in s3._client.called("delete_objects")]
+    assert batches == [["a", "b"], ["locked/c", "d"], ["e"]]
+    assert result.data["moved"] == 4 and result.data["failed"] == 1
+    failed = next(r for r in result.data["results"] if not r["success"])
+    assert failed["source_key"] == "locked/c" and failed["copied"]
+    assert ("dst", "moved/locked/c") in s3._client.objects
+
+
+async def test_presigned_url_reuse_keeps_nearly_full_lifetime(s3, monkeypatch):
+    """Test that a string expires_in is accepted and cached URLs are reused only briefly."""
+    urls = []
+
+    async def generate_presigned_url(operation, Params, ExpiresIn):
+        urls.append(ExpiresIn)
+        return f"https://signed/{len(urls)}"
+
+    s3._client.generate_presigned_url = generate_presigned_url
+    ttls = []
+    set_url = s3._url_cache.set
+    monkeypatch.setattr(s3._url_cache, "set", lambda key, value, ttl: ttls.append(ttl) or set_url(key, value, ttl))
+
+    params = {"bucket": "b", "key": "presign-k", "expires_in": "3600"}
+    first = await s3.execute("get_presigned_url", params)
+    second = await s3.execute("get_presigned_url", params)
+
+    assert first.data["url"] == second.data["url"]
+    assert urls == [3600]
+    assert ttls == [3600 * aws_s3._URL_REUSE_FRACTION]
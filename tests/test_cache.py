@@ -0,0 +1,233 @@
+"""Tests for the connector TTL cache and request coalescing."""
+
+import asyncio
+
+from src.connectors.cache import (
+    ClientPool,
+    InflightRequests,
+    TTLCache,
+    coalesced,
+    invalidates_reads,
+    shared_cache,
+)
+
+
+def test_cache_get_and_set():
+    """Test storing and retrieving values."""
+    cache = TTLCache(maxsize=4, ttl=60)
+    cache.set("a", 1)
+
+    assert cache.get("a") == 1
+    assert cache.get("missing") is None
+    assert cache.get("missing", "default") == "default"
+
+
+def test_cache_expiry():
+    """Test that expired entries are not returned."""
+    cache = TTLCache(maxsize=4, ttl=60)
+    cache.set("a", 1, ttl=0)
+
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_cache_lru_eviction():
+    """Test that the least recently used entry is evicted first."""
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_shared_cache_by_namespace():
+    """Test that shared caches are reused per namespace and kept apart across namespaces."""
+    cache = shared_cache(("test", "tenant-a"), maxsize=4, ttl=60)
+    cache.set("a", 1)
+
+    assert shared_cache(("test", "tenant-a")) is cache
+    assert shared_cache(("test", "tenant-a")).get("a") == 1
+    assert shared_cache(("test", "tenant-b")).get("a") is None
+
+
+def test_client_pool_closes_evicted_clients():
+    """Test that clients evicted from a full pool are closed after the grace period."""
+    closed = []
+
+    async def close(client):
+        closed.append(client)
+
+    async def run():
+        pool = ClientPool(close, maxsize=2, grace=0)
+        pool.set("a", "client-a")
+        pool.set("b", "client-b")
+        pool.get("a")
+        pool.set("c", "client-c")
+        await asyncio.sleep(0.01)
+        evicted = list(closed)
+        await pool.aclose()
+        return pool, evicted
+
+    pool, evicted = asyncio.run(run())
+
+    assert evicted == ["client-b"]
+    assert sorted(closed) == ["client-a", "client-b", "client-c"]
+    assert len(pool) == 0
+
+
+def test_client_pool_close_includes_pending_evictions():
+    """Test that shutdown closes evicted clients still in their grace period."""
+    closed = []
+
+    async def close(client):
+        closed.append(client)
+
+    async def run():
+        pool = ClientPool(close, maxsize=1, grace=3600)
+        pool.set("a", "client-a")
+        pool.set("b", "client-b")
+        await asyncio.sleep(0)
+        assert closed == []
+        await pool.aclose()
+
+    asyncio.run(run())
+
+    assert sorted(closed) == ["client-a", "client-b"]
+
+
+def test_inflight_requests_coalesce():
+    """Test that concurrent calls with the same key share one request."""
+    inflight = InflightRequests()
+    calls = []
+
+    async def fetch(value):
+        calls.append(value)
+        await asyncio.sleep(0)
+        return value
+
+    async def run():
+        results = await asyncio.gather(
+            inflight.run("a", lambda: fetch(1)),
+            inflight.run("a", lambda: fetch(2)),
+            inflight.run("b", lambda: fetch(3)),
+        )
+        return results, len(inflight)
+
+    results, pending = asyncio.run(run())
+
+    assert results == [1, 1, 3]
+    assert calls == [1, 3]
+    assert pending == 0
+
+
+def test_inflight_requests_share_errors():
+    """Test that a failed request raises for every caller and is not remembered."""
+    inflight = InflightRequests()
+
+    async def fail():
+        await asyncio.sleep(0)
+        raise ValueError("boom")
+
+    async def run():
+        results = await asyncio.gather(
+            inflight.run("a", fail),
+            inflight.run("a", fail),
+            return_exceptions=True,
+        )
+        return results, await inflight.run("a", lambda: asyncio.sleep(0, "ok"))
+
+    results, retried = asyncio.run(run())
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert retried == "ok"
+
+
+def test_coalesced_across_instances():
+    """Test that instances of one account share reads and other accounts don't."""
+    inflight = InflightRequests()
+    calls = []
+
+    class Reader:
+        _inflight = inflight
+
+        def __init__(self, account):
+            self._account = account
+
+        @coalesced
+        async def read(self, ids):
+            calls.append((self._account, tuple(ids)))
+            await asyncio.sleep(0)
+            return self._account
+
+    async def run():
+        return await asyncio.gather(
+            Reader("a").read([1, 2]),
+            Reader("a").read([1, 2]),
+            Reader("b").read([1, 2]),
+        )
+
+    results = asyncio.run(run())
+
+    assert results == ["a", "a", "b"]
+    assert calls == [("a", (1, 2)), ("b", (1, 2))]
+
+
+def test_coalesced_writes_invalidate_inflight_reads():
+    """Test that a read after a write doesn't join a read started before it."""
+    store = {"deal": "old"}
+    read_started = []
+
+    class Reader:
+        _inflight = InflightRequests()
+
+        def __init__(self):
+            self._account = "a"
+
+        @coalesced
+        async def read(self):
+            value = store["deal"]
+            read_started[0].set()
+            await asyncio.sleep(0.01)
+            return {"deal": value}
+
+        @invalidates_reads
+        async def write(self, value):
+            store["deal"] = value
+
+    async def run():
+        read_started.append(asyncio.Event())
+        before = asyncio.ensure_future(Reader().read())
+        await read_started[0].wait()
+        await Reader().write("new")
+        after = await Reader().read()
+        return await before, after
+
+    before, after = asyncio.run(run())
+
+    assert before == {"deal": "old"}
+    assert after == {"deal": "new"}
+
+
+def test_coalesced_callers_get_their_own_copy():
+    """Test that mutating one caller's result doesn't change another's."""
+
+    class Reader:
+        _inflight = InflightRequests()
+        _account = "a"
+
+        @coalesced
+        async def read(self):
+            await asyncio.sleep(0)
+            return {"items": [1, 2]}
+
+    async def run():
+        return await asyncio.gather(Reader().read(), Reader().read())
+
+    first, second = asyncio.run(run())
+    first["items"].append(3)
+
+    assert second == {"items": [1, 2]}
@@ -0,0 +1,40 @@
+"""Tests for the connector payload codec."""
+
+import os
+
+import pytest
+
+from src.connectors import codec
+
+
+def test_resolve_transfer_path_inside_directory(tmp_path, monkeypatch):
+    """Test that relative paths resolve inside the transfer directory."""
+    monkeypatch.setattr(codec, "LOCAL_TRANSFER_DIR", str(tmp_path))
+
+    assert codec.resolve_transfer_path("a/b.txt") == os.path.join(os.path.realpath(tmp_path), "a", "b.txt")
+
+
+@pytest.mark.parametrize("path", ["../x", "/etc/passwd", "a/../../x"])
+def test_resolve_transfer_path_rejects_escapes(tmp_path, monkeypatch, path):
+    """Test that paths outside the transfer directory are rejected."""
+    monkeypatch.setattr(codec, "LOCAL_TRANSFER_DIR", str(tmp_path))
+
+    with pytest.raises(PermissionError):
+        codec.resolve_transfer_path(path)
+
+
+def test_resolve_transfer_path_rejects_symlink_escape(tmp_path, monkeypatch):
+    """Test that a symlink inside the directory cannot point outside it."""
+    (tmp_path / "link").symlink_to("/etc")
+    monkeypatch.setattr(codec, "LOCAL_TRANSFER_DIR", str(tmp_path))
+
+    with pytest.raises(PermissionError):
+        codec.resolve_transfer_path("link/passwd")
+
+
+def test_resolve_transfer_path_disabled(monkeypatch):
+    """Test that local transfers are refused when no directory is configured."""
+    monkeypatch.setattr(codec, "LOCAL_TRANSFER_DIR", None)
+
+    with pytest.raises(PermissionError):
+        codec.resolve_transfer_path("a.txt")
@@ -0,0 +1,142 @@
+"""Tests for the shared connector transports."""
+
+import types
+
+import httpx
+import pytest
+
+from src.connectors import base
+from src.connectors.base import RateLimitTransport, RetryTransport, TokenBucket
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replace the time and sleep used by base with a fake clock; sleeps advance it."""
+    fake = types.SimpleNamespace(now=1000.0, sleeps=[])
+
+    async def sleep(delay):
+        fake.sleeps.append(delay)
+        fake.now += delay
+
+    monkeypatch.setattr(base, "time", types.SimpleNamespace(monotonic=lambda: fake.now))
+    monkeypatch.setattr(base, "asyncio", types.SimpleNamespace(sleep=sleep))
+    return fake
+
+
+class _ScriptedTransport(httpx.AsyncBaseTransport):
+    """
+    Server stub answering with ``statuses`` in turn.
+
+    Unlike MockTransport it leaves request bodies unread, so streamed bodies
+    stay streams.
+    """
+
+    def __init__(self, statuses: list[int], headers: dict | None):
+        self.statuses = statuses
+        self.headers = headers
+        self.requests = []
+
+    async def handle_async_request(self, request):
+        self.requests.append(request)
+        return httpx.Response(self.statuses[len(self.requests) - 1], headers=self.headers)
+
+
+def _client(statuses: list[int], headers: dict | None = None, **retry_kwargs):
+    """A retrying client over a scripted server, and the requests it receives."""
+    server = _ScriptedTransport(statuses, headers)
+    return httpx.AsyncClient(transport=RetryTransport(server, **retry_kwargs)), server.requests
+
+
+async def test_retry_transport_backs_off_until_success(clock):
+    """Test that transient failures are retried with exponential backoff."""
+    client, requests = _client([503, 502, 200])
+
+    response = await client.get("https://api.test/items")
+
+    assert response.status_code == 200
+    assert len(requests) == 3
+    assert clock.sleeps == [1, 2]
+
+
+async def test_retry_transport_honours_retry_after(clock):
+    """Test that a numeric Retry-After header sets the delay, capped at max_delay."""
+    client, _ = _client([429, 429, 200], headers={"Retry-After": "120"}, max_delay=30.0)
+
+    response = await client.get("https://api.test/items")
+
+    assert response.status_code == 200
+    assert clock.sleeps == [30.0, 30.0]
+
+
+async def test_retry_transport_gives_up_after_max_retries(clock):
+    """Test that the last response is returned once retries run out."""
+    client, requests = _client([503] * 3, max_retries=2)
+
+    response = await client.get("https://api.test/items")
+
+    assert response.status_code == 503
+    assert len(requests) == 3
+
+
+async def test_retry_transport_only_retries_5xx_for_idempotent_methods(clock):
+    """Test that a POST is retried on 429 but not on a gateway error."""
+    client, requests = _client([503])
+    response = await client.post("https://api.test/items", content=b"{}")
+    assert response.status_code == 503
+    assert len(requests) == 1
+
+    client, requests = _client([429, 201])
+    response = await client.post("https://api.test/items", content=b"{}")
+    assert response.status_code == 201
+    assert len(requests) == 2
+
+
+async def test_retry_transport_does_not_replay_streamed_bodies(clock):
+    """Test that requests with streamed bodies are returned without retrying."""
+    client, requests = _client([503, 200])
+
+    async def body():
+        yield b"chunk"
+
+    response = await client.put("https://api.test/items", content=body())
+
+    assert response.status_code == 503
+    assert len(requests) == 1
+
+
+async def test_token_bucket_allows_burst_then_paces(clock):
+    """Test that a bucket lets ``burst`` requests through, then spaces them by 1/rate."""
+    bucket = TokenBucket(rate=10.0, burst=3)
+
+    for _ in range(3):
+        await bucket.acquire()
+    assert clock.sleeps == []
+
+    await bucket.acquire()
+    await bucket.acquire()
+    assert clock.sleeps == pytest.approx([0.1, 0.1])
+
+
+async def test_token_bucket_refills_while_idle(clock):
+    """Test that an idle bucket gets its burst back."""
+    bucket = TokenBucket(rate=10.0, burst=2)
+    for _ in range(4):
+        await bucket.acquire()
+    clock.sleeps.clear()
+
+    clock.now += 10
+    await bucket.acquire()
+    await bucket.acquire()
+
+    assert clock.sleeps == []
+
+
+async def test_rate_limit_transport_takes_a_token_per_request(clock):
+    """Test that every request through the transport acquires from the bucket."""
+    transport = RateLimitTransport(httpx.MockTransport(lambda request: httpx.Response(200)), TokenBucket(rate=5.0))
+    client = httpx.AsyncClient(transport=transport)
+
+    for _ in range(3):
+        await client.get("https://api.test/items")
+
+    assert clock.sleeps == pytest.approx([0.2, 0.2])
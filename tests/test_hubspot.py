@@ -0,0 +1,86 @@
+"""Tests for HubSpot batch creates."""
+
+import json
+
+import httpx
+import pytest
+
+from src.connectors.crm.hubspot import HubSpotConnector
+
+
+def _connector(fail_chunk: int | None = None):
+    """A connector whose server creates each input, failing the ``fail_chunk``-th request."""
+    requests = []
+
+    def handler(request):
+        inputs = json.loads(request.content)["inputs"]
+        requests.append((request.url.path, inputs))
+        if len(requests) - 1 == fail_chunk:
+            return httpx.Response(500, json={"message": "boom"})
+        results = [
+            {"id": item["properties"]["email"], "properties": item["properties"]}
+            for item in inputs
+        ]
+        return httpx.Response(201, json={"results": results})
+
+    connector = HubSpotConnector({"access_token": "test-batch-create"})
+    connector.client = httpx.AsyncClient(base_url=connector.base_url, transport=httpx.MockTransport(handler))
+    return connector, requests
+
+
+def _contacts(count: int) -> list[dict]:
+    return [{"email": f"user{i}@example.com"} for i in range(count)]
+
+
+async def test_batch_create_splits_into_chunks_of_100():
+    """Test that inputs are sent in batch requests of at most 100, results in order."""
+    connector, requests = _connector()
+
+    result = await connector.execute("batch_create_contacts", {"contacts": _contacts(250)})
+
+    assert result.success
+    assert [len(inputs) for _, inputs in requests] == [100, 100, 50]
+    assert {path for path, _ in requests} == {"/crm/v3/objects/contacts/batch/create"}
+    assert result.data["count"] == 250
+    assert result.data["results"][0] == {"id": "user0@example.com", "properties": {"email": "user0@example.com"}}
+    assert [r["id"] for r in result.data["results"]] == [c["email"] for c in _contacts(250)]
+
+
+async def test_batch_create_reports_failed_chunks_with_partial_results():
+    """Test that a failed chunk fails the action but keeps the records other chunks created."""
+    connector, requests = _connector(fail_chunk=1)
+
+    result = await connector.execute("batch_create_deals", {"deals": _contacts(250)})
+
+    assert not result.success
+    assert "500" in result.error
+    assert len(requests) == 3
+    assert result.data["count"] == 150
+
+
+@pytest.mark.parametrize("fail_chunk", [None, 0])
+async def test_batch_create_contacts_clears_search_cache(fail_chunk):
+    """Test that contact searches are invalidated whether or not the batch succeeds."""
+    connector, _ = _connector(fail_chunk=fail_chunk)
+    connector._search_cache.set(b"query", {"results": []})
+
+    await connector.execute("batch_create_contacts", {"contacts": _contacts(3)})
+
+    assert connector._search_cache.get(b"query") is None
+
+
+async def test_get_contact_returns_a_copy_of_the_cached_contact():
+    """Test that mutating a returned contact leaves the shared cache intact."""
+    connector = HubSpotConnector({"access_token": "test-get-contact-copy"})
+    connector.client = httpx.AsyncClient(
+        base_url=connector.base_url,
+        transport=httpx.MockTransport(
+            lambda request: httpx.Response(200, json={"id": "1", "properties": {"email": "a@example.com"}})
+        ),
+    )
+
+    first = await connector.execute("get_contact", {"contact_id": "1"})
+    first.data["properties"]["email"] = "changed@example.com"
+    second = await connector.execute("get_contact", {"contact_id": "1"})
+
+    assert second.data["properties"]["email"] == "a@example.com"
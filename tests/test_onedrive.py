@@ -0,0 +1,135 @@
+"""Tests for OneDrive token refresh through the TokenStore and listing limits."""
+
+import asyncio
+import time
+
+import httpx
+
+from src.connectors.auth import MemoryTokenStore, TokenData, TokenStore
+from src.connectors.cloud.onedrive import OneDriveConnector, _GraphAuth
+
+CACHE_KEY = "onedrive-test"
+REFRESH_KEY = TokenStore.generate_key(CACHE_KEY, "refresh_token")
+
+
+class FakeProvider:
+    """Stands in for OAuth2Provider: each refresh issues the next numbered token pair."""
+
+    def __init__(self):
+        self.store = MemoryTokenStore()
+        self.refreshed_with: list[str] = []
+
+    async def refresh(self, refresh_token: str) -> TokenData:
+        self.refreshed_with.append(refresh_token)
+        await asyncio.sleep(0)
+        n = len(self.refreshed_with)
+        token = TokenData(access_token=f"access-{n}", refresh_token=f"refresh-{n}", expires_at=time.time() + 3600)
+        await self.store.set(CACHE_KEY, token)
+        return token
+
+
+def _client(provider: FakeProvider, valid_token: str = "access-1"):
+    """A client whose server accepts only ``valid_token``, and the tokens it was sent."""
+    seen = []
+
+    def handler(request):
+        token = request.headers["Authorization"].removeprefix("Bearer ")
+        seen.append(token)
+        return httpx.Response(200 if token == valid_token else 401)
+
+    auth = _GraphAuth("initial", provider, CACHE_KEY, "refresh-0")
+    return httpx.AsyncClient(auth=auth, transport=httpx.MockTransport(handler)), seen
+
+
+async def test_graph_auth_refreshes_on_401_and_saves_rotated_token():
+    """Test that a 401 redeems the credentials' refresh token and stores the rotated one."""
+    provider = FakeProvider()
+    client, seen = _client(provider)
+
+    response = await client.get("https://graph.test/me/drive")
+
+    assert response.status_code == 200
+    assert seen == ["initial", "access-1"]
+    assert provider.refreshed_with == ["refresh-0"]
+    assert (await provider.store.get(REFRESH_KEY)).access_token == "refresh-1"
+
+
+async def test_graph_auth_uses_stored_tokens_across_instances():
+    """Test that a new auth (a new connector instance) reuses the stored access token."""
+    provider = FakeProvider()
+    client, _ = _client(provider)
+    await client.get("https://graph.test/me/drive")
+
+    client, seen = _client(provider)
+    response = await client.get("https://graph.test/me/drive")
+
+    assert response.status_code == 200
+    assert seen == ["access-1"]
+    assert provider.refreshed_with == ["refresh-0"]
+
+
+async def test_graph_auth_redeems_latest_refresh_token_after_expiry():
+    """Test that once the stored access token expires, the rotated refresh token is used."""
+    provider = FakeProvider()
+    client, _ = _client(provider, valid_token="access-1")
+    await client.get("https://graph.test/me/drive")
+    await provider.store.delete(CACHE_KEY)
+
+    client, seen = _client(provider, valid_token="access-2")
+    response = await client.get("https://graph.test/me/drive")
+
+    assert response.status_code == 200
+    assert seen == ["access-2"]
+    assert provider.refreshed_with == ["refresh-0", "refresh-1"]
+
+
+async def test_graph_auth_refreshes_once_for_concurrent_401s():
+    """Test that concurrent requests rejected with the same token share one refresh."""
+    provider = FakeProvider()
+    client, _ = _client(provider)
+
+    responses = await asyncio.gather(*(client.get("https://graph.test/me/drive") for _ in range(5)))
+
+    assert all(response.status_code == 200 for response in responses)
+    assert provider.refreshed_with == ["refresh-0"]
+
+
+def _paged_connector(total: int, page_size: int = 3):
+    """A connector whose server lists ``total`` items, ``page_size`` per page, and the URLs it was sent."""
+    seen = []
+
+    def handler(request):
+        seen.append(str(request.url))
+        start = int(request.url.params.get("skip", 0))
+        items = range(start, min(start + page_size, total))
+        body = {"value": [{"id": str(i), "name": f"f{i}", "size": i} for i in items]}
+        if start + page_size < total:
+            body["@odata.nextLink"] = f"https://graph.test/next?skip={start + page_size}"
+        return httpx.Response(200, json=body)
+
+    connector = OneDriveConnector({"access_token": "test-paging"})
+    connector.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return connector, seen
+
+
+async def test_list_folder_stops_at_max_items():
+    """Test that listings stop following nextLink once max_items are collected."""
+    connector, seen = _paged_connector(total=10)
+
+    result = await connector.execute("list_folder", {"path": "docs", "max_items": 5})
+
+    assert [item["id"] for item in result.data["items"]] == ["0", "1", "2", "3", "4"]
+    assert result.data["has_more"]
+    assert len(seen) == 2
+    assert seen[0].endswith("&$top=5")
+
+
+async def test_search_follows_every_page_below_max_items():
+    """Test that a collection smaller than max_items is read to the end."""
+    connector, seen = _paged_connector(total=7)
+
+    result = await connector.execute("search", {"query": "f"})
+
+    assert result.data["count"] == 7
+    assert not result.data["has_more"]
+    assert len(seen) == 3